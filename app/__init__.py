@@ -1,46 +1,115 @@
 """
 Inicjalizacja aplikacji Flask i konfiguracja rozszerzeń.
 
-Moduł tworzy instancję aplikacji i konfiguruje:
+create_app() tworzy instancję aplikacji (application factory) i konfiguruje:
 - SQLAlchemy (ORM ddo bazy danych) - możliwość szybkiej zmiany typu bazy danych
-- Flask-Migrate - migracje bazy danych
+  (pula połączeń i PRAGMA dla SQLite w app.engine)
+- Flask-Migrate - migracje bazy danych (tylko przy uruchomieniu z CLI `flask`)
 - Flask-Login - autentykacja użytkowników
-- zmienne środowiskowe przez python-dotenv
+- cache członkostw w grupach, tożsamości zalogowanych i fragmentów HTML (app.cache)
+- hashowanie haseł (app.passwords)
+- zdarzenia zmian w grupach dla strumieni SSE (app.events)
+- zadania w tle: pula wątków albo kolejka w bazie (app.jobs)
+- opcjonalnie widoki async z AsyncSession (ASYNC_VIEWS, app.async_views)
+- metryki requestów: czas, SQL, szablony, GET /metrics (app.metrics)
+- wykrywanie zapytań N+1 w trybie debug i w testach (app.nplusone)
+- blueprinty: auth, groups, tasks, api (JSON, /api/v1), cli (komendy `flask ...`)
+
+Rozszerzenia tworzone są bez aplikacji i podpinane w create_app przez
+init_app - każdy worker, test i komenda CLI może mieć własną konfigurację.
+Ich stan (backend cache, pule wątków, broker zdarzeń, metryki) trafia do
+app.extensions, a obiekty z tego modułu sięgają po niego przez current_app -
+druga aplikacja w tym samym procesie nie przestawia pierwszej.
 """
 
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_login import LoginManager
-import os
-from dotenv import load_dotenv
+from config import Config
+from app.cache import Cache
+from app.passwords import PasswordHasher
+from app.events import Events
+from app.jobs import Jobs
+from app.async_db import AsyncDatabase
+from app.metrics import Metrics
+from app.nplusone import NPlusOneDetector
+from app.engine import engine_options, configure_engine
 
-# Załaduj zmienne środowiskowe z pliku .env
-# WAŻNE .env w .gitignore - wrażliwe dane
-load_dotenv()
+# Rozszerzenia - bez aplikacji, podpinane w create_app()
+db = SQLAlchemy()
+login = LoginManager()
+membership_cache = Cache('MEMBERSHIP')
+identity_cache = Cache('IDENTITY')
+fragment_cache = Cache('FRAGMENT')
+passwords = PasswordHasher()
+events = Events()
+jobs = Jobs()
+async_db = AsyncDatabase()
+metrics = Metrics()
+nplusone = NPlusOneDetector()
 
-app = Flask(__name__)
+#g Konfiguracja Flask-Login
+login.login_view = 'auth.login' # Gdzie przekierować niezalogowanych użytkowników
+login.login_message = 'Zaloguj się, aby uzyskać dostęp do tej strony.'
+login.login_message_category = 'info' # Kategoria dla flash message
 
-# Konfiguracja SECRET_KEY ze zmiennych środowiskowych
-# w produkcyjnej aplikacji zmienić!
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or 'klucz-zastepczy-zmienic-w-produkcji'
 
-# Konfiguracja bazy danych - domyślnie SQLite dla prostoty
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///site.db'
+def create_app(config_class=Config):
+    """
+    Application factory - tworzy i konfiguruje nową instancję aplikacji.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_class)
+    # opcje puli połączeń wyliczone z configu, chyba że ktoś podał własne
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
 
-# Wyłącz tracking modyfikacji - oszczędza pamięć i nie jest używany
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Inicjalizacja rozszerzeń
+    db.init_app(app)
+    with app.app_context():
+        configure_engine(app, db.engine)
+    login.init_app(app)
+    membership_cache.init_app(app)
+    identity_cache.init_app(app)
+    fragment_cache.init_app(app)
+    passwords.init_app(app)
+    events.init_app(app, db)
+    jobs.init_app(app, db)
+    async_db.init_app(app)
+    metrics.init_app(app)
+    nplusone.init_app(app, db)
 
+    # Flask-Migrate ciągnie za sobą alembic - potrzebny tylko dla `flask db ...`.
+    # Workery gunicorna i testy nie działają w kontekście click, więc go nie ładują.
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
 
-# Inicjalizacja rozszerzeń
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-login = LoginManager(app)
+    # Import blueprintów dopiero tutaj - dopiero wtedy ładują się widoki i modele
+    from app.auth import bp as auth_bp
+    from app.groups import bp as groups_bp
+    from app.tasks import bp as tasks_bp
+    from app.api import bp as api_bp
+    from app.cli import bp as cli_bp
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(groups_bp)
+    app.register_blueprint(tasks_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(cli_bp)
+
+    # widoki GET index/group_details/group_tasks w wersji async (wymaga flask[async] i aiosqlite)
+    if app.config['ASYNC_VIEWS']:
+        from app import async_views
+        async_views.init_app(app)
+
+    return app
 
-#g Konfiguracja Flask-Login
-login.login_view = 'login' # Gdzie przekierować niezalogowanych użytkowników
-login.login_message = 'Zaloguj się, aby uzyskać dostęp do tej strony.'
-login.login_message_category = 'info' # Kategoria dla flash message
 
-# Import na końcu żeby uniknąć circular imports (routes i models potrzebują 'app' i 'db')
-from app import routes, models
\ No newline at end of file
+# modele muszą być zarejestrowane przy db (user_loader, migracje)
+from app import models
+# indeks wyszukiwania zadań zakładany razem z tabelą task (db.create_all)
+from app import search
+# funkcje zadań w tle rejestrowane przy jobs (także w `flask jobs-worker`)
+from app import notifications
+# historia grup: tabela nadrzędna PostgreSQL w db.create_all, listenery sesji
+from app import audit
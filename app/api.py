@@ -0,0 +1,530 @@
+"""
+JSON API (v1) dla grup, członków i zadań - dla klienta mobilnego.
+
+Te same modele, formularze (walidacja) i operacje (app.services) co widoki
+HTML, ale odpowiedzi to zwarty JSON, a mutacje nie robią przekierowań.
+
+Zasoby grupy mają ETag (i Last-Modified) liczony z FamilyGroup.version -
+niezmieniona wersja = 304 Not Modified bez zapytania o zadania/członków.
+
+Zmiany w grupie można śledzić na żywo: GET /api/v1/groups/<id>/events
+(Server-Sent Events, app.events) zamiast odpytywania listy zadań.
+
+Autentykacja: sesja Flask-Login (POST /api/v1/auth/login).
+
+Ochrona przed CSRF: formularze API nie mają tokenu, więc POST/PUT/PATCH
+przyjmujemy tylko z ciałem JSON (Content-Type: application/json, inaczej
+415). Obca strona nie wyśle takiego żądania z ciasteczkiem sesji bez
+zgody CORS (preflight), a zwykły <form> umie tylko form-urlencoded,
+multipart i text/plain. DELETE z obcej strony też wymaga preflight.
+"""
+
+import hashlib
+from flask import Blueprint, Response, jsonify, request, abort, make_response, current_app
+from flask_login import login_user, logout_user, current_user
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException, ServiceUnavailable
+from functools import wraps
+from app import db, passwords, services, events, audit
+from app.forms import LoginForm, AddMemberForm, CreateTaskForm
+from app.models import User, GroupMember, utcnow
+from app.queries import group_tasks_page, group_member_choices, group_member_list, user_dashboard, group_due_tasks, TASK_STATUSES
+from app.search import search_tasks
+from app.decorators import get_group_access, get_task_access, invalidate_membership
+from app.events import StreamLimitError
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+# metody, które zmieniają dane i niosą ciało żądania
+JSON_METHODS = ('POST', 'PUT', 'PATCH')
+
+# sekundy do ponownej próby, gdy proces ma komplet strumieni zdarzeń
+STREAM_RETRY_AFTER = 10
+
+
+@bp.before_request
+def require_json():
+    """Mutacje tylko z ciałem JSON - zamiast tokenu CSRF (patrz opis modułu)."""
+    if request.method in JSON_METHODS and not request.is_json:
+        abort(415, 'Wymagane ciało JSON (Content-Type: application/json).')
+
+
+@bp.errorhandler(HTTPException)
+def handle_http_error(e):
+    """Błędy API jako JSON, nie strona HTML (z nagłówkami błędu, np. Retry-After, Allow)."""
+    headers = [(name, value) for name, value in e.get_headers() if name != 'Content-Type']
+    return jsonify(error=e.name, message=e.description), e.code, headers
+
+
+def api_login_required(f):
+    """Jak @login_required, ale 401 zamiast przekierowania do logowania."""
+    @wraps(f)
+    def decorated_view(*args, **kwargs):
+        if not current_user.is_authenticated:
+            abort(401)
+        return f(*args, **kwargs)
+    return decorated_view
+
+
+def api_group_member_required(role=None):
+    """
+    Odpowiednik @group_member_required dla API: 404 gdy grupy nie ma,
+    403 gdy current_user nie jest członkiem lub nie ma wymaganej roli.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_view(*args, **kwargs):
+            group, current_role = get_group_access(kwargs['group_id'])
+            if group is None:
+                abort(404)
+            if current_role is None or (role is not None and current_role != role):
+                abort(403)
+            return f(*args, group=group, role=current_role, **kwargs)
+        return decorated_view
+    return decorator
+
+
+def _form(form_class, **defaults):
+    """
+    Formularz WTForms wypełniony z JSON (bez tokenu CSRF - require_json
+    wpuszcza tu tylko żądania z ciałem JSON).
+    defaults - wartości pól, których nie ma w JSON.
+    """
+    return form_class(meta={'csrf': False}, **defaults)
+
+
+def _validation_error(form):
+    return jsonify(error='Bad Request', errors=form.errors), 400
+
+
+def _conditional(group, build):
+    """
+    Odpowiedź warunkowa dla zasobu grupy.
+
+    ETag = wersja grupy + query string (filtry/strona), więc klient
+    z aktualnym ETagiem dostaje 304 - build() (czyli zapytanie o dane)
+    w ogóle się nie wykonuje.
+    """
+    query = request.query_string.decode()
+    etag = f'g{group.id}-v{group.version}'
+    if query:
+        etag += '-' + hashlib.sha1(query.encode()).hexdigest()[:12]
+
+    not_modified = request.if_none_match.contains_weak(etag)
+    # If-Modified-Since liczy się tylko gdy klient nie przysłał ETaga
+    if not request.if_none_match and request.if_modified_since and group.last_activity_at:
+        not_modified = group.last_activity_at <= request.if_modified_since.replace(tzinfo=None)
+
+    response = make_response('', 304) if not_modified else jsonify(build())
+
+    response.set_etag(etag, weak=True)
+    if group.last_activity_at:
+        response.last_modified = group.last_activity_at
+    # klient może trzymać odpowiedź, ale zawsze ją rewaliduje
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def _task_dict(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'is_completed': task.is_completed,
+        'assigned_to_id': task.assigned_to_id,
+        'created_by_id': task.created_by_id,
+        'created_at': task.created_at.isoformat() if task.created_at else None,
+        'due_at': task.due_at.isoformat() if task.due_at else None,
+        'recurrence': task.recurrence,
+        'completed_at': task.completed_at.isoformat() if task.completed_at else None,
+        'archived': task.archived,
+    }
+
+
+def _audit_dict(entry):
+    return {
+        'id': entry['id'],
+        'type': audit.NAMES.get(entry['code'], entry['code']),
+        'created_at': entry['created_at'].isoformat(),
+        'actor_id': entry['actor_id'],
+        'actor': entry['actor'],
+        'task_id': entry['task_id'],
+        'task': entry['task'],
+        'user_id': entry['user_id'],
+        'user': entry['user'],
+        'data': entry['data'],
+    }
+
+
+def _group_dict(group, role):
+    return {
+        'id': group.id,
+        'name': group.name,
+        'version': group.version,
+        'role': role,
+        'open_count': group.open_count,
+        'completed_count': group.completed_count,
+    }
+
+
+# --- autentykacja ---
+
+@bp.route('/auth/login', methods=['POST'])
+def login():
+    form = _form(LoginForm)
+    if not form.validate():
+        return _validation_error(form)
+
+    user = User.query.filter_by(email=form.email.data).first()
+    if not user or not passwords.verify(user.password, form.password.data):
+        abort(401)
+
+    if passwords.needs_rehash(user.password):
+        try:
+            user.password = passwords.hash(form.password.data)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+
+    login_user(user, remember=form.remember_me.data)
+    return jsonify(id=user.id, email=user.email)
+
+
+@bp.route('/auth/logout', methods=['POST'])
+@api_login_required
+def logout():
+    logout_user()
+    return '', 204
+
+
+# --- grupy i członkowie ---
+
+@bp.route('/groups')
+@api_login_required
+def groups():
+    # _group_dict + liczba członków i otwartych zadań current_user - jedno zapytanie
+    return jsonify(groups=[row._asdict() for row in user_dashboard(current_user.id)])
+
+
+@bp.route('/groups/<int:group_id>')
+@api_login_required
+@api_group_member_required()
+def group(group_id, group, role):
+    def build():
+        data = _group_dict(group, role)
+        data['members'] = [
+            {'user_id': user_id, 'email': email, 'role': member_role}
+            for user_id, email, member_role in group_member_list(group.id)
+        ]
+        return data
+    return _conditional(group, build)
+
+
+@bp.route('/groups/<int:group_id>/events')
+@api_login_required
+@api_group_member_required()
+def group_events(group_id, group, role):
+    """
+    Strumień zmian grupy (text/event-stream).
+
+    Zdarzenia: task.created, task.toggled, task.deleted, tasks.created,
+    tasks.updated, tasks.deleted, member.added, member.removed, group.renamed.
+    id zdarzenia = wersja grupy; po ponownym połączeniu (Last-Event-ID)
+    z nieaktualną wersją klient dostaje "resync" i pobiera dane od nowa.
+
+    404, gdy zdarzenia są wyłączone (EVENTS_ENABLED=0); 503 z Retry-After,
+    gdy proces ma już EVENTS_MAX_STREAMS otwartych strumieni.
+    """
+    if not events.enabled:
+        abort(404)
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    try:
+        stream = events.stream(
+            group.id,
+            group.version,
+            last_event_id=int(last_event_id) if last_event_id.isdigit() else None,
+            user_id=current_user.id
+        )
+    except StreamLimitError:
+        raise ServiceUnavailable('Za dużo otwartych strumieni zdarzeń - spróbuj później.',
+                                 retry_after=STREAM_RETRY_AFTER)
+    response = Response(stream, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # nginx - nie buforuj strumienia
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/groups/<int:group_id>/history')
+@api_login_required
+@api_group_member_required()
+def group_history(group_id, group, role):
+    """
+    Historia zmian grupy (app.audit) od najnowszych - before=<next_cursor
+    z poprzedniej strony>, limit. Każda zmiana podbija wersję grupy, więc ETag jak przy zadaniach.
+    """
+    def build():
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+        entries, next_cursor = audit.group_history(group.id, before=request.args.get('before', type=int), limit=limit)
+        return {
+            'events': [_audit_dict(entry) for entry in entries],
+            'next_cursor': next_cursor,
+        }
+    return _conditional(group, build)
+
+
+@bp.route('/groups/<int:group_id>/members', methods=['POST'])
+@api_login_required
+@api_group_member_required(role='admin')
+def add_member(group_id, group, role):
+    form = _form(AddMemberForm)
+    if not form.validate():
+        return _validation_error(form)
+
+    user = User.query.filter_by(email=form.email.data).first()
+    if not user:
+        abort(404, 'Użytkownik o tym adresie email nie istnieje.')
+    if GroupMember.query.filter_by(user_id=user.id, group_id=group.id).first():
+        abort(409, 'Ten użytkownik jest już członkiem tej grupy.')
+
+    services.add_member(group, user)
+    db.session.commit()
+    invalidate_membership(user.id, group.id)
+    return jsonify(user_id=user.id, email=user.email, role='member'), 201
+
+
+@bp.route('/groups/<int:group_id>/members/<int:user_id>', methods=['DELETE'])
+@api_login_required
+@api_group_member_required(role='admin')
+def remove_member(group_id, user_id, group, role):
+    membership = GroupMember.query.filter_by(user_id=user_id, group_id=group.id).first_or_404()
+    if services.is_last_admin(group.id, user_id):
+        abort(409, 'Nie można usunąć jedynego administratora grupy.')
+
+    services.remove_member(membership)
+    db.session.commit()
+    invalidate_membership(user_id, group.id)
+    return '', 204
+
+
+# --- zadania ---
+
+@bp.route('/groups/<int:group_id>/tasks')
+@api_login_required
+@api_group_member_required()
+def tasks(group_id, group, role):
+    """
+    Strona zadań - te same filtry i kursor co widok HTML
+    (status=open|done|all, assigned=<id>|0, after=<kursor>, limit,
+    archived=1 - razem z zadaniami z archiwum).
+    """
+    def build():
+        status = request.args.get('status', 'open')
+        if status not in TASK_STATUSES:
+            abort(400, f'status musi być jednym z: {", ".join(TASK_STATUSES)}')
+        assigned = request.args.get('assigned', '')
+        limit = min(request.args.get('limit', 50, type=int), 200)
+
+        page, next_cursor = group_tasks_page(
+            group.id,
+            status=status,
+            assigned_to=int(assigned) if assigned.isdigit() else None,
+            after=request.args.get('after'),
+            per_page=max(limit, 1),
+            include_archived=request.args.get('archived') == '1'
+        )
+        return {'tasks': [_task_dict(task) for task in page], 'next_cursor': next_cursor}
+    return _conditional(group, build)
+
+
+@bp.route('/groups/<int:group_id>/tasks/search')
+@api_login_required
+@api_group_member_required()
+def search(group_id, group, role):
+    """
+    Wyszukiwanie zadań grupy (q=słowa, page, limit) - od najtrafniejszych.
+    """
+    def build():
+        q = request.args.get('q', '').strip()
+        if not q:
+            abort(400, 'Wymagany parametr q.')
+        page = max(request.args.get('page', 1, type=int), 1)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 200)
+        found, has_next = search_tasks(group.id, q, page=page, per_page=limit)
+        return {'tasks': [_task_dict(task) for task in found], 'next_page': page + 1 if has_next else None}
+    return _conditional(group, build)
+
+
+@bp.route('/groups/<int:group_id>/tasks/due')
+@api_login_required
+@api_group_member_required()
+def due_tasks(group_id, group, role):
+    """
+    Otwarte zadania z terminem: zaległe i na ten tydzień (limit na listę).
+    Bez ETag - wynik zmienia się z upływem czasu, nie tylko z wersją grupy.
+    """
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    now = utcnow()
+    overdue, this_week = group_due_tasks(group.id, now, limit=limit)
+    return jsonify(
+        now=now.isoformat(),
+        overdue=[_task_dict(task) for task in overdue],
+        this_week=[_task_dict(task) for task in this_week],
+    )
+
+
+@bp.route('/groups/<int:group_id>/tasks', methods=['POST'])
+@api_login_required
+@api_group_member_required()
+def create_task(group_id, group, role):
+    # assigned_to: id członka grupy, 0 lub brak = nieprzypisane
+    form = _form(CreateTaskForm, assigned_to=0)
+    form.assigned_to.choices = [(0, '')] + group_member_choices(group.id)
+    if not form.validate():
+        return _validation_error(form)
+
+    task = services.create_task(
+        group_id=group.id,
+        created_by_id=current_user.id,
+        title=form.title.data,
+        description=form.description.data,
+        assigned_to_id=form.assigned_to.data or None,
+        due_at=form.due_at.data,
+        recurrence=form.recurrence.data
+    )
+    db.session.commit()
+    return jsonify(_task_dict(task)), 201
+
+
+# --- operacje zbiorcze ---
+# Jeden request i jedno zapytanie (INSERT/UPDATE/DELETE) zamiast
+# osobnego wywołania API + commit dla każdego zadania.
+
+def _bulk_list(data, key):
+    """Lista z JSON (pole key) z limitem BULK_MAX_TASKS."""
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        abort(400, f'Wymagane pole {key} (niepusta lista).')
+    limit = current_app.config['BULK_MAX_TASKS']
+    if len(items) > limit:
+        abort(413, f'Maksymalnie {limit} zadań w jednym żądaniu.')
+    return items
+
+
+def _bulk_ids(data):
+    ids = _bulk_list(data, 'ids')
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        abort(400, 'Pole ids musi być listą liczb.')
+    return ids
+
+
+@bp.route('/groups/<int:group_id>/tasks/bulk-create', methods=['POST'])
+@api_login_required
+@api_group_member_required()
+def bulk_create_tasks(group_id, group, role):
+    """
+    Wiele zadań naraz: {"tasks": [{"title": ..., "description": ..., "assigned_to": ...}]}.
+
+    Każde zadanie jest walidowane tym samym CreateTaskForm co pojedyncze;
+    błąd w którymkolwiek = 400 i nic nie jest zapisywane.
+    """
+    items = _bulk_list(request.get_json(silent=True) or {}, 'tasks')
+    choices = [(0, '')] + group_member_choices(group.id)
+
+    rows, errors = [], {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors[index] = {'task': ['Zadanie musi być obiektem.']}
+            continue
+        formdata = MultiDict({
+            key: '' if value is None else str(value) for key, value in item.items()
+        })
+        form = CreateTaskForm(formdata=formdata, meta={'csrf': False}, assigned_to=0)
+        form.assigned_to.choices = choices
+        if not form.validate():
+            errors[index] = form.errors
+            continue
+        rows.append({
+            'title': form.title.data,
+            'description': form.description.data,
+            'assigned_to_id': form.assigned_to.data or None,
+            'due_at': form.due_at.data,
+            'recurrence': form.recurrence.data,
+        })
+
+    if errors:
+        return jsonify(error='Bad Request', errors=errors), 400
+
+    ids = services.bulk_create_tasks(group.id, current_user.id, rows)
+    db.session.commit()
+    return jsonify(ids=ids), 201
+
+
+@bp.route('/groups/<int:group_id>/tasks/bulk-update', methods=['POST'])
+@api_login_required
+@api_group_member_required()
+def bulk_update_tasks(group_id, group, role):
+    """
+    Zmiana statusu wielu zadań: {"ids": [...], "is_completed": true/false}.
+    Zwraca id faktycznie zmienionych zadań.
+    """
+    data = request.get_json(silent=True) or {}
+    ids = _bulk_ids(data)
+    if not isinstance(data.get('is_completed'), bool):
+        abort(400, 'Wymagane pole is_completed (true/false).')
+
+    changed = services.bulk_set_completed(group.id, ids, data['is_completed'])
+    db.session.commit()
+    return jsonify(ids=changed)
+
+
+@bp.route('/groups/<int:group_id>/tasks/bulk-delete', methods=['POST'])
+@api_login_required
+@api_group_member_required()
+def bulk_delete_tasks(group_id, group, role):
+    """
+    Usuń wiele zadań: {"ids": [...]}. Admin - dowolne zadania grupy,
+    pozostali tylko swoje (reszta jest pomijana). Zwraca id usuniętych.
+    """
+    ids = _bulk_ids(request.get_json(silent=True) or {})
+
+    deleted = services.bulk_delete_tasks(group.id, ids, current_user.id, role)
+    db.session.commit()
+    return jsonify(ids=deleted)
+
+
+def _task_for_member(task_id):
+    """Zadanie + rola current_user w jego grupie (404 dla obcych zadań)."""
+    task, role = get_task_access(task_id)
+    if role is None:
+        abort(404)
+    return task, role
+
+
+@bp.route('/tasks/<int:task_id>', methods=['PATCH'])
+@api_login_required
+def update_task(task_id):
+    """Zmiana statusu zadania: {"is_completed": true/false}."""
+    task, role = _task_for_member(task_id)
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data.get('is_completed'), bool):
+        abort(400, 'Wymagane pole is_completed (true/false).')
+
+    services.set_task_completed(task, data['is_completed'])
+    db.session.commit()
+    return jsonify(_task_dict(task))
+
+
+@bp.route('/tasks/<int:task_id>', methods=['DELETE'])
+@api_login_required
+def delete_task(task_id):
+    """Usuń zadanie (tylko admin lub twórca)."""
+    task, role = _task_for_member(task_id)
+    if role != 'admin' and task.created_by_id != current_user.id:
+        abort(403)
+
+    services.delete_task(task)
+    db.session.commit()
+    return '', 204
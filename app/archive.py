@@ -0,0 +1,106 @@
+"""
+Archiwizacja zrobionych zadań (`flask archive-tasks`, np. z crona raz na noc).
+
+Zadania zrobione dawniej niż ARCHIVE_AFTER_DAYS dni przenosimy z tabeli
+task do task_archive (ArchivedTask) - tabela task i jej indeksy
+zawierają wtedy głównie otwarte i niedawno zrobione zadania, niezależnie
+od tego, ile lat historii ma grupa. Lista zadań czyta archiwum tylko na
+życzenie (app.queries, include_archived).
+
+Paczka = jedna transakcja:
+- SELECT najdawniej zrobionych zadań (indeks ix_task_completed_at)
+- DELETE ... RETURNING tylko tych, które wciąż są zrobione (równoległe
+  "przywróć" wygrywa - zadanie zostaje w task)
+- INSERT usuniętych wierszy do task_archive (executemany)
+- UPDATE liczników grup (completed_count liczy zadania w task) i wersji
+  (ETag API, cache fragmentów)
+Po przekroczeniu budżetu czasu przebieg kończy się po bieżącej paczce.
+
+Nie archiwizujemy zadań z regułą powtarzania - to najnowsze wystąpienie serii (app.recurrence).
+Zadanie w archiwum ma to samo id co w task; tabela task ma w SQLite
+AUTOINCREMENT, więc id nie wracają i oba zbiory są rozłączne.
+
+Zadania z archiwum nie są w indeksie wyszukiwania (trigger DELETE na task)
+i nie trafiają do historii grup (app.audit) - to nie jest zmiana w grupie.
+"""
+
+import time
+from datetime import timedelta
+from flask import current_app
+from app import db
+from app.models import Task, ArchivedTask, FamilyGroup, utcnow
+
+# kolumny task przenoszone do task_archive (archived_at dopisujemy)
+ARCHIVED_COLUMNS = ('id', 'title', 'description', 'group_id', 'assigned_to_id', 'created_by_id',
+                    'created_at', 'completed_at', 'due_at', 'recurrence')
+
+
+def archive_completed(days=None, batch_size=1000, budget=None, now=None):
+    """
+    Przenieś do archiwum zadania zrobione ponad `days` dni temu
+    (domyślnie ARCHIVE_AFTER_DAYS).
+
+    budget - limit czasu w sekundach (None - do końca); sprawdzany między
+    paczkami. Commit po każdej paczce. Zwraca statystyki przebiegu:
+    tasks (przeniesione), groups (zmienione grupy, z powtórzeniami
+    między paczkami), batches, seconds, complete (False - przerwany budżetem).
+    """
+    now = now or utcnow()
+    days = current_app.config['ARCHIVE_AFTER_DAYS'] if days is None else days
+    cutoff = now - timedelta(days=days)
+    started = time.perf_counter()
+    stats = {'tasks': 0, 'groups': 0, 'batches': 0, 'complete': False}
+    while budget is None or time.perf_counter() - started < budget:
+        ids = _select_batch(cutoff, batch_size)
+        if not ids:
+            stats['complete'] = True
+            break
+        moved, groups = _move(ids, cutoff, now)
+        db.session.commit()
+        stats['tasks'] += moved
+        stats['groups'] += groups
+        stats['batches'] += 1
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def _select_batch(cutoff, batch_size):
+    table = Task.__table__
+    batch = db.select(table.c.id).where(
+        table.c.completed_at < cutoff, table.c.recurrence.is_(None)
+    ).order_by(table.c.completed_at, table.c.id).limit(batch_size)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        batch = batch.with_for_update(skip_locked=True)
+    return db.session.scalars(batch).all()
+
+
+def _move(ids, cutoff, now):
+    table = Task.__table__
+    # warunki jeszcze raz w DELETE - między SELECT a DELETE ktoś mógł
+    # przywrócić zadanie albo dodać mu regułę
+    rows = db.session.execute(
+        db.delete(table)
+        .where(table.c.id.in_(ids), table.c.is_completed.is_(True),
+               table.c.completed_at < cutoff, table.c.recurrence.is_(None))
+        .returning(*[table.c[name] for name in ARCHIVED_COLUMNS])
+    ).all()
+    if not rows:
+        return 0, 0
+
+    # Core (tabela, nie model) - bez przetwarzania wierszy przez ORM;
+    # stare wiersze task bywają bez created_at - w archiwum to data zrobienia
+    db.session.execute(ArchivedTask.__table__.insert(), [
+        {**row._mapping, 'created_at': row.created_at or row.completed_at, 'archived_at': now} for row in rows
+    ])
+    done = {}
+    for row in rows:
+        done[row.group_id] = done.get(row.group_id, 0) + 1
+    groups = FamilyGroup.__table__.c
+    db.session.execute(
+        db.update(FamilyGroup.__table__)
+        .where(groups.id == db.bindparam('group'))
+        .values(completed_count=groups.completed_count - db.bindparam('done'),
+                version=groups.version + 1, last_activity_at=now),
+        [{'group': group_id, 'done': count} for group_id, count in done.items()]
+    )
+    return len(rows), len(done)
@@ -0,0 +1,77 @@
+"""
+Asynchroniczny dostęp do bazy (SQLAlchemy asyncio) dla widoków async.
+
+Włączane przez ASYNC_VIEWS=1 - wtedy index, group_details i group_tasks
+(GET) czytają z bazy przez AsyncSession (app.async_views).
+
+Sterownik async wyliczamy z adresu silnika synchronicznego (sqlite -> aiosqlite,
+postgresql -> asyncpg, mysql -> aiomysql) albo podajemy wprost
+w ASYNC_DATABASE_URI. Sterownik trzeba doinstalować (aiosqlite jest
+w requirements.txt).
+
+Flask uruchamia każdy widok async we własnej pętli zdarzeń, więc
+połączeń nie da się trzymać w puli między requestami (są związane
+z pętlą) - silnik używa NullPool. Dla SQLite to tanie: otwarcie pliku.
+"""
+
+from contextlib import asynccontextmanager
+from flask import current_app
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+from app.engine import configure_engine
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+def async_database_uri(uri):
+    """URI bazy z asynchronicznym sterownikiem (ten sam serwer/plik)."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f'Brak sterownika async dla bazy {backend} - ustaw ASYNC_DATABASE_URI')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+class AsyncDatabase:
+    """
+    Silnik async tworzony przy pierwszym użyciu - aplikacja bez
+    ASYNC_VIEWS nie importuje sterowników async. Każda aplikacja ma
+    własny silnik (app.extensions['async_db']).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['async_db'] = {'engine': None}
+
+    @property
+    def engine(self):
+        """Silnik async bieżącej aplikacji (wymaga kontekstu aplikacji)."""
+        app = current_app._get_current_object()
+        state = app.extensions['async_db']
+        if state['engine'] is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            from app import db
+
+            # db.engine.url, nie config - Flask-SQLAlchemy zamienia względną
+            # ścieżkę SQLite na plik w katalogu instance/
+            uri = app.config.get('ASYNC_DATABASE_URI') or async_database_uri(db.engine.url)
+            engine = create_async_engine(uri, poolclass=NullPool)
+            # te same PRAGMA dla SQLite co w silniku synchronicznym
+            configure_engine(app, engine.sync_engine)
+            state['engine'] = engine
+        return state['engine']
+
+    @asynccontextmanager
+    async def session(self):
+        """AsyncSession na czas bloku - obiekty zostają czytelne po wyjściu."""
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        async with AsyncSession(self.engine, expire_on_commit=False) as session:
+            yield session
@@ -0,0 +1,105 @@
+"""
+Asynchroniczne warianty widoków tylko do odczytu (ASYNC_VIEWS=1).
+
+index, group_details i group_tasks dla GET czytają z bazy przez
+AsyncSession (app.async_db) - te same zapytania (app.queries, *_select),
+szablony i cache fragmentów co wersje synchroniczne. POST (formularze)
+dalej obsługują widoki z groups.py/tasks.py.
+
+Podmieniamy funkcje widoków pod tymi samymi endpointami, więc adresy
+i url_for('groups.index') się nie zmieniają.
+
+Uwaga: Flask wykonuje widok async w pętli zdarzeń na czas jednego
+requestu, w wątku workera. Pojedynczy request może czekać na kilka
+zapytań naraz, ale liczbę równoległych requestów dalej wyznacza liczba
+wątków/workerów. Powolnych klientów (wolne łącze) obsługuje serwer
+ASGI - patrz asgi.py.
+"""
+
+from functools import wraps
+from flask import render_template, request, current_app
+from flask_login import current_user, login_required
+from app import async_db
+from app.decorators import group_member_required
+from app.forms import AddMemberForm, CreateTaskForm
+from app.fragments import group_fragment_async
+from app.queries import (user_dashboard_select, group_member_list_select,
+                         group_tasks_page_select, group_archived_tasks_select, merge_archived,
+                         split_task_page)
+from app.tasks import task_filters, task_list_vary, render_group_tasks
+
+
+async def index():
+    groups = []
+    if current_user.is_authenticated:
+        async with async_db.session() as session:
+            groups = (await session.execute(user_dashboard_select(current_user.id))).all()
+    return render_template("index.html", title='Strona główna', groups=groups)
+
+
+@login_required
+@group_member_required()
+async def group_details(group_id, group, role):
+    async def build():
+        async with async_db.session() as session:
+            members = (await session.execute(group_member_list_select(group.id))).all()
+        html = render_template('_member_list.html', group=group, members=members, current_role=role)
+        return html.strip(), None
+
+    viewer = current_user.id if role == 'admin' else ''
+    member_list, _ = await group_fragment_async('members', group, role, (viewer,), build)
+
+    return render_template('group_details.html', title=group.name, group=group, form=AddMemberForm(),
+                           member_list=member_list, current_role=role)
+
+
+@login_required
+@group_member_required()
+async def group_tasks(group_id, group, role):
+    status, assigned, assigned_to, after, archived = task_filters()
+    per_page = current_app.config['TASKS_PER_PAGE']
+
+    async with async_db.session() as session:
+        rows = await session.execute(group_member_list_select(group.id))
+        members = [(0, '-- Nieprzypisane --')] + [(user_id, email) for user_id, email, _ in rows]
+
+        async def build():
+            statement = group_tasks_page_select(group.id, status, assigned_to, after, per_page)
+            tasks = (await session.scalars(statement)).all()
+            if archived and status != 'open':
+                statement = group_archived_tasks_select(group.id, assigned_to, after, per_page)
+                tasks = merge_archived(tasks, (await session.scalars(statement)).all())
+            tasks, next_cursor = split_task_page(tasks, per_page)
+            html = render_template('_task_list.html', group=group, tasks=tasks, current_role=role)
+            return html.strip(), next_cursor
+
+        task_list, next_cursor = await group_fragment_async(
+            'tasks', group, role, task_list_vary(role, status, assigned_to, after, archived), build
+        )
+
+    form = CreateTaskForm()
+    form.assigned_to.choices = members
+    return render_group_tasks(group, role, form, members, task_list, next_cursor, status, assigned, archived)
+
+
+# endpoint -> wariant async (tylko GET)
+ASYNC_VIEWS = {
+    'groups.index': index,
+    'groups.group_details': group_details,
+    'tasks.group_tasks': group_tasks,
+}
+
+
+def init_app(app):
+    """Podmień widoki GET na warianty async (po rejestracji blueprintów)."""
+    for endpoint, async_view in ASYNC_VIEWS.items():
+        app.view_functions[endpoint] = _get_only(async_view, app.view_functions[endpoint])
+
+
+def _get_only(async_view, sync_view):
+    @wraps(sync_view)
+    def view(**kwargs):
+        if request.method != 'GET':
+            return sync_view(**kwargs)
+        return current_app.ensure_sync(async_view)(**kwargs)
+    return view
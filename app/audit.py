@@ -0,0 +1,345 @@
+"""
+Historia zmian w grupach (audit log) - tabela tylko do dopisywania.
+
+Operacje z app.services dopisują wpis w tej samej transakcji co zmiana -
+rollback zmiany to brak wpisu. Wpis to kto (actor_id - zalogowany
+użytkownik requestu, None dla CLI i harmonogramu), kiedy, co (kod
+liczbowy, stałe niżej) i czego dotyczył (task_id / user_id, krótkie
+data w JSON - np. tytuł usuniętego zadania). Wpisów nie zmieniamy
+ani nie usuwamy pojedynczo.
+
+Tabele miesięczne - retencja (prune, `flask audit-prune`) to DROP TABLE
+całego miesiąca zamiast DELETE milionów wierszy z jednej tabeli:
+- SQLite: tabela audit_RRRRMM na każdy miesiąc, zakładana przy pierwszym
+  wpisie w miesiącu. Id startują od RRRRMM * ID_MONTH_BASE
+  (sqlite_sequence), więc rosną między tabelami, a z id widać, w której
+  tabeli leży wpis
+- PostgreSQL: tabela audit_event z natywnym partycjonowaniem
+  (PARTITION BY RANGE created_at), partycje audit_event_RRRRMM
+
+Historia grupy (group_history) - keyset po id malejąco: before=<id>
+ostatniego wpisu poprzedniej strony, indeks (group_id, id) w każdym
+miesiącu. Koszt strony nie zależy od tego, jak daleko się przewinęło.
+
+Bez wpisów: import (app.importer) - to migracja danych, nie zmiana
+w aplikacji.
+
+Tabelę nadrzędną dla PostgreSQL zakładają migracja 3b8e6f0d2a71
+i db.create_all() (zdarzenie after_create metadanych).
+"""
+
+import json
+import weakref
+from flask import has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from app import db
+from app.models import Timestamp, User, Task, utcnow
+
+# kody zdarzeń - zapisywane jako SMALLINT, nie zmieniać istniejących wartości
+TASK_CREATED = 1
+TASK_COMPLETED = 2
+TASK_REOPENED = 3
+TASK_DELETED = 4
+MEMBER_ADDED = 10
+MEMBER_REMOVED = 11
+GROUP_RENAMED = 20
+
+LABELS = {
+    TASK_CREATED: 'dodał(a) zadanie',
+    TASK_COMPLETED: 'oznaczył(a) jako zrobione',
+    TASK_REOPENED: 'przywrócił(a) do zrobienia',
+    TASK_DELETED: 'usunął(ęła) zadanie',
+    MEMBER_ADDED: 'dodał(a) członka',
+    MEMBER_REMOVED: 'usunął(ęła) członka',
+    GROUP_RENAMED: 'zmienił(a) nazwę grupy',
+}
+
+# nazwy kodów w API (stabilne, w przeciwieństwie do etykiet)
+NAMES = {
+    TASK_CREATED: 'task.created',
+    TASK_COMPLETED: 'task.completed',
+    TASK_REOPENED: 'task.reopened',
+    TASK_DELETED: 'task.deleted',
+    MEMBER_ADDED: 'member.added',
+    MEMBER_REMOVED: 'member.removed',
+    GROUP_RENAMED: 'group.renamed',
+}
+
+# SQLite: pierwsze id miesiąca RRRRMM to RRRRMM * ID_MONTH_BASE + 1
+ID_MONTH_BASE = 10 ** 10
+
+POSTGRES_TABLE = 'audit_event'
+
+SQLITE_MONTH_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at DATETIME NOT NULL,
+        group_id INTEGER NOT NULL,
+        code SMALLINT NOT NULL,
+        actor_id INTEGER,
+        task_id INTEGER,
+        user_id INTEGER,
+        data TEXT
+    )
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_{name}_group_id ON {name} (group_id, id)',
+    # licznik AUTOINCREMENT od początku zakresu miesiąca
+    """
+    INSERT INTO sqlite_sequence (name, seq)
+    SELECT '{name}', {base} WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = '{name}')
+    """,
+)
+
+POSTGRES_DDL = (
+    f"""
+    CREATE TABLE IF NOT EXISTS {POSTGRES_TABLE} (
+        id BIGSERIAL,
+        created_at TIMESTAMP NOT NULL,
+        group_id INTEGER NOT NULL,
+        code SMALLINT NOT NULL,
+        actor_id INTEGER,
+        task_id INTEGER,
+        user_id INTEGER,
+        data TEXT,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    """,
+    f'CREATE INDEX IF NOT EXISTS ix_{POSTGRES_TABLE}_group_id ON {POSTGRES_TABLE} (group_id, id)',
+)
+
+POSTGRES_PARTITION_DDL = (
+    "CREATE TABLE IF NOT EXISTS {name} PARTITION OF " + POSTGRES_TABLE +
+    " FOR VALUES FROM ('{start}') TO ('{end}')"
+)
+
+# silnik -> miesiące, których tabela/partycja na pewno istnieje (zatwierdzona);
+# dopisujemy po commit, bo rollback cofa też CREATE TABLE
+_ready = weakref.WeakKeyDictionary()
+
+
+def _columns(name):
+    return db.table(
+        name,
+        db.column('id', db.Integer),
+        db.column('created_at', Timestamp),
+        db.column('group_id', db.Integer),
+        db.column('code', db.SmallInteger),
+        db.column('actor_id', db.Integer),
+        db.column('task_id', db.Integer),
+        db.column('user_id', db.Integer),
+        db.column('data', db.Text),
+    )
+
+
+def month_of(value):
+    """datetime -> miesiąc jako liczba RRRRMM."""
+    return value.year * 100 + value.month
+
+
+def table_name(connection, month):
+    if connection.dialect.name == 'postgresql':
+        return f'{POSTGRES_TABLE}_{month}'
+    return f'audit_{month}'
+
+
+def create_month(connection, month):
+    """Załóż tabelę (SQLite) albo partycję (PostgreSQL) miesiąca RRRRMM."""
+    name = table_name(connection, month)
+    if connection.dialect.name == 'postgresql':
+        year, number = divmod(month, 100)
+        end = (year + number // 12, number % 12 + 1)
+        connection.exec_driver_sql(POSTGRES_PARTITION_DDL.format(
+            name=name, start=f'{year:04d}-{number:02d}-01', end=f'{end[0]:04d}-{end[1]:02d}-01'
+        ))
+    else:
+        for statement in SQLITE_MONTH_DDL:
+            connection.exec_driver_sql(statement.format(name=name, base=month * ID_MONTH_BASE))
+
+
+def months(connection):
+    """Miesiące (RRRRMM), dla których są tabele/partycje - od najnowszego."""
+    if connection.dialect.name == 'postgresql':
+        names = connection.exec_driver_sql(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass", (POSTGRES_TABLE,)
+        ).scalars()
+    else:
+        names = connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'audit_[0-9]*'"
+        ).scalars()
+    return sorted((int(name.rsplit('_', 1)[1]) for name in names), reverse=True)
+
+
+def record(group_id, code, task_id=None, user_id=None, **data):
+    """Dopisz wpis do historii grupy w bieżącej transakcji (data - JSON)."""
+    record_many(code, [{'group_id': group_id, 'task_id': task_id, 'user_id': user_id, 'data': data}])
+
+
+def record_many(code, entries):
+    """
+    Wiele wpisów z tym samym kodem jednym INSERT (executemany) - operacje zbiorcze.
+
+    entries: słowniki z group_id i opcjonalnie task_id, user_id, data (słownik)
+    """
+    if not entries:
+        return
+    now = utcnow()
+    month = month_of(now)
+    connection = db.session.connection()
+    _ensure_month(connection, month)
+    actor_id = _actor_id()
+    rows = [
+        {
+            'created_at': now,
+            'group_id': entry['group_id'],
+            'code': code,
+            'actor_id': actor_id,
+            'task_id': entry.get('task_id'),
+            'user_id': entry.get('user_id'),
+            'data': json.dumps(entry['data'], ensure_ascii=False, separators=(',', ':')) if entry.get('data') else None,
+        }
+        for entry in entries
+    ]
+    # PostgreSQL: do tabeli nadrzędnej, wiersz trafia do partycji
+    name = POSTGRES_TABLE if connection.dialect.name == 'postgresql' else table_name(connection, month)
+    connection.execute(_columns(name).insert(), rows)
+
+
+def group_history(group_id, before=None, limit=50):
+    """
+    Strona historii grupy od najnowszych wpisów.
+
+    before - id ostatniego wpisu poprzedniej strony (kursor).
+    Zwraca (wpisy, kursor następnej strony lub None); wpis to słownik:
+    id, created_at, code, actor_id, actor (email), task_id, task (tytuł),
+    user_id, user (email), data.
+    """
+    connection = db.session.connection()
+    rows = []
+    if connection.dialect.name == 'postgresql':
+        rows = _history_rows(connection, POSTGRES_TABLE, group_id, before, limit + 1)
+    else:
+        # od miesiąca kursora wstecz, aż zbierze się strona
+        newest = before // ID_MONTH_BASE if before else None
+        for month in months(connection):
+            if newest is not None and month > newest:
+                continue
+            rows += _history_rows(connection, table_name(connection, month), group_id, before, limit + 1 - len(rows))
+            if len(rows) > limit:
+                break
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+    return _describe(rows), next_cursor
+
+
+def prune(keep_months, now=None):
+    """
+    Usuń (DROP TABLE) miesiące starsze niż keep_months ostatnich, licząc
+    z bieżącym. Zwraca listę usuniętych miesięcy.
+    """
+    connection = db.session.connection()
+    current = month_of(now or utcnow())
+    oldest_kept = shift_month(current, -(max(keep_months, 1) - 1))
+    dropped = [month for month in months(connection) if month < oldest_kept]
+    for month in dropped:
+        connection.exec_driver_sql(f'DROP TABLE {table_name(connection, month)}')
+    _ready.get(connection.engine, set()).difference_update(dropped)
+    return dropped
+
+
+def create_ahead(now=None):
+    """Załóż z góry bieżący i następny miesiąc - pierwszy wpis w miesiącu nie robi wtedy CREATE TABLE."""
+    connection = db.session.connection()
+    current = month_of(now or utcnow())
+    for month in (current, shift_month(current, 1)):
+        create_month(connection, month)
+
+
+def shift_month(month, delta):
+    """Miesiąc RRRRMM przesunięty o delta miesięcy."""
+    year, number = divmod(month, 100)
+    index = year * 12 + number - 1 + delta
+    return index // 12 * 100 + index % 12 + 1
+
+
+def _ensure_month(connection, month):
+    if month in _ready.get(connection.engine, ()):
+        return
+    create_month(connection, month)
+    db.session.info.setdefault('audit_months', set()).add((connection.engine, month))
+
+
+def _history_rows(connection, name, group_id, before, limit):
+    table = _columns(name)
+    query = db.select(table).where(table.c.group_id == group_id)
+    if before:
+        query = query.where(table.c.id < before)
+    return connection.execute(query.order_by(table.c.id.desc()).limit(limit)).all()
+
+
+def _describe(rows):
+    # emaile i tytuły jednym zapytaniem na stronę (bez N+1); usunięte
+    # zadania mają tytuł w data wpisu TASK_DELETED
+    user_ids = {row.actor_id for row in rows} | {row.user_id for row in rows}
+    user_ids.discard(None)
+    task_ids = {row.task_id for row in rows if row.task_id is not None}
+    emails = dict(db.session.execute(db.select(User.id, User.email).where(User.id.in_(user_ids))).all()) if user_ids else {}
+    titles = dict(db.session.execute(db.select(Task.id, Task.title).where(Task.id.in_(task_ids))).all()) if task_ids else {}
+    entries = []
+    for row in rows:
+        data = json.loads(row.data) if row.data else {}
+        entries.append({
+            'id': row.id,
+            'created_at': row.created_at,
+            'code': row.code,
+            'actor_id': row.actor_id,
+            'actor': emails.get(row.actor_id),
+            'task_id': row.task_id,
+            'task': titles.get(row.task_id) or data.get('title'),
+            'user_id': row.user_id,
+            'user': emails.get(row.user_id),
+            'data': data,
+        })
+    return entries
+
+
+def _actor_id():
+    # zalogowany użytkownik requestu; CLI, harmonogram i worker - brak
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+def _remember_months(session):
+    for engine, month in session.info.pop('audit_months', ()):
+        _ready.setdefault(engine, set()).add(month)
+
+
+def _forget_months(session):
+    session.info.pop('audit_months', None)
+
+
+event.listen(db.session, 'after_commit', _remember_months)
+event.listen(db.session, 'after_rollback', _forget_months)
+
+
+@event.listens_for(db.metadata, 'after_create')
+def _create_audit_table(target, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, 'before_drop')
+def _drop_audit_tables(target, connection, **kw):
+    if connection.dialect.name == 'postgresql':
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {POSTGRES_TABLE}')
+        return
+    for month in months(connection):
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {table_name(connection, month)}')
+    _ready.pop(connection.engine, None)
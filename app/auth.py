@@ -0,0 +1,112 @@
+"""
+Widoki autentykacji: rejestracja, logowanie, wylogowanie.
+
+Każda trasa obsługuje:
+1. Walidację danych wejściowych
+2. Logikę biznesową
+3. Operacje w bazie danych
+4. Flash messages dla użytkownika
+5. Przekierowania
+"""
+
+from flask import Blueprint, render_template, flash, redirect, url_for
+from app import db, passwords
+from app.forms import RegistrationForm, LoginForm
+from app.models import User
+from flask_login import login_user, logout_user, current_user, login_required
+
+bp = Blueprint('auth', __name__)
+
+@bp.route("/register", methods=['GET', 'POST'])
+def register():
+    """
+    Rejestracja nowego użytkownika.
+
+    Zabezpieczenia:
+    - Sprawdzanie unikalności emaila przez dodaniem do bazy
+    - Hashowanie hasła
+    - Try-except na wypadek błędów
+    """
+    # Zalogowani użytkownicy nie powinni widizeć formularza rejestracji
+    if current_user.is_authenticated:
+        return redirect(url_for('groups.index'))
+
+    form = RegistrationForm()
+
+    if form.validate_on_submit():
+        #sprawdzenie czy email już istnieje
+        #bez tego dostaniemy crash aplikacji
+        existing_user = User.query.filter_by(email=form.email.data).first()
+        if existing_user:
+            flash('Ten adres email jest już zarejestrowany. Spróbuj się zalogować.', 'warning')
+            return redirect(url_for('auth.register'))
+        
+        # Try-except chroni przed nieoczekiwanymi błędami
+        try:
+            #hasło zawsze hashowane - serwis app.passwords (werkzeug.security)
+            hashed_password = passwords.hash(form.password.data)
+            user = User(email=form.email.data, password=hashed_password)
+
+            db.session.add(user)
+            db.session.commit()
+
+            flash('Twoje konto zostało pomyślnie utworzone. Możesz się teraz zalogować', 'success')
+            return redirect(url_for('auth.login'))
+        
+        except Exception as e:
+            # Kluczowy rollback - bez tego sesja zostaje z niechcianymi danymi
+            db.session.rollback()
+            flash('Wystąpił błąd podczas rejestracji. Spróbuj ponownie.', 'danger')
+
+            # w produkcji logij błąd do pliku
+            #logger.error(f"Registration error: {e})
+
+    return render_template("register.html", title="Rejestracja", form=form)
+
+@bp.route("/login", methods=['GET', 'POST'])
+def login():
+    """
+    Logowanie użytkownika
+    """
+    # jeśli użytkownik jest zalogowany, przekieruj go na stronę główną
+    if current_user.is_authenticated:
+        return redirect(url_for('groups.index'))
+    
+    form = LoginForm()
+
+    if form.validate_on_submit():
+        # Znajdź użytkownika po email
+        user = User.query.filter_by(email=form.email.data).first()
+
+        # Sprawdź czy użytkownik istnieje i czy hasło się zgadza
+        # verify porównuje hash z bazy z wprowadzonym hasłem
+        if user and passwords.verify(user.password, form.password.data):
+            # hash liczony starą metodą/kosztem - przelicz teraz, mamy jawne hasło
+            if passwords.needs_rehash(user.password):
+                try:
+                    user.password = passwords.hash(form.password.data)
+                    db.session.commit()
+                except Exception as e:
+                    # nieudany rehash nie blokuje logowania - spróbujemy następnym razem
+                    db.session.rollback()
+
+            # Flask-Login zarządza sesją
+            # remember=True tworzy "remember me" w cookie
+            login_user(user, remember=form.remember_me.data)
+            flash('Zalogowano pomyślnie!', 'success')
+            return redirect(url_for('groups.index'))
+        else:
+            # nie ujawniaj czy email czy hasło jest złe (względy bezpieczeństwa)
+            flash('Logowanie nie powiodło się. Sprawdź email i hasło', 'danger')
+
+    return render_template('login.html', title="Logowanie", form=form)
+
+@bp.route('/logout')
+@login_required # tylko zalogowani mogą się wylogować
+def logout():
+    """
+    Wylogowanie użytkownika - czyści sesję
+    """
+    logout_user()
+    flash('Zostałeś pomyślnie wylogowany', 'success')
+    return redirect(url_for('groups.index'))
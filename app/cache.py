@@ -0,0 +1,138 @@
+"""
+Prosty cache w pamięci procesu (LRU + TTL) z wymiennym backendem.
+
+Backend to dowolny obiekt z metodami get/set/delete/clear - domyślnie
+LocalBackend (słownik w pamięci). Przy kilku workerach (gunicorn) każdy
+ma własną kopię, więc unieważnienie działa tylko w bieżącym procesie,
+a w pozostałych wpis wygasa po TTL. Jeśli to za długo - podłącz
+współdzielony backend (np. Redis) przez konfigurację <NAZWA>_CACHE_BACKEND.
+
+Backend i liczniki są stanem aplikacji (app.extensions), nie obiektu
+Cache - dwie aplikacje w jednym procesie (np. testy z osobnymi bazami)
+nie widzą nawzajem swoich wpisów.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+
+
+class LocalBackend:
+    """
+    LRU + TTL na OrderedDict.
+
+    Najdawniej używany wpis wylatuje po przekroczeniu maxsize,
+    każdy wpis wygasa po ttl sekundach.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        # workery wielowątkowe - OrderedDict nie jest thread-safe
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class CacheState:
+    """Stan cache jednej aplikacji (app.extensions)."""
+
+    def __init__(self, enabled, backend):
+        self.enabled = enabled
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+
+class Cache:
+    """
+    Cache z licznikami trafień/pudeł.
+
+    Konfiguracja (prefix = name):
+    - <NAME>_CACHE_ENABLED - False wyłącza cache (każde get to pudło)
+    - <NAME>_CACHE_SIZE, <NAME>_CACHE_TTL - parametry LocalBackend
+    - <NAME>_CACHE_BACKEND - własny backend zamiast LocalBackend
+
+    Wartość None oznacza brak wpisu - nie da się jej zapisać.
+    Metody działają na cache bieżącej aplikacji (current_app).
+    """
+
+    def __init__(self, name, app=None):
+        self.name = name
+        self.extension = f'{name.lower()}_cache'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        prefix = f'{self.name}_CACHE'
+        app.extensions[self.extension] = CacheState(
+            enabled=app.config.get(f'{prefix}_ENABLED', True),
+            backend=app.config.get(f'{prefix}_BACKEND') or LocalBackend(
+                maxsize=app.config.get(f'{prefix}_SIZE', 1024),
+                ttl=app.config.get(f'{prefix}_TTL', 300)
+            )
+        )
+
+    @property
+    def state(self):
+        return current_app.extensions[self.extension]
+
+    def get(self, key):
+        state = self.state
+        value = state.backend.get(key) if state.enabled else None
+        # liczniki bez locka - to statystyka, drobne przekłamania nie szkodzą
+        if value is None:
+            state.misses += 1
+        else:
+            state.hits += 1
+        return value
+
+    def set(self, key, value):
+        state = self.state
+        if state.enabled:
+            state.backend.set(key, value)
+
+    def get_or_set(self, key, build):
+        """Wartość z cache, a przy pudle - build() zapisane w cache."""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value)
+        return value
+
+    def delete(self, key):
+        self.state.backend.delete(key)
+
+    def clear(self):
+        self.state.backend.clear()
+
+    def stats(self):
+        state = self.state
+        return {'hits': state.hits, 'misses': state.misses}
@@ -0,0 +1,145 @@
+"""
+Komendy CLI aplikacji (`flask <komenda>`).
+
+Rejestrowane jako blueprint bez prefiksu (cli_group=None), więc są
+dostępne bezpośrednio, np. `flask recount-tasks`.
+"""
+
+import click
+from flask import Blueprint, current_app
+from app import db, services, jobs, recurrence, audit, archive
+from app.importer import Importer, DataImportError
+
+bp = Blueprint('cli', __name__, cli_group=None)
+
+
+@bp.cli.command('recount-tasks')
+@click.option('--check', is_flag=True, help='Tylko pokaż rozjechane liczniki, nic nie zmieniaj.')
+def recount_tasks(check):
+    """Przelicz liczniki zadań grup (open_count, completed_count)."""
+    drift = services.recount_task_counters(fix=not check)
+    for group_id, stored, real in drift:
+        click.echo(f'grupa {group_id}: otwarte {stored[0]} -> {real[0]}, zrobione {stored[1]} -> {real[1]}')
+
+    if check:
+        click.echo(f'Rozjechane liczniki: {len(drift)} grup.')
+        if drift:
+            raise SystemExit(1)
+        return
+
+    db.session.commit()
+    click.echo(f'Poprawiono liczniki: {len(drift)} grup.')
+
+
+@bp.cli.command('import-data')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=10000, show_default=True, help='Ile wierszy w jednym INSERT (executemany).')
+def import_data(paths, batch_size):
+    """
+    Importuj użytkowników, grupy, członków i zadania z plików JSONL/CSV.
+
+    Pliki w kolejności zależności (np. users, groups, members, tasks) -
+    format rekordów opisuje app.importer.
+    """
+    last_report = [0.0]
+
+    def progress(summary):
+        # najwyżej raz na sekundę
+        if summary['seconds'] - last_report[0] < 1:
+            return
+        last_report[0] = summary['seconds']
+        click.echo(_import_summary(summary), err=True)
+
+    importer = Importer(batch_size=batch_size, progress=progress)
+    try:
+        for path in paths:
+            click.echo(f'{path}...', err=True)
+            importer.import_file(path)
+        summary = importer.finish()
+        db.session.commit()
+    except DataImportError as e:
+        db.session.rollback()
+        raise click.ClickException(f'{e} - import wycofany.')
+
+    click.echo(f'Zaimportowano: {_import_summary(summary)}')
+
+
+def _import_summary(summary):
+    seconds = summary['seconds']
+    rate = summary['tasks'] / seconds if seconds else 0
+    return (f'użytkownicy {summary["users"]}, grupy {summary["groups"]}, członkowie {summary["members"]}, '
+            f'zadania {summary["tasks"]} ({rate:.0f}/s) w {seconds:.1f} s')
+
+
+@bp.cli.command('schedule-recurring')
+@click.option('--batch-size', default=1000, show_default=True, help='Ile serii w jednej transakcji.')
+@click.option('--budget', default=30.0, show_default=True, help='Limit czasu przebiegu (s); reszta w następnym.')
+def schedule_recurring(batch_size, budget):
+    """
+    Utwórz kolejne wystąpienia zadań powtarzanych, których termin minął.
+
+    Uruchamiać cyklicznie (cron, np. co 5 minut) - app.recurrence.
+    """
+    stats = recurrence.materialize_due(batch_size=batch_size, budget=budget)
+    rate = stats['rules'] / stats['seconds'] if stats['seconds'] else 0
+    click.echo(f'Serie: {stats["rules"]} ({rate:.0f}/s), nowe zadania: {stats["created"]}, '
+               f'błędne reguły: {stats["invalid"]}, paczki: {stats["batches"]} w {stats["seconds"]:.1f} s'
+               + ('' if stats['complete'] else ' - przerwano (budżet czasu), reszta w następnym przebiegu'))
+
+
+@bp.cli.command('archive-tasks')
+@click.option('--days', type=int, help='Zrobione ponad tyle dni temu; domyślnie ARCHIVE_AFTER_DAYS.')
+@click.option('--batch-size', default=1000, show_default=True, help='Ile zadań w jednej transakcji.')
+@click.option('--budget', type=float, help='Limit czasu przebiegu (s); reszta w następnym.')
+def archive_tasks(days, batch_size, budget):
+    """
+    Przenieś dawno zrobione zadania do archiwum (task_archive).
+
+    Uruchamiać cyklicznie (cron, np. raz na noc) - app.archive.
+    """
+    stats = archive.archive_completed(days=days, batch_size=batch_size, budget=budget)
+    rate = stats['tasks'] / stats['seconds'] if stats['seconds'] else 0
+    click.echo(f'Zarchiwizowano zadań: {stats["tasks"]} ({rate:.0f}/s), paczki: {stats["batches"]} '
+               f'w {stats["seconds"]:.1f} s'
+               + ('' if stats['complete'] else ' - przerwano (budżet czasu), reszta w następnym przebiegu'))
+
+
+@bp.cli.command('jobs-worker')
+@click.option('--concurrency', type=int, help='Ile zadań naraz (wątków); domyślnie JOBS_WORKERS.')
+@click.option('--once', is_flag=True, help='Wykonaj zaległe zadania i zakończ.')
+def jobs_worker(concurrency, once):
+    """Wykonuj zadania w tle z kolejki w bazie (JOBS_BACKEND=database)."""
+    if jobs.backend != 'database':
+        click.echo(f'Uwaga: JOBS_BACKEND={jobs.backend} - aplikacja nie zapisuje zadań w bazie.', err=True)
+    click.echo(f'Worker: {concurrency or jobs.workers} wątków, Ctrl+C kończy.', err=True)
+    jobs.work(current_app._get_current_object(), concurrency=concurrency, once=once)
+    click.echo(_jobs_summary(jobs.counts()))
+
+
+@bp.cli.command('jobs-status')
+@click.option('--prune', type=int, metavar='DNI', help='Usuń zakończone zadania starsze niż DNI dni.')
+def jobs_status(prune):
+    """Zadania w tle w kolejce w bazie według statusu."""
+    if prune is not None:
+        removed = jobs.prune(prune)
+        db.session.commit()
+        click.echo(f'Usunięto zakończonych zadań: {removed}.')
+    click.echo(_jobs_summary(jobs.counts()))
+
+
+def _jobs_summary(counts):
+    return ', '.join(f'{status} {counts.get(status, 0)}' for status in ('pending', 'running', 'done', 'failed'))
+
+
+@bp.cli.command('audit-prune')
+@click.option('--months', type=int, help='Ile ostatnich miesięcy zostawić (z bieżącym); domyślnie AUDIT_RETENTION_MONTHS.')
+def audit_prune(months):
+    """
+    Usuń historię grup starszą niż podana liczba miesięcy (DROP TABLE miesiąca).
+
+    Zakłada też z góry bieżący i następny miesiąc. Uruchamiać raz dziennie (cron) - app.audit.
+    """
+    dropped = audit.prune(months or current_app.config['AUDIT_RETENTION_MONTHS'])
+    audit.create_ahead()
+    db.session.commit()
+    click.echo(f'Usunięte miesiące: {", ".join(map(str, dropped)) or "brak"}.')
@@ -0,0 +1,139 @@
+"""
+Dekoratory i pomocnicze funkcje autoryzacji dla widoków.
+
+Każda chroniona trasa potrzebuje tego samego: grupy i roli current_user
+w tej grupie. Zamiast kopiować get_or_404 + filter_by(...) w każdym
+widoku, robimy to w jednym miejscu:
+- rola jest w cache między requestami (membership_cache) razem z wersją
+  grupy, przy której ją odczytano; trafienie jest ważne tylko, gdy wersja
+  grupy w bazie się zgadza. Każda zmiana członkostwa podbija wersję
+  (FamilyGroup.touch), więc odebranie dostępu działa od razu we wszystkich
+  workerach, nie dopiero po TTL lokalnego cache. invalidate_membership
+  tylko zwalnia wpis w bieżącym procesie.
+- trasy pojedynczego zadania biorą zadanie i rolę jednym zapytaniem
+  (get_task_access) - bez cache, więc rola zawsze jest aktualna
+- wynik jest zapamiętywany w flask.g - kolejne sprawdzenia w tym samym
+  requeście są darmowe
+"""
+
+from collections import namedtuple
+from functools import wraps
+from flask import g, flash, redirect, url_for, abort, current_app
+from flask_login import current_user
+from app import db, membership_cache
+from app.models import FamilyGroup, GroupMember, Task
+
+# group: FamilyGroup lub None (brak grupy)
+# role: rola current_user w grupie lub None (nie należy do grupy)
+GroupAccess = namedtuple('GroupAccess', ['group', 'role'])
+
+
+def _membership_key(user_id, group_id):
+    return f'{user_id}:{group_id}'
+
+
+def invalidate_membership(user_id, group_id):
+    """
+    Usuń rolę z cache bieżącego procesu po zmianie członkostwa.
+
+    Inne workery nie potrzebują unieważnienia - zmiana podbiła wersję
+    grupy, więc ich wpisy przestają pasować przy następnym sprawdzeniu.
+    """
+    membership_cache.delete(_membership_key(user_id, group_id))
+    g.pop('group_access', None)
+
+
+def get_task_access(task_id):
+    """
+    Zadanie i rola current_user w jego grupie: (task, role).
+
+    Jedno zapytanie (zadanie LEFT JOIN członkostwo) - tyle samo, ile samo
+    pobranie zadania, więc rola nie idzie przez cache i jest zawsze świeża.
+    (None, None) - nie ma takiego zadania; role None - obca grupa.
+    """
+    row = db.session.query(Task, GroupMember.role).outerjoin(
+        GroupMember,
+        db.and_(
+            GroupMember.group_id == Task.group_id,
+            GroupMember.user_id == current_user.id
+        )
+    ).filter(Task.id == task_id).first()
+    return tuple(row) if row else (None, None)
+
+
+def get_group_access(group_id):
+    """
+    Grupa i rola current_user.
+
+    Rola z cache -> zostaje tylko pobranie grupy po kluczu głównym;
+    wpis jest ważny, jeśli wersja grupy się nie zmieniła (inaczej
+    dociągamy rolę z bazy). Bez cache - jedno zapytanie (grupa LEFT JOIN
+    członkostwo). Wynik jest zapamiętywany w flask.g na czas requestu.
+    """
+    cache = g.setdefault('group_access', {})
+    if group_id in cache:
+        return cache[group_id]
+
+    key = _membership_key(current_user.id, group_id)
+    cached = membership_cache.get(key)
+    if cached is not None:
+        role, version = cached
+        group = db.session.get(FamilyGroup, group_id)
+        if group is not None and group.version != version:
+            # grupa zmieniła się od zapisu w cache (np. w innym workerze)
+            role = db.session.query(GroupMember.role).filter_by(
+                user_id=current_user.id,
+                group_id=group_id
+            ).scalar()
+            if role is not None:
+                membership_cache.set(key, (role, group.version))
+            else:
+                membership_cache.delete(key)
+        access = GroupAccess(group, role)
+    else:
+        row = db.session.query(FamilyGroup, GroupMember.role).outerjoin(
+            GroupMember,
+            db.and_(
+                GroupMember.group_id == FamilyGroup.id,
+                GroupMember.user_id == current_user.id
+            )
+        ).filter(FamilyGroup.id == group_id).first()
+
+        access = GroupAccess(*row) if row else GroupAccess(None, None)
+        if access.role is not None:
+            membership_cache.set(key, (access.role, access.group.version))
+
+    cache[group_id] = access
+    return access
+
+
+def group_member_required(role=None, message='Tylko administrator może wykonać tę operację.'):
+    """
+    Wpuszcza do widoku tylko członków grupy <group_id> z URL.
+
+    role: wymagana rola (np. 'admin') albo None - wystarczy członkostwo
+    message: flash message gdy rola się nie zgadza
+
+    Widok dostaje dodatkowo argumenty group i role (rola current_user).
+    Używać pod @login_required.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_view(*args, **kwargs):
+            group, current_role = get_group_access(kwargs['group_id'])
+
+            if group is None:
+                abort(404)
+
+            if current_role is None:
+                flash('Nie masz dostępu do tej grupy.', 'danger')
+                return redirect(url_for('groups.index'))
+
+            if role is not None and current_role != role:
+                flash(message, 'warning')
+                return redirect(url_for('groups.group_details', group_id=group.id))
+
+            # ensure_sync - dekorator działa też na widokach async (app.async_views)
+            return current_app.ensure_sync(f)(*args, group=group, role=current_role, **kwargs)
+        return decorated_view
+    return decorator
@@ -0,0 +1,112 @@
+"""
+Konfiguracja silnika bazy danych.
+
+- serwerowe bazy (Postgres, MySQL): pula połączeń z configu
+  (rozmiar, overflow, recycle, pre-ping)
+- SQLite w pliku: WAL, synchronous=NORMAL, busy timeout, klucze obce -
+  bez tego równoległe zapisy kończą się "database is locked"
+- statystyki puli (ile pobrań połączenia i ile trwało czekanie)
+"""
+
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool liczący pobrania połączeń i czas oczekiwania na wolne połączenie.
+
+    Czas obejmuje też otwarcie nowego połączenia, jeśli pula go nie miała.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return connection
+
+
+def _is_sqlite_memory(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    Opcje create_engine (SQLALCHEMY_ENGINE_OPTIONS) na podstawie configu.
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+
+    # SQLite w pamięci - Flask-SQLAlchemy sam ustawia StaticPool, nie ruszamy
+    if _is_sqlite_memory(url):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if url.get_backend_name() == 'sqlite':
+        # połączenie do pliku nie zrywa się - recycle i pre-ping to zbędne zapytania
+        options['pool_recycle'] = -1
+        options['pool_pre_ping'] = False
+        # timeout sterownika sqlite3 (sekundy) - czekaj na blokadę zamiast od razu błędu
+        options['connect_args'] = {'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000}
+    return options
+
+
+def configure_engine(app, engine):
+    """
+    Podpina PRAGMA dla SQLite - wykonywane dla każdego nowego połączenia.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    use_wal = app.config['SQLITE_WAL'] and not _is_sqlite_memory(engine.url)
+    busy_timeout = app.config['SQLITE_BUSY_TIMEOUT']
+    foreign_keys = app.config['SQLITE_FOREIGN_KEYS']
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if use_wal:
+            # WAL: czytelnicy nie blokują pisarza i odwrotnie
+            cursor.execute('PRAGMA journal_mode=WAL')
+            # w trybie WAL NORMAL jest bezpieczne i dużo szybsze niż FULL
+            cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute(f'PRAGMA busy_timeout={int(busy_timeout)}')
+        cursor.execute(f'PRAGMA foreign_keys={"ON" if foreign_keys else "OFF"}')
+        cursor.close()
+
+
+def pool_stats(engine):
+    """
+    Statystyki puli połączeń jako słownik (pusty dla puli bez instrumentacji).
+    """
+    pool = engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {}
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'overflow': pool.overflow(),
+        'checkouts': pool.checkouts,
+        'wait_seconds_total': pool.wait_total,
+        'wait_seconds_max': pool.wait_max,
+    }
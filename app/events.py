@@ -0,0 +1,269 @@
+"""
+Zdarzenia zmian w grupach (Server-Sent Events).
+
+Operacje z app.services zapisują zdarzenia (utworzone/przełączone/usunięte
+zadanie, dodany/usunięty członek) w bieżącej sesji bazy - publikowane są
+dopiero po udanym commit, a po rollback przepadają. Klienci słuchają ich
+przez GET /api/v1/groups/<id>/events i poprawiają widok zamiast
+przeładowywać całą stronę.
+
+Broker działa w pamięci procesu (LocalBroker) - przy kilku workerach
+każdy widzi tylko zdarzenia ze swoich requestów. Współdzielony broker
+(np. Redis pub/sub) podłączamy przez EVENTS_BACKEND - wystarczą metody
+subscribe/unsubscribe/publish.
+
+Broker i ustawienia są stanem aplikacji (app.extensions['events']) -
+druga aplikacja w procesie ma własny broker.
+
+Otwarty strumień zajmuje wątek workera (serwer wątkowy, adapter ASGI) albo
+greenlet (gunicorn -k gevent, gunicorn.conf.py - subskrybent czeka na
+queue.Queue, po monkey-patchingu to nie blokuje procesu). Liczbę strumieni
+w procesie ogranicza EVENTS_MAX_STREAMS - ponad limit klient dostaje 503
+z Retry-After, a zwykłe requesty zawsze mają wolne wątki.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import defaultdict
+from flask import current_app
+from sqlalchemy import event
+
+# "koniec strumienia" - wysyłane do subskrybenta, którego kolejka się przepełniła
+OVERFLOW = object()
+
+
+class StreamLimitError(Exception):
+    """W procesie jest już EVENTS_MAX_STREAMS otwartych strumieni."""
+
+
+class LocalBroker:
+    """
+    Pub/sub w pamięci procesu - kanał to id grupy, każdy subskrybent
+    ma własną ograniczoną kolejkę.
+
+    Wolny klient nie blokuje publikującego: gdy jego kolejka jest pełna,
+    dostaje OVERFLOW i musi się połączyć ponownie (resync).
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(q)
+        return q
+
+    def unsubscribe(self, channel, q):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                self.unsubscribe(channel, q)
+                # zrób miejsce na OVERFLOW - i tak zaraz rozłączamy
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    q.put_nowait(OVERFLOW)
+                except queue.Full:
+                    pass
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._subscribers.get(channel, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class EventsState:
+    """Broker i ustawienia strumieni jednej aplikacji."""
+
+    def __init__(self, enabled, broker, keepalive, stream_timeout, max_streams):
+        self.enabled = enabled
+        self.broker = broker
+        self.keepalive = keepalive
+        self.stream_timeout = stream_timeout
+        self.max_streams = max_streams
+        self.open_streams = 0
+        self._lock = threading.Lock()
+
+    def acquire_stream(self):
+        """Zajmij miejsce na strumień - False, gdy limit procesu jest wyczerpany."""
+        with self._lock:
+            if self.max_streams and self.open_streams >= self.max_streams:
+                return False
+            self.open_streams += 1
+            return True
+
+    def release_stream(self):
+        with self._lock:
+            self.open_streams -= 1
+
+
+class Events:
+    """
+    Rozszerzenie: zdarzenia z sesji bazy -> broker -> strumienie SSE.
+
+    Konfiguracja:
+    - EVENTS_ENABLED - False: zdarzenia nie są zbierane ani publikowane
+    - EVENTS_QUEUE_SIZE - rozmiar kolejki jednego subskrybenta
+    - EVENTS_KEEPALIVE - co ile sekund komentarz ": ping" (proxy nie zamyka połączenia)
+    - EVENTS_STREAM_TIMEOUT - po ilu sekundach zamknąć strumień (klient
+      łączy się ponownie z Last-Event-ID, a my znów sprawdzamy członkostwo)
+    - EVENTS_BACKEND - własny broker zamiast LocalBroker
+    - EVENTS_MAX_STREAMS - limit otwartych strumieni w procesie (0 = bez limitu)
+    """
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.extensions['events'] = EventsState(
+            enabled=app.config.get('EVENTS_ENABLED', True),
+            broker=app.config.get('EVENTS_BACKEND') or LocalBroker(
+                queue_size=app.config.get('EVENTS_QUEUE_SIZE', 100)
+            ),
+            keepalive=app.config.get('EVENTS_KEEPALIVE', 15),
+            stream_timeout=app.config.get('EVENTS_STREAM_TIMEOUT', 300),
+            max_streams=app.config.get('EVENTS_MAX_STREAMS', 0),
+        )
+        self._db = db
+
+        # jedna rejestracja na sesję (wspólną dla aplikacji) - broker wybiera current_app
+        if not event.contains(db.session, 'after_commit', self._publish_pending):
+            event.listen(db.session, 'after_commit', self._publish_pending)
+            event.listen(db.session, 'after_rollback', self._discard_pending)
+
+    def record(self, group_id, version, type, **data):
+        """
+        Zapamiętaj zdarzenie w bieżącej transakcji - opublikujemy je po commit.
+
+        version - wersja grupy po tej zmianie (id zdarzenia w SSE).
+        """
+        if not self.state.enabled:
+            return
+        message = {'type': type, 'group_id': group_id, 'version': version, **data}
+        self._db.session.info.setdefault('pending_events', []).append(message)
+
+    @property
+    def state(self):
+        return current_app.extensions['events']
+
+    @property
+    def enabled(self):
+        return self.state.enabled
+
+    def publish(self, message):
+        self.state.broker.publish(message['group_id'], message)
+
+    def _publish_pending(self, session):
+        for message in session.info.pop('pending_events', ()):
+            self.publish(message)
+
+    def _discard_pending(self, session):
+        session.info.pop('pending_events', None)
+
+    def stream(self, group_id, version, last_event_id=None, user_id=None):
+        """
+        Generator strumienia SSE dla grupy.
+
+        Generator nie korzysta z kontekstu aplikacji ani sesji bazy (broker
+        i ustawienia bierzemy przy wywołaniu) - połączenie z bazą wraca
+        do puli zanim klient zacznie słuchać.
+
+        Gdy klient wraca z Last-Event-ID starszym niż obecna wersja grupy,
+        część zdarzeń mogła go ominąć - dostaje "resync" (przeładuj widok).
+        user_id - zamknij strumień, gdy ten użytkownik zostanie usunięty z grupy.
+
+        StreamLimitError, gdy w procesie jest już EVENTS_MAX_STREAMS strumieni.
+        Miejsce i subskrypcja są zwalniane przy zamknięciu strumienia (close()),
+        także takiego, z którego nic jeszcze nie przeczytano.
+        """
+        state = self.state
+        if not state.acquire_stream():
+            raise StreamLimitError(state.max_streams)
+        broker = state.broker
+        q = broker.subscribe(group_id)
+        keepalive, timeout = state.keepalive, state.stream_timeout
+        released = []
+
+        def release():
+            if not released:
+                released.append(True)
+                broker.unsubscribe(group_id, q)
+                state.release_stream()
+
+        def generate():
+            try:
+                yield 'retry: 3000\n\n'
+                if last_event_id is not None and last_event_id != version:
+                    yield _sse('resync', {'group_id': group_id, 'version': version}, version)
+                else:
+                    yield _sse('hello', {'group_id': group_id, 'version': version}, version)
+
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    try:
+                        message = q.get(timeout=min(keepalive, remaining))
+                    except queue.Empty:
+                        yield ': ping\n\n'
+                        continue
+                    if message is OVERFLOW:
+                        yield _sse('resync', {'group_id': group_id}, None)
+                        return
+                    yield _sse(message['type'], message, message['version'])
+                    if message['type'] == 'member.removed' and message.get('user_id') == user_id:
+                        return
+            finally:
+                release()
+
+        return _Stream(generate(), release)
+
+
+class _Stream:
+    """Generator strumienia, którego close() zwalnia zasoby także przed pierwszym next()."""
+
+    def __init__(self, generator, release):
+        self._generator = generator
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._generator)
+
+    def close(self):
+        try:
+            self._generator.close()
+        finally:
+            self._release()
+
+
+def _sse(event_type, data, event_id):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_type}')
+    lines.append('data: ' + json.dumps(data, separators=(',', ':'), default=str))
+    return '\n'.join(lines) + '\n\n'
@@ -5,8 +5,9 @@ Flask-WTF automatycznie dodaje CSRF protection do wszystkich formularzy.
 """
 
 from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField, SelectField
-from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError
+from wtforms import StringField, PasswordField, BooleanField, SubmitField, TextAreaField, SelectField, DateTimeLocalField
+from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError, Optional
+from app.recurrence import RECURRENCE_CHOICES
 import re
 
 class RegistrationForm(FlaskForm):
@@ -102,4 +103,24 @@ class CreateTaskForm(FlaskForm):
     #to wypełniamy dynamicznie w trasie
     assigned_to = SelectField('Przypisz do', coerce=int)
 
-    submit = SubmitField('Dodaj zadanie')
\ No newline at end of file
+    # termin w UTC (jak daty utworzenia); API przyjmuje też sekundy
+    due_at = DateTimeLocalField('Termin (opcjonalnie)',
+                                format=['%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S'],
+                                validators=[Optional()])
+
+    recurrence = SelectField('Powtarzaj', choices=RECURRENCE_CHOICES, default='')
+
+    submit = SubmitField('Dodaj zadanie')
+
+    def validate_recurrence(self, recurrence):
+        # kolejne terminy liczymy od terminu zadania
+        if recurrence.data and not self.due_at.data:
+            raise ValidationError('Zadanie powtarzane musi mieć termin.')
+
+class BulkTaskForm(FlaskForm):
+    """
+    Operacje na wielu zaznaczonych zadaniach (checkboxy task_ids na liście).
+    """
+    complete = SubmitField('Oznacz jako zrobione')
+    reopen = SubmitField('Oznacz jako do zrobienia')
+    delete = SubmitField('Usuń zaznaczone')
@@ -0,0 +1,48 @@
+"""
+Cache fragmentów HTML - listy zadań i członków grupy.
+
+Większość wyświetleń strony grupy trafia między zmianami, więc ten sam
+fragment renderowałby się za każdym razem tak samo. Klucz zawiera
+FamilyGroup.version (podbijaną przy każdej zmianie zadań i członków)
+i rolę oglądającego - po zmianie powstaje nowy klucz, a stary wpis
+wypada z LRU lub po TTL. Nie trzeba niczego unieważniać ręcznie.
+
+We fragmencie nie może być nic zależnego od sesji (np. tokenu CSRF) -
+formularze z hidden_tag() zostają w szablonie strony.
+"""
+
+from markupsafe import Markup
+from app import fragment_cache
+
+
+def group_fragment(name, group, role, vary, build):
+    """
+    Fragment HTML grupy z cache.
+
+    name: nazwa fragmentu ('tasks', 'members')
+    vary: pozostałe elementy klucza, od których zależy HTML
+          (filtry, strona, id oglądającego, jeśli szablon go używa)
+    build: funkcja zwracająca (html, dane) - dane trafiają do cache
+           razem z HTML (np. kursor następnej strony)
+
+    Zwraca (Markup(html), dane).
+    """
+    html, data = fragment_cache.get_or_set(_key(name, group, role, vary), build)
+    return Markup(html), data
+
+
+async def group_fragment_async(name, group, role, vary, build):
+    """
+    Jak group_fragment, ale build to funkcja async (widoki z app.async_views).
+    """
+    key = _key(name, group, role, vary)
+    value = fragment_cache.get(key)
+    if value is None:
+        value = await build()
+        fragment_cache.set(key, value)
+    html, data = value
+    return Markup(html), data
+
+
+def _key(name, group, role, vary):
+    return ':'.join(str(part) for part in ('fragment', name, group.id, group.version, role, *vary))
@@ -0,0 +1,220 @@
+"""
+Widoki grup rodzinnych: strona główna, tworzenie i edycja grup, członkowie.
+
+Każda trasa obsługuje:
+1. Walidację danych wejściowych
+2. Logikę biznesową
+3. Operacje w bazie danych
+4. Flash messages dla użytkownika
+5. Przekierowania
+"""
+
+from flask import Blueprint, render_template, flash, redirect, url_for, request, current_app
+from app import db, services, audit
+from app.forms import CreateGroupForm, AddMemberForm, EditGroupForm
+from app.models import User, GroupMember, FamilyGroup
+from app.decorators import group_member_required, invalidate_membership
+from app.queries import user_dashboard, group_member_list
+from app.fragments import group_fragment
+from flask_login import current_user, login_required
+
+bp = Blueprint('groups', __name__)
+
+@bp.route("/")
+def index():
+    """
+    Strona główna aplikacji.
+
+    Dla zalogowanych: lista grup
+    Dla niezalogowanych: landing page
+    """
+    groups = []
+    if current_user.is_authenticated:
+        # grupy użytkownika z rolą, liczbą członków i zadań - jednym zapytaniem
+        groups = user_dashboard(current_user.id)
+    return render_template("index.html", title='Strona główna', groups=groups)
+
+@bp.route('/create_group', methods=['GET', 'POST'])
+@login_required 
+def create_group():
+    """
+    Tworzenie nowej grupy rodzinnej.
+    
+    Proces:
+    1. Utwórz grupę
+    2. Utwórz członkostwo z rolą 'admin'
+    3. Dodaj OBA do sesji i commituj razem
+    """
+    form = CreateGroupForm()
+    if form.validate_on_submit():
+        try:
+            # Nowa grupa
+            new_group = FamilyGroup(name=form.name.data)
+
+            # Twórca grupy automatycznie staje się adminem
+            new_membership = GroupMember(
+                user_id=current_user.id,
+                group=new_group,
+                role='admin')
+            
+            # Dodaj oba obiekty - SQLAlchemy automatycznie ustawi IDs po commit
+            db.session.add(new_group)
+            db.session.add(new_membership)
+            db.session.commit()
+            invalidate_membership(current_user.id, new_group.id)
+
+            flash(f'Grupa "{new_group.name}" została utworzona.', 'success')
+
+            # Przekieruj użytkownika do nowo utworzonej grupy
+            return redirect(url_for('groups.group_details', group_id=new_group.id))
+        except Exception as e:
+            db.session.rollback()
+            flash('Wystąpił błąd podczas tworzenia grupy. Spróbuj ponownie.', 'danger')
+            # w produkcji: app.logger.error(f"Create group error: {e}")
+
+    return render_template('create_group.html', title="Utwórz grupę", form=form)
+
+@bp.route('/group/<int:group_id>', methods=['GET', 'POST'])
+@login_required
+@group_member_required()
+def group_details(group_id, group, role):
+    """
+    Szczegóły grupy + dodawanie członków.
+
+    KLUCZOWE ZABEZPIECZENIE:
+    sprawdzamy czy current_user należy do grupy przez pokazaniem danych.
+    Bez tego każdy zalogowany mógłby zobaczyć wszyskie grupy
+    (robi to @group_member_required - 404 dla nieistniejącej grupy,
+    redirect dla nie-członków)
+    """
+    form = AddMemberForm()
+
+    #obsługa dodawania członków (tylko dla admina)
+    if form.validate_on_submit():
+        # Sprawdź uprawnienia - tylko admin może dodawać członków
+        if role != 'admin':
+            flash('Tylko administrator grupy może dodawać członków.', 'warning')
+            return redirect(url_for('groups.group_details', group_id=group_id))
+        
+        #znajdź użytkownika do dodania
+        user_to_add = User.query.filter_by(email=form.email.data).first()
+
+        #walidacja czy użytkownik istnieje i czy należy do grupy
+        if not user_to_add:
+            flash('Użytkownik o tym adresie email nie istnieje.', 'danger')
+        elif GroupMember.query.filter_by(user_id=user_to_add.id, group_id=group.id).first():
+            flash('Ten użytkownik jest już członkiem tej grupy.', 'warning')
+        else:
+            # wszystko ok - dodaj członka
+            try:
+                services.add_member(group, user_to_add) #nowi członkowie zawsze jako 'member'
+                db.session.commit()
+                invalidate_membership(user_to_add.id, group.id)
+                flash(f'Użytkownik {user_to_add.email} został dodany do grupy.', 'success')
+            except Exception  as e:
+                db.session.rollback()
+                flash('Wystąpił błąd podczas dodawania członka.', 'danger')
+                # W produkcji: app.logger.error(f"Add member error: {e}")
+
+        # redirect żeby uniknąć ponownego wysłania formularza przy odświeżeniu
+        return redirect(url_for('groups.group_details', group_id=group.id))
+    
+    def build():
+        members = group_member_list(group.id)
+        html = render_template('_member_list.html', group=group, members=members, current_role=role)
+        return html.strip(), None
+
+    # lista członków z cache fragmentów (admin nie ma "Usuń" przy sobie - jego id w kluczu)
+    viewer = current_user.id if role == 'admin' else ''
+    member_list, _ = group_fragment('members', group, role, (viewer,), build)
+
+    # Renderuj szablon z danymi grupy
+    return render_template('group_details.html', title=group.name, group=group, form=form,
+                           member_list=member_list, current_role=role)
+
+@bp.route('/group/<int:group_id>/history')
+@login_required
+@group_member_required()
+def group_history(group_id, group, role):
+    """
+    Historia zmian w grupie (app.audit) - od najnowszych, kolejne strony
+    po kursorze before (id ostatniego wpisu), bez OFFSET.
+    """
+    before = request.args.get('before', type=int)
+    entries, next_cursor = audit.group_history(group.id, before=before,
+                                               limit=current_app.config['AUDIT_PER_PAGE'])
+
+    return render_template('group_history.html',
+                           title=f'Historia - {group.name}',
+                           group=group,
+                           entries=entries,
+                           labels=audit.LABELS,
+                           next_cursor=next_cursor,
+                           current_role=role)
+
+@bp.route('/group/<int:group_id>/edit', methods=['GET', 'POST'])
+@login_required
+@group_member_required(role='admin', message='Tylko administrator może edytować grupę.')
+def edit_group(group_id, group, role):
+    """
+    Edycja nazwy grupy (tylko admin)
+    """
+
+    form = EditGroupForm()
+
+    if form.validate_on_submit():
+        try:
+            old_name = group.name
+            services.rename_group(group, form.name.data)
+            db.session.commit()
+
+            flash(f'Nazwa grupy zmieniona z "{old_name}" na "{group.name}".', 'success')
+            return redirect(url_for('groups.group_details', group_id=group.id))
+        
+        except Exception as e:
+            db.session.rollback()
+            flash('Wystąpił błąd podczas edycji grupy.', 'danger')
+
+    #wypełnij formularz obecną nazwą
+    if not form.is_submitted():
+        form.name.data = group.name
+
+    return render_template('edit_group.html',
+                           title=f'Edytuj - {group.name}',
+                           form=form,
+                           group=group)
+
+@bp.route('/group/<int:group_id>/remove_member/<int:user_id>', methods=['POST'])
+@login_required
+@group_member_required(role='admin', message='Tylko administrator może usuwać członków.')
+def remove_member(group_id, user_id, group, role):
+    """
+    Usuwanie członka z grupy (tylko administrator).
+
+    Nie można usunąć ostatniego admina
+    """
+    #znajdź członkostwo do usunięcia
+    membership_to_remove = GroupMember.query.filter_by(
+        user_id=user_id,
+        group_id=group_id
+    ).first_or_404()
+
+    # nie pozwól usunąć siebie jeśli jesteś jedynym adminem
+    if user_id == current_user.id and services.is_last_admin(group_id, user_id):
+        flash('Nie możesz usunąć siebie - jesteś jedynym administratorem grupy.', 'warning')
+        return redirect(url_for('groups.group_details', group_id=group.id))
+        
+    try:
+        user_email = membership_to_remove.user.email
+        services.remove_member(membership_to_remove)
+        db.session.commit()
+        # od razu odbierz dostęp - nie czekaj na wygaśnięcie cache
+        invalidate_membership(user_id, group_id)
+
+        flash(f'Użytkownik {user_email} został usunięty z grupy', 'success')
+
+    except Exception as e:
+        db.session.rollback()
+        flash('Wystąpił błąd podczas usuwania członka.', 'danger')
+
+    return redirect(url_for('groups.group_details', group_id=group.id))
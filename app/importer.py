@@ -0,0 +1,295 @@
+"""
+Import danych z plików JSONL/CSV (`flask import-data`) - kopie stagingowe,
+dane do benchmarków, migracje z innych systemów.
+
+Rekordy (pole/kolumna "type", a gdy jej nie ma - z nazwy pliku:
+users.csv, groups.jsonl, members.csv, tasks.jsonl):
+
+- user:   email, password (jawne) albo password_hash (gotowy hash werkzeug)
+- group:  name
+- member: email, group, role (domyślnie member)
+- task:   group, title, description, created_by (email), assigned_to (email),
+          is_completed, created_at, completed_at, due_at (ISO 8601),
+          recurrence ('weekly', ...); zrobione bez completed_at - czas importu
+          (archiwizacja, app.archive, liczy dni od niego)
+
+Grupy wskazujemy nazwą ("group") albo id ("group_id"); użytkowników
+emailem. Rekord może odwoływać się tylko do obiektów z bazy albo
+wcześniejszych rekordów importu.
+
+Szybkość:
+- id nadajemy sami (max(id) + 1, ...), więc mapy email -> id i nazwa -> id
+  są w pamięci i nie potrzeba zapytania na rekord
+- wiersze zbieramy w paczki i wstawiamy Core INSERT (executemany),
+  zawsze w kolejności kluczy obcych: użytkownicy, grupy, członkowie, zadania
+- jawne hasła hashujemy raz na unikalne hasło; przy dużych importach
+  lepiej podać password_hash
+- liczniki zadań grup zbieramy w pamięci i zapisujemy jednym executemany
+- indeks wyszukiwania (SQLite FTS5) uzupełniamy na końcu jednym
+  INSERT ... SELECT zamiast triggera na każdy wiersz
+
+Całość to jedna transakcja - błąd w dowolnym rekordzie wycofuje import.
+Import nadaje id sam, więc nie uruchamiać go równolegle z ruchem w aplikacji.
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime, timezone
+from app import db, passwords, search
+from app.recurrence import parse_rule, anchor_rule
+from app.models import User, FamilyGroup, GroupMember, Task, ArchivedTask, utcnow
+
+# kolejność zapisu paczek - tabele nadrzędne przed podrzędnymi
+MODELS = (User, FamilyGroup, GroupMember, Task)
+
+RECORD_TYPES = {'user': User, 'group': FamilyGroup, 'member': GroupMember, 'task': Task}
+
+# nazwa pliku (bez rozszerzenia) -> typ rekordu
+FILE_TYPES = {'users': 'user', 'groups': 'group', 'members': 'member', 'tasks': 'task'}
+
+TRUE_VALUES = {'1', 'true', 'yes', 't', 'y'}
+
+
+class DataImportError(Exception):
+    """Błędny rekord - z nazwą pliku i numerem linii."""
+
+
+def read_records(path):
+    """
+    Rekordy z pliku JSONL lub CSV jako słowniki (strumieniowo).
+    Zwraca pary (numer linii, rekord).
+    """
+    default_type = FILE_TYPES.get(os.path.splitext(os.path.basename(path))[0])
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.endswith('.csv'):
+            # numer linii: nagłówek to linia 1
+            for number, row in enumerate(csv.DictReader(f), 2):
+                record = {key: value for key, value in row.items() if value != ''}
+                record.setdefault('type', default_type)
+                yield number, record
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                record.setdefault('type', default_type)
+                yield number, record
+
+
+class Importer:
+    """
+    Zbiera rekordy w paczki i zapisuje je wsadowo.
+
+        importer = Importer(batch_size=10000)
+        for path in paths:
+            importer.import_file(path)
+        importer.finish()
+        db.session.commit()
+    """
+
+    def __init__(self, batch_size=10000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+        # połączenie bieżącej transakcji sesji
+        self.connection = db.session.connection()
+        self.pending = {model: [] for model in MODELS}
+        self.counts = {model: 0 for model in MODELS}
+        self.next_id = {}
+        for model in MODELS:
+            self.next_id[model] = (db.session.scalar(db.select(db.func.max(model.id))) or 0) + 1
+        # id zadań z archiwum (app.archive) też są zajęte
+        self.next_id[Task] = max(self.next_id[Task], (db.session.scalar(db.select(db.func.max(ArchivedTask.id))) or 0) + 1)
+
+        # mapy do rozwiązywania kluczy obcych
+        # emaile porównujemy bez wielkości liter
+        self.user_ids = {email.lower(): user_id for email, user_id in db.session.execute(db.select(User.email, User.id))}
+        self.group_ids = {}
+        self.known_group_ids = set()
+        self.ambiguous_groups = set()
+        for group_id, name in db.session.execute(db.select(FamilyGroup.id, FamilyGroup.name)):
+            self._remember_group(name, group_id)
+        self.members = set(db.session.execute(db.select(GroupMember.user_id, GroupMember.group_id)).all())
+
+        # group_id -> [otwarte, zrobione] z tego importu
+        self.task_counters = {}
+        # jawne hasło -> hash (to samo hasło liczone raz)
+        self.password_hashes = {}
+        # domyślny created_at - jak func.now() w SQLite (UTC, bez mikrosekund)
+        self.now = utcnow()
+        self.started = time.perf_counter()
+        # indeks wyszukiwania zadań uzupełniamy raz w finish(), nie triggerem na wiersz
+        self.first_task_id = self.next_id[Task]
+        search.suspend_index(self.connection)
+
+    def import_file(self, path):
+        for number, record in read_records(path):
+            try:
+                self.add(record)
+            except DataImportError as e:
+                raise DataImportError(f'{path}:{number}: {e}') from None
+            except (KeyError, ValueError, TypeError) as e:
+                raise DataImportError(f'{path}:{number}: błędny rekord ({e!r})') from None
+
+    def add(self, record):
+        kind = record.get('type')
+        if kind not in RECORD_TYPES:
+            raise DataImportError(f'nieznany typ rekordu: {kind!r}')
+        model = RECORD_TYPES[kind]
+        row = getattr(self, f'_{kind}_row')(record)
+        row['id'] = self.next_id[model]
+        self.next_id[model] += 1
+        self.pending[model].append(row)
+        if len(self.pending[model]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Zapisz wszystkie zebrane paczki (w kolejności kluczy obcych)."""
+        for model in MODELS:
+            rows = self.pending[model]
+            if rows:
+                # Core (tabela, nie model) - bez przetwarzania wierszy przez ORM
+                self.connection.execute(model.__table__.insert(), rows)
+                self.counts[model] += len(rows)
+                self.pending[model] = []
+        if self.progress:
+            self.progress(self.summary())
+
+    def finish(self):
+        """Ostatnie paczki, indeks wyszukiwania i liczniki zadań grup (bez commit)."""
+        self.flush()
+        search.resume_index(self.connection, self.first_task_id)
+        if self.task_counters:
+            groups = FamilyGroup.__table__.c
+            self.connection.execute(
+                db.update(FamilyGroup.__table__)
+                .where(groups.id == db.bindparam('group'))
+                .values(open_count=groups.open_count + db.bindparam('open'),
+                        completed_count=groups.completed_count + db.bindparam('done'),
+                        version=groups.version + 1),
+                [{'group': group_id, 'open': open_count, 'done': done_count}
+                 for group_id, (open_count, done_count) in self.task_counters.items()]
+            )
+        # Postgres: sekwencje nie wiedzą o nadanych przez nas id
+        if self.connection.dialect.name == 'postgresql':
+            for model in MODELS:
+                table = model.__table__.name
+                self.connection.execute(db.text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), :next_id, false)"
+                ), {'next_id': self.next_id[model]})
+        return self.summary()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {
+            'users': self.counts[User],
+            'groups': self.counts[FamilyGroup],
+            'members': self.counts[GroupMember],
+            'tasks': self.counts[Task],
+            'seconds': elapsed,
+        }
+
+    # --- rekordy -> wiersze ---
+
+    def _user_row(self, record):
+        email = record['email'].strip()
+        if email.lower() in self.user_ids:
+            raise DataImportError(f'użytkownik {email} już istnieje')
+        password_hash = record.get('password_hash')
+        if password_hash is None:
+            password = record.get('password')
+            if not password:
+                raise DataImportError(f'brak password/password_hash dla {email}')
+            password_hash = self.password_hashes.get(password)
+            if password_hash is None:
+                password_hash = self.password_hashes[password] = passwords.hash(password)
+        self.user_ids[email.lower()] = self.next_id[User]
+        return {'email': email, 'password': password_hash}
+
+    def _group_row(self, record):
+        name = record['name']
+        self._remember_group(name, self.next_id[FamilyGroup])
+        return {'name': name}
+
+    def _member_row(self, record):
+        user_id = self._user(record['email'])
+        group_id = self._group(record)
+        role = record.get('role', 'member')
+        if role not in ('admin', 'member'):
+            raise DataImportError(f'nieznana rola: {role!r}')
+        if (user_id, group_id) in self.members:
+            raise DataImportError(f'{record["email"]} już jest członkiem grupy {group_id}')
+        self.members.add((user_id, group_id))
+        return {'user_id': user_id, 'group_id': group_id, 'role': role}
+
+    def _task_row(self, record):
+        group_id = self._group(record)
+        is_completed = _boolean(record.get('is_completed', False))
+        counters = self.task_counters.setdefault(group_id, [0, 0])
+        counters[1 if is_completed else 0] += 1
+        created_at = record.get('created_at')
+        completed_at = record.get('completed_at')
+        due_at = record.get('due_at')
+        due_at = _utc(datetime.fromisoformat(due_at)) if due_at else None
+        rule = record.get('recurrence') or None
+        if rule is not None:
+            parse_rule(rule)
+            if not due_at:
+                raise DataImportError('zadanie powtarzane musi mieć due_at')
+            rule = anchor_rule(rule, due_at)
+        return {
+            'group_id': group_id,
+            'title': record['title'],
+            'description': record.get('description'),
+            'created_by_id': self._user(record['created_by']),
+            'assigned_to_id': self._user(record['assigned_to']) if record.get('assigned_to') else None,
+            'is_completed': is_completed,
+            'created_at': _utc(datetime.fromisoformat(created_at)) if created_at else self.now,
+            'completed_at': (_utc(datetime.fromisoformat(completed_at)) if completed_at else self.now)
+                            if is_completed else None,
+            'due_at': due_at,
+            'recurrence': rule,
+        }
+
+    # --- klucze obce ---
+
+    def _remember_group(self, name, group_id):
+        # nazwy grup nie są unikalne - niejednoznacznych nie da się wskazać nazwą
+        if name in self.group_ids:
+            self.ambiguous_groups.add(name)
+        self.group_ids[name] = group_id
+        self.known_group_ids.add(group_id)
+
+    def _user(self, email):
+        user_id = self.user_ids.get(email.strip().lower())
+        if user_id is None:
+            raise DataImportError(f'nieznany użytkownik: {email}')
+        return user_id
+
+    def _group(self, record):
+        if 'group_id' in record:
+            group_id = int(record['group_id'])
+            if group_id not in self.known_group_ids:
+                raise DataImportError(f'nieznana grupa: {group_id}')
+            return group_id
+        name = record['group']
+        if name in self.ambiguous_groups:
+            raise DataImportError(f'kilka grup o nazwie {name!r} - użyj group_id')
+        group_id = self.group_ids.get(name)
+        if group_id is None:
+            raise DataImportError(f'nieznana grupa: {name}')
+        return group_id
+
+
+def _utc(value):
+    # strefa czasowa -> UTC bez strefy (tak zapisujemy daty w bazie)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
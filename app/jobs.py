@@ -0,0 +1,344 @@
+"""
+Zadania w tle - praca, która nie musi się wykonać przed odpowiedzią
+(powiadomienia, przeliczenia).
+
+Funkcję rejestrujemy dekoratorem, a zlecamy ją w bieżącej transakcji
+(np. w app.services):
+
+    @jobs.task('task-assigned')
+    def notify_task_assigned(task_id, user_id):
+        ...
+
+    jobs.enqueue('task-assigned', key=f'task-assigned:{task.id}:{user_id}',
+                 task_id=task.id, user_id=user_id)
+
+Zlecenie wchodzi w życie dopiero po commit - po rollback przepada
+(tak jak zdarzenia z app.events). Argumenty muszą być serializowalne
+do JSON - przekazujemy id, nie obiekty ORM.
+
+Backendy (JOBS_BACKEND):
+- 'thread' - pula wątków w procesie aplikacji (JOBS_WORKERS). Bez
+  dodatkowego procesu, ale zlecenia giną przy restarcie, a klucze
+  idempotencji pamiętamy tylko w procesie (ostatnie KEY_CACHE_SIZE).
+- 'database' - wiersz w tabeli job zapisany w tej samej transakcji co
+  zmiana, którą opisuje; wykonuje go osobny proces `flask jobs-worker`.
+  Przeżywa restarty, klucz idempotencji jest unikalny w bazie.
+- 'inline' - od razu po commit, w wątku requestu (testy, pomiar bez odroczenia).
+
+Funkcja zadania działa w kontekście aplikacji i NIE robi commit - robi
+go worker po sukcesie (w backendzie 'database' razem ze statusem done).
+Błąd = ponowienie po JOBS_RETRY_DELAY * 2^(próba - 1) sekund, po
+JOBS_MAX_ATTEMPTS próbach zadanie jest porzucane (status failed).
+Wykonanie jest "co najmniej raz" - funkcja powinna być idempotentna.
+
+Rejestr funkcji jest wspólny (dekorator przy imporcie modułu), a backend,
+pula wątków i klucze idempotencji należą do aplikacji
+(app.extensions['jobs']) - dwie aplikacje w procesie się nie mieszają.
+"""
+
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import event
+
+# ile kluczy idempotencji pamięta backend 'thread'
+KEY_CACHE_SIZE = 10000
+
+# ile znaków błędu zapisujemy w job.last_error
+ERROR_LENGTH = 2000
+
+
+class JobsState:
+    """Konfiguracja, pula wątków i klucze idempotencji jednej aplikacji."""
+
+    def __init__(self, config):
+        self.backend = config.get('JOBS_BACKEND', 'thread')
+        if self.backend not in ('thread', 'database', 'inline'):
+            raise ValueError(f'nieznany JOBS_BACKEND: {self.backend!r}')
+        self.workers = config.get('JOBS_WORKERS', 2)
+        self.max_attempts = config.get('JOBS_MAX_ATTEMPTS', 5)
+        self.retry_delay = config.get('JOBS_RETRY_DELAY', 10)
+        self.poll_interval = config.get('JOBS_POLL_INTERVAL', 1)
+        self.lease = config.get('JOBS_LEASE', 300)
+        self.executor = None
+        if self.backend == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='jobs')
+        # klucze idempotencji dotyczą bazy tej aplikacji
+        self.keys = OrderedDict()
+        self.lock = threading.Lock()
+
+    def remember_key(self, key):
+        # False - klucz już był (w tym procesie)
+        with self.lock:
+            if key in self.keys:
+                self.keys.move_to_end(key)
+                return False
+            self.keys[key] = True
+            if len(self.keys) > KEY_CACHE_SIZE:
+                self.keys.popitem(last=False)
+            return True
+
+
+class Jobs:
+    """
+    Rozszerzenie: rejestr funkcji zadań, zlecanie i wykonywanie.
+
+    Konfiguracja:
+    - JOBS_BACKEND - 'thread', 'database' albo 'inline'
+    - JOBS_WORKERS - wątki puli ('thread') i domyślna współbieżność `flask jobs-worker`
+    - JOBS_MAX_ATTEMPTS - ile prób, zanim zadanie zostanie porzucone
+    - JOBS_RETRY_DELAY - opóźnienie pierwszego ponowienia (s), kolejne x2
+    - JOBS_POLL_INTERVAL - co ile sekund bezczynny worker sprawdza kolejkę
+    - JOBS_LEASE - na ile sekund worker rezerwuje zadanie ('database');
+      dłużej niż najdłuższe zadanie, inaczej wykona się drugi raz
+    """
+
+    def __init__(self, app=None, db=None):
+        self.handlers = {}
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        app.extensions['jobs'] = JobsState(app.config)
+        self._db = db
+
+        # jedna rejestracja na sesję (wspólną dla aplikacji) - zlecenia niosą swoją aplikację
+        if not event.contains(db.session, 'after_commit', self._submit_pending):
+            event.listen(db.session, 'after_commit', self._submit_pending)
+            event.listen(db.session, 'after_rollback', self._discard_pending)
+
+    @property
+    def state(self):
+        return current_app.extensions['jobs']
+
+    @property
+    def backend(self):
+        return self.state.backend
+
+    @property
+    def workers(self):
+        return self.state.workers
+
+    def task(self, name):
+        """Dekorator - zarejestruj funkcję zadania pod nazwą."""
+        def register(func):
+            self.handlers[name] = func
+            return func
+        return register
+
+    def enqueue(self, name, key=None, delay=0, **payload):
+        """
+        Zleć zadanie w bieżącej transakcji.
+
+        key - klucz idempotencji: zadanie z kluczem, który już był zlecony,
+        jest pomijane. delay - najwcześniej za tyle sekund.
+        """
+        self.enqueue_many(name, [(key, payload)], delay)
+
+    def enqueue_many(self, name, jobs, delay=0):
+        """Zleć wiele zadań naraz - jobs: lista (klucz albo None, argumenty); jeden INSERT."""
+        if name not in self.handlers:
+            raise KeyError(f'nieznane zadanie: {name}')
+        if not jobs:
+            return
+        if self.state.backend == 'database':
+            self._insert(name, jobs, delay)
+            return
+        app = current_app._get_current_object()
+        self._db.session.info.setdefault('pending_jobs', []).extend(
+            (app, name, key, delay, payload) for key, payload in jobs
+        )
+
+    # --- backendy 'thread' i 'inline' ---
+
+    def _submit_pending(self, session):
+        for app, name, key, delay, payload in session.info.pop('pending_jobs', ()):
+            state = app.extensions['jobs']
+            if key is not None and not state.remember_key(key):
+                continue
+            if state.backend == 'inline':
+                self._run_local(app, name, payload, attempt=1, retry=False)
+            else:
+                self._schedule(delay, app, name, payload, 1)
+
+    def _discard_pending(self, session):
+        session.info.pop('pending_jobs', None)
+
+    def _schedule(self, delay, app, *args):
+        executor = app.extensions['jobs'].executor
+        if delay > 0:
+            timer = threading.Timer(delay, executor.submit, (self._run_local, app, *args))
+            timer.daemon = True
+            timer.start()
+        else:
+            executor.submit(self._run_local, app, *args)
+
+    def _run_local(self, app, name, payload, attempt, retry=True):
+        state = app.extensions['jobs']
+        with app.app_context():
+            try:
+                self.handlers[name](**payload)
+                self._db.session.commit()
+            except Exception:
+                self._db.session.rollback()
+                if retry and attempt < state.max_attempts:
+                    app.logger.warning('Zadanie %s (próba %d) nie powiodło się:\n%s',
+                                       name, attempt, traceback.format_exc())
+                    self._schedule(state.retry_delay * 2 ** (attempt - 1), app, name, payload, attempt + 1)
+                else:
+                    app.logger.exception('Zadanie %s porzucone po %d próbach', name, attempt)
+            finally:
+                self._db.session.remove()
+
+    # --- backend 'database' ---
+
+    def _insert(self, name, jobs, delay):
+        from app.models import Job, utcnow
+        db = self._db
+        run_at = utcnow() + timedelta(seconds=delay)
+        rows = [{
+            'name': name,
+            'payload': json.dumps(payload, separators=(',', ':')),
+            'key': key,
+            'status': 'pending',
+            'attempts': 0,
+            'max_attempts': self.state.max_attempts,
+            'run_at': run_at,
+        } for key, payload in jobs]
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            # istniejący klucz = wiersz pomijany, bez błędu i bez osobnego SELECT
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            statement = insert(Job).on_conflict_do_nothing(index_elements=['key'])
+        else:
+            keys = [row['key'] for row in rows if row['key'] is not None]
+            existing = set(db.session.scalars(db.select(Job.key).where(Job.key.in_(keys)))) if keys else set()
+            rows = [row for row in rows if row['key'] is None or row['key'] not in existing]
+            statement = db.insert(Job)
+        if rows:
+            db.session.execute(statement, rows)
+
+    def claim(self):
+        """
+        Zarezerwuj najstarsze zadanie do wykonania (pending z minionym
+        run_at albo running z minionym locked_until) i zatwierdź rezerwację.
+        Zwraca (id, nazwa, argumenty, numer próby, max prób) albo None.
+
+        Jeden UPDATE ... RETURNING - dwa workery nie dostaną tego samego
+        zadania (SQLite: blokada zapisu; Postgres: FOR UPDATE SKIP LOCKED).
+        """
+        from app.models import Job, utcnow
+        db = self._db
+        now = utcnow()
+        due = db.or_(
+            db.and_(Job.status == 'pending', Job.run_at <= now),
+            db.and_(Job.status == 'running', Job.locked_until < now),
+        )
+        candidate = db.select(Job.id).where(due).order_by(Job.run_at, Job.id).limit(1)
+        if db.session.get_bind().dialect.name == 'postgresql':
+            candidate = candidate.with_for_update(skip_locked=True)
+        row = db.session.execute(
+            db.update(Job)
+            .where(Job.id == candidate.scalar_subquery(), due)
+            .values(status='running', attempts=Job.attempts + 1,
+                    locked_until=now + timedelta(seconds=self.state.lease))
+            .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts)
+        ).first()
+        db.session.commit()
+        if row is None:
+            return None
+        return row.id, row.name, json.loads(row.payload), row.attempts, row.max_attempts
+
+    def run_next(self):
+        """
+        Wykonaj jedno zadanie z kolejki w bazie. Zwraca False, gdy nie
+        było nic do zrobienia. Wymaga kontekstu aplikacji.
+        """
+        from app.models import Job, utcnow
+        db = self._db
+        claimed = self.claim()
+        if claimed is None:
+            return False
+        job_id, name, payload, attempt, max_attempts = claimed
+        try:
+            handler = self.handlers.get(name)
+            if handler is None:
+                raise KeyError(f'nieznane zadanie: {name}')
+            handler(**payload)
+            # zmiany zadania i status done w jednej transakcji
+            db.session.execute(
+                db.update(Job).where(Job.id == job_id)
+                .values(status='done', locked_until=None, finished_at=utcnow(), last_error=None)
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            error = traceback.format_exc()[-ERROR_LENGTH:]
+            if attempt < max_attempts:
+                values = {'status': 'pending', 'locked_until': None,
+                          'run_at': utcnow() + timedelta(seconds=self.state.retry_delay * 2 ** (attempt - 1))}
+                current_app.logger.warning('Zadanie %s #%d (próba %d) nie powiodło się:\n%s',
+                                           name, job_id, attempt, error)
+            else:
+                values = {'status': 'failed', 'locked_until': None, 'finished_at': utcnow()}
+                current_app.logger.error('Zadanie %s #%d porzucone po %d próbach:\n%s',
+                                         name, job_id, attempt, error)
+            db.session.execute(db.update(Job).where(Job.id == job_id).values(last_error=error, **values))
+            db.session.commit()
+        return True
+
+    def work(self, app, concurrency=None, once=False, stop=None):
+        """
+        Workery kolejki w bazie - `concurrency` wątków, każdy z własnym
+        kontekstem aplikacji i sesją. once=True - zakończ, gdy kolejka
+        jest pusta. stop - threading.Event zatrzymujący workery.
+        """
+        stop = stop or threading.Event()
+        state = app.extensions['jobs']
+
+        def loop():
+            with app.app_context():
+                try:
+                    while not stop.is_set():
+                        if not self.run_next():
+                            if once:
+                                return
+                            stop.wait(state.poll_interval)
+                finally:
+                    self._db.session.remove()
+
+        threads = [threading.Thread(target=loop, name=f'jobs-worker-{i}', daemon=True)
+                   for i in range(concurrency or state.workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            # join z timeoutem - Ctrl+C dociera do głównego wątku
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def counts(self):
+        """Liczba zadań w bazie według statusu."""
+        from app.models import Job
+        db = self._db
+        return dict(db.session.execute(db.select(Job.status, db.func.count()).group_by(Job.status)).all())
+
+    def prune(self, days):
+        """Usuń zakończone zadania (done, failed) starsze niż `days` dni. Zwraca liczbę usuniętych."""
+        from app.models import Job, utcnow
+        db = self._db
+        return db.session.execute(
+            db.delete(Job).where(Job.status.in_(('done', 'failed')),
+                                 Job.finished_at < utcnow() - timedelta(days=days))
+        ).rowcount
@@ -0,0 +1,326 @@
+"""
+Metryki wydajności requestów - per endpoint.
+
+Dla każdego requestu liczymy:
+- czas całkowity (histogram)
+- liczbę zapytań SQL i ich łączny czas (zdarzenia silnika SQLAlchemy)
+- czas renderowania szablonów (sygnały Flaska)
+- rozmiar odpowiedzi
+
+GET /metrics zwraca to w formacie tekstowym Prometheusa, razem ze
+statystykami puli połączeń i cache - tylko z tokenem (METRICS_TOKEN);
+bez tokenu endpointu nie ma (nazwy tras, czasy i rozmiary nie są
+publiczne). Request wolniejszy niż SLOW_REQUEST_MS trafia do logu
+razem z najwolniejszymi zapytaniami.
+
+Metryki są per proces - przy kilku workerach Prometheus zbiera każdy
+osobno (albo sumuje je po stronie serwera). W procesie każda aplikacja
+ma własne sumy (app.extensions['metrics']).
+
+Koszt: kilka wywołań perf_counter i dodawań na zapytanie/request,
+stan requestu w ContextVar (działa też w widokach async).
+"""
+
+import bisect
+import hmac
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from flask import request, current_app, abort, Response, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# granice histogramu czasu requestu (sekundy)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# ile najwolniejszych zapytań pokazać w logu wolnego requestu
+SLOW_LOG_STATEMENTS = 5
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    """Pomiary jednego requestu."""
+
+    __slots__ = ('start', 'sql_count', 'sql_time', 'render_time', 'render_depth',
+                 'render_start', 'statements')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.render_start = 0.0
+        # (czas, SQL) - tylko do logu wolnych requestów
+        self.statements = []
+
+
+class EndpointStats:
+    """Sumy dla jednego endpointu."""
+
+    __slots__ = ('count', 'duration', 'buckets', 'sql_count', 'sql_time', 'render_time',
+                 'response_bytes', 'statuses')
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.response_bytes = 0
+        self.statuses = defaultdict(int)
+
+
+class MetricsState:
+    """Sumy per endpoint jednej aplikacji."""
+
+    def __init__(self, slow_request_ms):
+        self.lock = threading.Lock()
+        self.endpoints = defaultdict(EndpointStats)
+        self.slow_request_ms = slow_request_ms
+
+
+class Metrics:
+    """
+    Rozszerzenie zbierające metryki requestów.
+
+    Konfiguracja:
+    - METRICS_ENABLED - False: nic nie mierzymy, brak /metrics
+    - METRICS_TOKEN - /metrics wymaga nagłówka "Authorization: Bearer <token>";
+      bez tokenu endpoint nie jest rejestrowany (404)
+    - SLOW_REQUEST_MS - próg logu wolnych requestów (0 = bez logu)
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.extensions['metrics'] = MetricsState(app.config.get('SLOW_REQUEST_MS', 0))
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        if app.config.get('METRICS_TOKEN'):
+            app.add_url_rule('/metrics', 'metrics', self._metrics_view)
+
+        before_render_template.connect(_render_started, app)
+        template_rendered.connect(_render_finished, app)
+
+        # wszystkie silniki (też sync_engine silnika async) - rejestrujemy raz na proces
+        listen_engine_events()
+
+    @property
+    def state(self):
+        """Stan bieżącej aplikacji (None - metryki wyłączone)."""
+        return current_app.extensions.get('metrics')
+
+    # --- request ---
+
+    def _before_request(self):
+        _current.set(RequestStats())
+
+    def _after_request(self, response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        duration = time.perf_counter() - stats.start
+        endpoint = request.endpoint or '<unmatched>'
+        # strumienie (SSE) nie mają długości
+        size = response.content_length or 0
+
+        state = self.state
+        with state.lock:
+            total = state.endpoints[(endpoint, request.method)]
+            total.count += 1
+            total.duration += duration
+            # kubełek "do bound włącznie"; powyżej ostatniego - tylko w count (+Inf)
+            bucket = bisect.bisect_left(BUCKETS, duration)
+            if bucket < len(BUCKETS):
+                total.buckets[bucket] += 1
+            total.sql_count += stats.sql_count
+            total.sql_time += stats.sql_time
+            total.render_time += stats.render_time
+            total.response_bytes += size
+            total.statuses[response.status_code] += 1
+
+        if state.slow_request_ms and duration * 1000 >= state.slow_request_ms:
+            self._log_slow(endpoint, duration, stats)
+        return response
+
+    def _teardown_request(self, exc):
+        _current.set(None)
+
+    def _log_slow(self, endpoint, duration, stats):
+        slowest = sorted(stats.statements, key=lambda item: item[0], reverse=True)[:SLOW_LOG_STATEMENTS]
+        lines = [
+            f'Wolny request {request.method} {request.path} ({endpoint}): '
+            f'{duration * 1000:.0f} ms, SQL {stats.sql_count} zapytań / {stats.sql_time * 1000:.0f} ms, '
+            f'szablony {stats.render_time * 1000:.0f} ms'
+        ]
+        for seconds, statement in slowest:
+            lines.append(f'  {seconds * 1000:.1f} ms: {" ".join(statement.split())}')
+        current_app.logger.warning('\n'.join(lines))
+
+    # --- /metrics ---
+
+    def _metrics_view(self):
+        expected = f'Bearer {current_app.config["METRICS_TOKEN"]}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), expected):
+            abort(403)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def snapshot(self):
+        """Kopia sum per (endpoint, metoda) - do testów i benchmarków."""
+        state = self.state
+        if state is None:
+            return {}
+        with state.lock:
+            return {key: {
+                'count': stats.count,
+                'duration': stats.duration,
+                'sql_count': stats.sql_count,
+                'sql_time': stats.sql_time,
+                'render_time': stats.render_time,
+                'response_bytes': stats.response_bytes,
+            } for key, stats in state.endpoints.items()}
+
+    def reset(self):
+        state = self.state
+        if state is not None:
+            with state.lock:
+                state.endpoints.clear()
+
+    def render(self):
+        """Metryki w formacie tekstowym Prometheusa."""
+        from app import db, membership_cache, identity_cache, fragment_cache
+        from app.engine import pool_stats
+
+        state = self.state
+        with state.lock:
+            endpoints = sorted(state.endpoints.items())
+            out = []
+
+            def metric(name, kind, help_text, samples):
+                out.append(f'# HELP {name} {help_text}')
+                out.append(f'# TYPE {name} {kind}')
+                out.extend(samples)
+
+            def labels(endpoint, method, **extra):
+                pairs = [('endpoint', endpoint), ('method', method), *extra.items()]
+                return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+            metric('app_requests_total', 'counter', 'Liczba requestów.', [
+                f'app_requests_total{labels(endpoint, method, status=status)} {count}'
+                for (endpoint, method), stats in endpoints
+                for status, count in sorted(stats.statuses.items())
+            ])
+
+            samples = []
+            for (endpoint, method), stats in endpoints:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    cumulative += count
+                    samples.append(f'app_request_duration_seconds_bucket{labels(endpoint, method, le=bound)} {cumulative}')
+                samples.append(f'app_request_duration_seconds_bucket{labels(endpoint, method, le="+Inf")} {stats.count}')
+                samples.append(f'app_request_duration_seconds_sum{labels(endpoint, method)} {stats.duration:.6f}')
+                samples.append(f'app_request_duration_seconds_count{labels(endpoint, method)} {stats.count}')
+            metric('app_request_duration_seconds', 'histogram', 'Czas requestu.', samples)
+
+            for name, attr, help_text, fmt in (
+                ('app_sql_queries_total', 'sql_count', 'Liczba zapytań SQL.', '{}'),
+                ('app_sql_duration_seconds_total', 'sql_time', 'Łączny czas zapytań SQL.', '{:.6f}'),
+                ('app_template_render_seconds_total', 'render_time', 'Łączny czas renderowania szablonów.', '{:.6f}'),
+                ('app_response_bytes_total', 'response_bytes', 'Łączny rozmiar odpowiedzi.', '{}'),
+            ):
+                metric(name, 'counter', help_text, [
+                    f'{name}{labels(endpoint, method)} {fmt.format(getattr(stats, attr))}'
+                    for (endpoint, method), stats in endpoints
+                ])
+
+        pool = pool_stats(db.engine)
+        if pool:
+            metric('app_db_pool_checked_out', 'gauge', 'Połączenia pobrane z puli.', [f'app_db_pool_checked_out {pool["checked_out"]}'])
+            metric('app_db_pool_checkouts_total', 'counter', 'Pobrania połączeń z puli.', [f'app_db_pool_checkouts_total {pool["checkouts"]}'])
+            metric('app_db_pool_wait_seconds_total', 'counter', 'Łączny czas czekania na połączenie.', [f'app_db_pool_wait_seconds_total {pool["wait_seconds_total"]:.6f}'])
+            metric('app_db_pool_wait_seconds_max', 'gauge', 'Najdłuższe czekanie na połączenie.', [f'app_db_pool_wait_seconds_max {pool["wait_seconds_max"]:.6f}'])
+
+        caches = (('membership', membership_cache), ('identity', identity_cache), ('fragment', fragment_cache))
+        metric('app_cache_hits_total', 'counter', 'Trafienia w cache.', [
+            f'app_cache_hits_total{{cache="{name}"}} {cache.stats()["hits"]}' for name, cache in caches
+        ])
+        metric('app_cache_misses_total', 'counter', 'Pudła w cache.', [
+            f'app_cache_misses_total{{cache="{name}"}} {cache.stats()["misses"]}' for name, cache in caches
+        ])
+        return '\n'.join(out) + '\n'
+
+
+# --- zdarzenia SQLAlchemy i sygnały szablonów ---
+
+# Czas startu zapytania trzymamy w jego ExecutionContext - obiekt żyje tyle,
+# co jedno wykonanie, więc po błędzie nic nie zostaje na połączeniu z puli.
+# context=None (specjalne wykonania dialektu) - zapytanie nie jest mierzone.
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context.metrics_query_start = time.perf_counter()
+    return statement, parameters
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(context, statement)
+
+
+def _handle_error(context):
+    # zapytanie zakończone wyjątkiem nie dostaje after_cursor_execute - liczymy je tutaj
+    _record_query(context.execution_context, context.statement)
+
+
+def _record_query(context, statement):
+    start = getattr(context, 'metrics_query_start', None)
+    stats = _current.get()
+    if start is None or stats is None:
+        return
+    del context.metrics_query_start
+    elapsed = time.perf_counter() - start
+    stats.sql_count += 1
+    stats.sql_time += elapsed
+    stats.statements.append((elapsed, statement or ''))
+
+
+ENGINE_EVENTS = (
+    ('before_cursor_execute', _before_cursor_execute, {'retval': True}),
+    ('after_cursor_execute', _after_cursor_execute, {}),
+    ('handle_error', _handle_error, {}),
+)
+
+
+def listen_engine_events(enabled=True):
+    """Podłącz (albo odłącz) słuchaczy ENGINE_EVENTS na klasie Engine - idempotentne."""
+    for name, listener, options in ENGINE_EVENTS:
+        if enabled and not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener, **options)
+        elif not enabled and event.contains(Engine, name, listener):
+            event.remove(Engine, name, listener)
+
+
+def _render_started(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None:
+        # zagnieżdżone render_template liczymy raz - od zewnętrznego
+        if stats.render_depth == 0:
+            stats.render_start = time.perf_counter()
+        stats.render_depth += 1
+
+
+def _render_finished(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None and stats.render_depth:
+        stats.render_depth -= 1
+        if stats.render_depth == 0:
+            stats.render_time += time.perf_counter() - stats.render_start
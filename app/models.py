@@ -5,10 +5,32 @@ Struktura:
 - User: Użytkownicy aplikacji
 - FamilyGroup: Grupy rodzinne
 - GroupMember: tabela pośrednicząca User-FamilyGroup z dodatkowym polem 'role'
+- UserIdentity: lekki current_user (bez wiersza z bazy) dla Flask-Login
+- ArchivedTask: zrobione zadania przeniesione z task do task_archive (app.archive)
+- Job: trwała kolejka zadań w tle (app.jobs, backend 'database')
 """
 
-from app import db, login
+from datetime import datetime, timezone
+from app import db, login, identity_cache
 from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import DATETIME as SQLITE_DATETIME
+
+# Data i czas zapisywane w SQLite w tym samym formacie co CURRENT_TIMESTAMP
+# (db.func.now()), czyli bez mikrosekund. Domyślny format SQLAlchemy dodaje
+# ".000000", a SQLite porównuje daty jako tekst - wtedy "created_at = :kursor"
+# nigdy nie jest prawdą i stronicowanie po kursorze się zapętla.
+Timestamp = db.DateTime().with_variant(
+    SQLITE_DATETIME(storage_format='%(year)04d-%(month)02d-%(day)02d '
+                                   '%(hour)02d:%(minute)02d:%(second)02d'),
+    'sqlite'
+)
+
+
+def utcnow():
+    """Bieżący czas do zapisu w kolumnach Timestamp - UTC bez strefy i mikrosekund."""
+    return datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
 
 class User(UserMixin, db.Model):
     """
@@ -21,7 +43,8 @@ class User(UserMixin, db.Model):
 
     # Hasło zawsze hashowane przez generate_password_hash
     # NIGDY nie przechowujemy plaintext passwords!
-    password = db.Column(db.String(128), nullable=False)
+    # 255 - hash scrypt ma ok. 160 znaków
+    password = db.Column(db.String(255), nullable=False)
 
     #relacja łączy się bezpośrednio z modelem pośredniczącym
     #back_populates: ta relacja jest drugą stroną relacji 'user' w klasie GroupMember
@@ -30,13 +53,60 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f"User('{self.email}')"
 
+class UserIdentity(UserMixin):
+    """
+    Lekki obiekt current_user - tylko id, email i flaga aktywności.
+
+    Nie jest modelem: nie trzyma hasha hasła i nie wymaga zapytania do bazy,
+    ale nie ma też relacji (current_user.group_memberships itp.) -
+    w widokach używamy current_user.id.
+    """
+
+    def __init__(self, id, email, active=True):
+        self.id = id
+        self.email = email
+        self.active = active
+
+    @property
+    def is_active(self):
+        return self.active
+
+    def __repr__(self):
+        return f"UserIdentity('{self.email}')"
+
 @login.user_loader
 def load_user(user_id):
     """
     Callback wymagany przez Flask-Login.
     Ładuje użyutkownika po ID z sesji
+
+    Wywoływany przy każdym requeście zalogowanego użytkownika, dlatego
+    tożsamość trzymamy w identity_cache (TTL), a do bazy idziemy tylko
+    po id i email - nigdy po cały wiersz z hashem hasła.
     """
-    return User.query.get(int(user_id))
+    cached = identity_cache.get(user_id)
+    if cached is None:
+        row = db.session.query(User.id, User.email).filter_by(id=int(user_id)).first()
+        if row is None:
+            return None
+        # w cache krotka, nie obiekt - zadziała też z zewnętrznym backendem
+        cached = (row.id, row.email, True)
+        identity_cache.set(user_id, cached)
+    return UserIdentity(*cached)
+
+@event.listens_for(User, 'after_update')
+def _invalidate_identity_on_update(mapper, connection, target):
+    """
+    Zmiana emaila lub hasła = zalogowane sesje muszą zobaczyć nowe dane
+    (a nie wpis z cache do końca TTL).
+    """
+    state = db.inspect(target)
+    if state.attrs.email.history.has_changes() or state.attrs.password.history.has_changes():
+        identity_cache.delete(str(target.id))
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_identity_on_delete(mapper, connection, target):
+    identity_cache.delete(str(target.id))
 
 class GroupMember(db.Model):
     """
@@ -47,6 +117,13 @@ class GroupMember(db.Model):
     - Potencjalnie więcej pól w przyszłości
     """
     __tablename__ = 'group_member'
+    __table_args__ = (
+        # sprawdzanie członkostwa (user_id, group_id) jest w każdej chronionej trasie
+        # unikalność = jeden użytkownik może być w grupie tylko raz
+        db.UniqueConstraint('user_id', 'group_id', name='uq_group_member_user_group'),
+        # liczenie adminów w grupie (remove_member)
+        db.Index('ix_group_member_group_role', 'group_id', 'role'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     group_id = db.Column(db.Integer, db.ForeignKey('family_group.id'))
@@ -67,12 +144,47 @@ class FamilyGroup(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
 
+    # Licznik zmian - podbijany przy każdej zmianie grupy, członków lub zadań.
+    # Z niego liczymy ETag w API (niezmieniona wersja = 304 bez zapytania o zadania)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # kiedy ostatnio coś się zmieniło (Last-Modified w API)
+    last_activity_at = db.Column(Timestamp, nullable=True)
+
+    # Liczniki zadań - utrzymywane przy każdej zmianie zadań (app.services),
+    # żeby strona główna nie musiała czytać wszystkich zadań wszystkich grup.
+    # Naprawa po ręcznych zmianach w bazie: `flask recount-tasks`
+    open_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    completed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
     # Relacja do członków przez tabelę pośredniczącą
     # lazy='dynamic' pozwala na .filter(), .count() itp.
     members = db.relationship('GroupMember', back_populates='group', lazy='dynamic')
     
     def __repr__(self):
         return f"FamilyGroup('{self.name}')"
+
+    @staticmethod
+    def touch(group_id, open_delta=0, completed_delta=0):
+        """
+        Podbij wersję grupy i czas ostatniej aktywności,
+        opcjonalnie zmień liczniki zadań o podane wartości.
+
+        Atomowy UPDATE (version = version + 1, open_count = open_count + n)
+        w bieżącej transakcji - równoległe zmiany nie gubią inkrementacji.
+        Zwraca nową wersję grupy (RETURNING - bez dodatkowego SELECT).
+        """
+        values = {'version': FamilyGroup.version + 1, 'last_activity_at': db.func.now()}
+        if open_delta:
+            values['open_count'] = FamilyGroup.open_count + open_delta
+        if completed_delta:
+            values['completed_count'] = FamilyGroup.completed_count + completed_delta
+        return db.session.execute(
+            db.update(FamilyGroup)
+            .where(FamilyGroup.id == group_id)
+            .values(**values)
+            .returning(FamilyGroup.version)
+        ).scalar()
     
 class Task(db.Model):
     """
@@ -81,6 +193,26 @@ class Task(db.Model):
     Każde zadanie należy do grupy i może być przypisane do członka
     """
     __tablename__ = 'task'
+    __table_args__ = (
+        # lista zadań grupy: filtr po grupie + sortowanie jak w group_tasks
+        db.Index('ix_task_group_completed_created', 'group_id', 'is_completed', 'created_at'),
+        db.Index('ix_task_assigned_to_id', 'assigned_to_id'),
+        # zaległe / na ten tydzień: otwarte zadania grupy po terminie
+        db.Index('ix_task_group_completed_due', 'group_id', 'is_completed', 'due_at'),
+        # harmonogram powtórzeń (app.recurrence) - tylko zadania z regułą,
+        # więc przebieg bez pracy nie czyta pozostałych zadań
+        db.Index('ix_task_recurrence_due', 'due_at',
+                 sqlite_where=db.text('recurrence IS NOT NULL'),
+                 postgresql_where=db.text('recurrence IS NOT NULL')),
+        # archiwizacja (app.archive) - najdawniej zrobione zadania
+        db.Index('ix_task_completed_at', 'completed_at'),
+        # SQLite: id nigdy nie wraca (AUTOINCREMENT) - bez tego po usunięciu
+        # zadania z największym id nowe dostałoby id zadania z archiwum
+        {'sqlite_autoincrement': True},
+    )
+
+    # zadanie w tabeli task (nie w archiwum) - szablony pokazują przyciski zmian
+    archived = False
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -99,7 +231,18 @@ class Task(db.Model):
     created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
     # kiedy utworzone
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    created_at = db.Column(Timestamp, default=db.func.now())
+
+    # kiedy oznaczone jako zrobione (None dla niezrobionych) - po nim archiwizujemy
+    completed_at = db.Column(Timestamp, nullable=True)
+
+    # termin wykonania (UTC, jak created_at) - opcjonalny
+    due_at = db.Column(Timestamp, nullable=True)
+
+    # reguła powtarzania: 'daily', 'weekly', 'monthly', 'yearly', z interwałem
+    # np. 'weekly:2'. Ma ją tylko najnowsze wystąpienie serii - gdy jego termin
+    # minie, app.recurrence tworzy następne i przenosi na nie regułę
+    recurrence = db.Column(db.String(20), nullable=True)
 
     #relacje
     group = db.relationship('FamilyGroup', backref='tasks')
@@ -107,4 +250,84 @@ class Task(db.Model):
     created_by = db.relationship('User', foreign_keys=[created_by_id], backref='created_tasks')
 
     def __repr__(self):
-        return f"Task('{self.title}', completed={self.is_completed})"
\ No newline at end of file
+        return f"Task('{self.title}', completed={self.is_completed})"
+
+
+class ArchivedTask(db.Model):
+    """
+    Zadanie przeniesione do archiwum (app.archive) - zrobione dawno temu.
+
+    Te same kolumny co Task (i to samo id), plus archived_at. Tylko do
+    odczytu: lista zadań pokazuje je na życzenie ("z archiwum"), nie da
+    się ich przełączyć ani usunąć.
+    """
+    __tablename__ = 'task_archive'
+    __table_args__ = (
+        # lista zadań z archiwum - kolejność jak zrobione zadania w group_tasks
+        db.Index('ix_task_archive_group_created', 'group_id', 'created_at', 'id'),
+    )
+
+    # id z tabeli task - bez autoincrement
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('family_group.id'), nullable=False)
+    assigned_to_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # NOT NULL - kolejność listy i kursor; app.archive uzupełnia brak datą zrobienia
+    created_at = db.Column(Timestamp, nullable=False)
+    completed_at = db.Column(Timestamp, nullable=True)
+    due_at = db.Column(Timestamp, nullable=True)
+    recurrence = db.Column(db.String(20), nullable=True)
+    archived_at = db.Column(Timestamp, nullable=False)
+
+    # w archiwum są tylko zrobione zadania
+    is_completed = True
+    archived = True
+
+    group = db.relationship('FamilyGroup')
+    assigned_to = db.relationship('User', foreign_keys=[assigned_to_id])
+    created_by = db.relationship('User', foreign_keys=[created_by_id])
+
+    def __repr__(self):
+        return f"ArchivedTask('{self.title}')"
+
+
+class Job(db.Model):
+    """
+    Zadanie w tle w kolejce w bazie (app.jobs, JOBS_BACKEND='database').
+
+    Cykl: pending -> running -> done, a po błędzie z powrotem pending
+    (z opóźnieniem) albo failed po max_attempts próbach. Worker, który
+    padł w trakcie, zostawia running z minionym locked_until - zadanie
+    przejmuje wtedy inny worker.
+    """
+    __tablename__ = 'job'
+    __table_args__ = (
+        # worker szuka najstarszego zadania do wykonania: status + termin
+        db.Index('ix_job_status_run_at', 'status', 'run_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # nazwa zarejestrowanej funkcji (@jobs.task)
+    name = db.Column(db.String(100), nullable=False)
+    # argumenty funkcji jako JSON
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    # klucz idempotencji - drugie zlecenie z tym samym kluczem jest pomijane
+    key = db.Column(db.String(200), unique=True, nullable=True)
+
+    # pending / running / done / failed
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    # najwcześniejszy czas wykonania (opóźnienie, ponowienie po błędzie)
+    run_at = db.Column(Timestamp, nullable=False)
+    # do kiedy worker "trzyma" zadanie (status running)
+    locked_until = db.Column(Timestamp, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(Timestamp, default=db.func.now())
+    finished_at = db.Column(Timestamp, nullable=True)
+
+    def __repr__(self):
+        return f"Job('{self.name}', status={self.status})"
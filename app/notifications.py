@@ -0,0 +1,32 @@
+"""
+Powiadomienia - wykonywane w tle (app.jobs), nie w requeście.
+
+Trasy tylko zlecają zadanie w swojej transakcji. Na razie powiadomienie
+trafia do logu aplikacji - kanał dostarczania (np. email) to osobna zmiana
+i wystarczy podmienić deliver().
+"""
+
+from flask import current_app
+from app import db, jobs
+from app.models import User, Task
+
+
+def deliver(user, subject, body):
+    """Przekaż powiadomienie użytkownikowi (na razie wpis w logu aplikacji)."""
+    current_app.logger.info('Powiadomienie do %s: %s\n%s', user.email, subject, body)
+
+
+@jobs.task('task-assigned')
+def notify_task_assigned(task_id, user_id):
+    """Powiadom użytkownika, że przypisano mu zadanie."""
+    task = db.session.get(Task, task_id)
+    # zadanie usunięte albo przypisane komuś innemu, zanim zadanie w tle się wykonało
+    if task is None or task.assigned_to_id != user_id:
+        return
+    user = db.session.get(User, user_id)
+    deliver(
+        user,
+        f'Nowe zadanie: {task.title}',
+        f'Przypisano Ci zadanie "{task.title}" w grupie "{task.group.name}".\n'
+        + (f'\n{task.description}\n' if task.description else ''),
+    )
@@ -0,0 +1,104 @@
+"""
+Wykrywanie zapytań N+1 (tryb debug i testy).
+
+Szablony łatwo wracają do N+1 - wystarczy w pętli sięgnąć po relację,
+której zapytanie nie załadowało (np. task.assigned_to bez joinedload).
+Detektor liczy w obrębie requestu zapytania ORM, grupując identyczne
+SELECT-y (ta sama treść SQL, różne parametry), a osobno leniwe ładowania
+relacji (lazy load). Gdy ta sama grupa powtórzy się więcej niż
+NPLUSONE_THRESHOLD razy - ostrzeżenie (NPlusOneWarning + log)
+albo wyjątek NPlusOneError (NPLUSONE_RAISE).
+
+Konfiguracja:
+- NPLUSONE_ENABLED - None (domyślnie): włączony gdy app.debug lub app.testing
+- NPLUSONE_THRESHOLD - ile powtórzeń jest jeszcze w porządku
+- NPLUSONE_RAISE - None (domyślnie): wyjątek w testach, ostrzeżenie w debug
+
+Ostrzeżenie pada w chwili przekroczenia progu, więc traceback wskazuje
+miejsce (szablon, widok), które wywołało kolejne zapytanie.
+"""
+
+import warnings
+from collections import Counter
+from contextvars import ContextVar
+from flask import current_app
+from sqlalchemy import event
+
+_current = ContextVar('nplusone', default=None)
+
+
+class NPlusOneWarning(UserWarning):
+    """Powtarzające się zapytanie w jednym requeście."""
+
+
+class NPlusOneError(Exception):
+    """Powtarzające się zapytanie w jednym requeście (NPLUSONE_RAISE)."""
+
+
+class NPlusOneDetector:
+
+    def __init__(self, app=None, db=None):
+        if app is not None:
+            self.init_app(app, db)
+
+    def init_app(self, app, db):
+        if app.config.get('NPLUSONE_ENABLED') is False:
+            return
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+        if not event.contains(db.session, 'do_orm_execute', _on_execute):
+            event.listen(db.session, 'do_orm_execute', _on_execute)
+
+    def _before_request(self):
+        config = current_app.config
+        enabled = config.get('NPLUSONE_ENABLED')
+        if enabled is None:
+            enabled = current_app.debug or current_app.testing
+        if not enabled:
+            return
+        should_raise = config.get('NPLUSONE_RAISE')
+        if should_raise is None:
+            should_raise = current_app.testing
+        _current.set(_RequestQueries(config.get('NPLUSONE_THRESHOLD', 5), should_raise))
+
+    def _teardown_request(self, exc):
+        _current.set(None)
+
+
+class _RequestQueries:
+
+    def __init__(self, threshold, should_raise):
+        self.threshold = threshold
+        self.should_raise = should_raise
+        self.counts = Counter()
+
+    def record(self, key, description):
+        self.counts[key] += 1
+        # raz na grupę - dokładnie przy przekroczeniu progu
+        if self.counts[key] != self.threshold + 1:
+            return
+        message = f'Możliwe N+1: {description} - ponad {self.threshold} razy w jednym requeście'
+        if self.should_raise:
+            raise NPlusOneError(message)
+        current_app.logger.warning(message)
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+
+def _on_execute(orm_execute_state):
+    queries = _current.get()
+    if queries is None or not orm_execute_state.is_select:
+        return
+
+    if orm_execute_state.is_relationship_load:
+        # ścieżka ładowania, np. Task -> assigned_to
+        path = orm_execute_state.loader_strategy_path
+        prop = path.prop if path is not None else None
+        description = f'leniwe ładowanie {prop}' if prop is not None else 'leniwe ładowanie relacji'
+        key = ('lazy', str(path))
+    else:
+        sql = ' '.join(str(orm_execute_state.statement).split())
+        description = f'to samo zapytanie: {sql[:200]}'
+        key = ('sql', sql)
+    queries.record(key, description)
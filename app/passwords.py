@@ -0,0 +1,90 @@
+"""
+Hashowanie haseł z konfigurowalnym algorytmem i kosztem.
+
+Konfiguracja:
+- PASSWORD_HASH_METHOD - metoda werkzeug, np. 'scrypt', 'scrypt:16384:8:1',
+  'pbkdf2:sha256:600000'
+- PASSWORD_HASH_POOL - '' (liczymy w wątku requestu), 'thread' lub 'process'
+- PASSWORD_HASH_WORKERS - rozmiar puli
+
+Hashowanie to czysty CPU - przy fali logowań pula ogranicza ile hashy
+liczy się naraz, zamiast zajmować wszystkie wątki workera.
+Po zmianie metody stare hashe są przeliczane przy najbliższym
+udanym logowaniu (needs_rehash).
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherState:
+    """Metoda i pula jednej aplikacji (app.extensions['passwords'])."""
+
+    def __init__(self, method, executor):
+        self.method = method
+        self.executor = executor
+        # pełna postać metody z parametrami (needs_rehash), liczona przy pierwszym użyciu
+        self.prefix = None
+        self.lock = threading.Lock()
+
+
+class PasswordHasher:
+    """
+    Serwis haseł - wszystkie trasy hashują i sprawdzają hasła tylko przez niego.
+    Konfiguracja i pula należą do bieżącej aplikacji (current_app).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        pool = app.config.get('PASSWORD_HASH_POOL')
+        workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        if pool == 'thread':
+            # hashlib (scrypt, pbkdf2) zwalnia GIL - wątki wystarczą
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        elif pool == 'process':
+            executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            executor = None
+        app.extensions['passwords'] = PasswordHasherState(app.config.get('PASSWORD_HASH_METHOD', 'scrypt'), executor)
+
+    @property
+    def state(self):
+        return current_app.extensions['passwords']
+
+    @property
+    def method(self):
+        return self.state.method
+
+    def _run(self, func, *args):
+        executor = self.state.executor
+        if executor is None:
+            return func(*args)
+        return executor.submit(func, *args).result()
+
+    def hash(self, password):
+        """Nowy hash hasła skonfigurowaną metodą."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        """Czy hasło pasuje do hasha z bazy (dowolną metodą werkzeug)."""
+        return self._run(check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """
+        Czy hash był liczony inną metodą/kosztem niż obecna konfiguracja.
+
+        Hash werkzeug ma postać "metoda$sól$hash", a metoda jest zapisana
+        z pełnymi parametrami ('scrypt' -> 'scrypt:32768:8:1'), więc
+        pełną postać skonfigurowanej metody bierzemy z jednego próbnego hasha.
+        """
+        state = self.state
+        if state.prefix is None:
+            with state.lock:
+                if state.prefix is None:
+                    state.prefix = generate_password_hash('', state.method).split('$', 1)[0]
+        return stored_hash.split('$', 1)[0] != state.prefix
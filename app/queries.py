@@ -0,0 +1,289 @@
+"""
+Zapytania do bazy danych używane przez widoki.
+
+Listy (zadania, członkowie) budujemy w jednym miejscu, żeby widoki
+i szablony nie generowały osobnego SELECT dla każdego wiersza (N+1).
+
+Funkcje *_select zwracają samo zapytanie (SELECT) - wykonuje je sesja
+synchroniczna (funkcje bez sufiksu) albo asynchroniczna (app.async_views).
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Task, ArchivedTask, User, GroupMember, FamilyGroup
+
+# filtry statusu dla listy zadań
+TASK_STATUSES = ('open', 'done', 'all')
+
+
+def group_tasks_query(group_id):
+    """
+    Zadania grupy razem z przypisanym użytkownikiem, twórcą i grupą.
+
+    Szablon group_tasks.html odwołuje się do task.assigned_to.email
+    i task.created_by.email - bez joinedload każde z nich to osobne
+    zapytanie (lazy load), czyli 1 + 2N zapytań na stronę.
+    Tutaj wszystko przychodzi w jednym SELECT niezależnie od liczby zadań.
+    """
+    return Task.query.filter_by(group_id=group_id).options(
+        joinedload(Task.assigned_to),
+        joinedload(Task.created_by),
+        joinedload(Task.group)
+    ).order_by(
+        Task.is_completed.asc(),
+        Task.created_at.desc(),
+        Task.id.desc() # rozstrzyga remisy - potrzebne do stronicowania
+    )
+
+
+def encode_task_cursor(task):
+    """
+    Kursor = pozycja ostatniego zadania na stronie w kolejności listy.
+    Format: "<is_completed>_<created_at iso>_<id>"
+    """
+    return f'{int(task.is_completed)}_{task.created_at.isoformat()}_{task.id}'
+
+
+def decode_task_cursor(cursor):
+    """
+    Odwrotność encode_task_cursor. Zwraca None dla błędnego kursora
+    (np. ręcznie zmieniony URL) - wtedy pokazujemy pierwszą stronę.
+    """
+    try:
+        completed, created_at, task_id = cursor.split('_')
+        return bool(int(completed)), datetime.fromisoformat(created_at), int(task_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def group_tasks_page_select(group_id, status='open', assigned_to=None, after=None, per_page=50):
+    """
+    SELECT jednej strony listy zadań (keyset pagination).
+
+    Zamiast OFFSET (który i tak czyta wszystkie pominięte wiersze)
+    filtrujemy "wszystko po kursorze" w kolejności
+    (is_completed ASC, created_at DESC, id DESC) - koszt zależy od
+    rozmiaru strony, a nie od historii grupy.
+
+    status: 'open' (domyślnie - ukryj zrobione), 'done' lub 'all'
+    assigned_to: None (wszyscy), 0 (nieprzypisane) lub id użytkownika
+    after: kursor z poprzedniej strony
+
+    Pobiera per_page + 1 wierszy - nadmiarowy mówi, czy jest następna
+    strona (split_task_page).
+    """
+    query = group_tasks_query(group_id)
+
+    if status == 'open':
+        query = query.filter(Task.is_completed.is_(False))
+    elif status == 'done':
+        query = query.filter(Task.is_completed.is_(True))
+
+    if assigned_to == 0:
+        query = query.filter(Task.assigned_to_id.is_(None))
+    elif assigned_to is not None:
+        query = query.filter(Task.assigned_to_id == assigned_to)
+
+    position = decode_task_cursor(after) if after else None
+    if position:
+        completed, created_at, task_id = position
+        # w obrębie tego samego statusu: starsze od kursora; nadmiarowe
+        # created_at <= to zakres w indeksie - samo OR czytałoby indeks
+        # od najnowszych zadań aż do kursora
+        older = and_(Task.is_completed.is_(completed), Task.created_at <= created_at, or_(
+            Task.created_at < created_at,
+            and_(Task.created_at == created_at, Task.id < task_id)
+        ))
+        if completed:
+            query = query.filter(older)
+        else:
+            # po niezrobionych idą wszystkie zrobione
+            query = query.filter(or_(Task.is_completed.is_(True), older))
+
+    # pobierz jeden wiersz więcej - tak wiemy czy jest następna strona
+    return query.limit(per_page + 1).statement
+
+
+def split_task_page(tasks, per_page):
+    """
+    Wynik group_tasks_page_select -> (zadania, kursor następnej strony lub None).
+    """
+    next_cursor = None
+    if len(tasks) > per_page:
+        tasks = tasks[:per_page]
+        next_cursor = encode_task_cursor(tasks[-1])
+
+    return tasks, next_cursor
+
+
+def group_archived_tasks_select(group_id, assigned_to=None, after=None, per_page=50):
+    """
+    SELECT strony zadań grupy z archiwum (app.archive).
+
+    W archiwum są tylko zrobione zadania, więc kolejność to kolejność
+    zrobionych na liście (created_at DESC, id DESC) - indeks
+    ix_task_archive_group_created - i ten sam kursor co w
+    group_tasks_page_select. Pobiera per_page + 1 wierszy.
+    """
+    query = ArchivedTask.query.filter_by(group_id=group_id).options(
+        joinedload(ArchivedTask.assigned_to),
+        joinedload(ArchivedTask.created_by),
+        joinedload(ArchivedTask.group)
+    )
+
+    if assigned_to == 0:
+        query = query.filter(ArchivedTask.assigned_to_id.is_(None))
+    elif assigned_to is not None:
+        query = query.filter(ArchivedTask.assigned_to_id == assigned_to)
+
+    position = decode_task_cursor(after) if after else None
+    # kursor wśród niezrobionych - archiwum od początku
+    if position and position[0]:
+        _, created_at, task_id = position
+        query = query.filter(ArchivedTask.created_at <= created_at, or_(
+            ArchivedTask.created_at < created_at,
+            and_(ArchivedTask.created_at == created_at, ArchivedTask.id < task_id)
+        ))
+
+    return query.order_by(
+        ArchivedTask.created_at.desc(),
+        ArchivedTask.id.desc()
+    ).limit(per_page + 1).statement
+
+
+def merge_archived(tasks, archived):
+    """
+    Wynik group_tasks_page_select + group_archived_tasks_select -> jedna lista
+    w kolejności listy zadań (do split_task_page). Id w task i task_archive
+    są rozłączne, więc kursor wskazuje jedno zadanie.
+    """
+    merged = sorted(tasks + archived, key=lambda task: (task.created_at, task.id), reverse=True)
+    # sortowanie stabilne - niezrobione na początek, reszta jak wyżej
+    return sorted(merged, key=lambda task: task.is_completed)
+
+
+def group_tasks_page(group_id, status='open', assigned_to=None, after=None, per_page=50, include_archived=False):
+    """
+    Jedna strona listy zadań - parametry jak w group_tasks_page_select.
+
+    include_archived - razem z zadaniami z archiwum (dla status done/all):
+    drugie zapytanie po tym samym kursorze, wyniki scalone.
+    Zwraca (zadania, kursor następnej strony lub None).
+    """
+    statement = group_tasks_page_select(group_id, status, assigned_to, after, per_page)
+    tasks = db.session.scalars(statement).all()
+    if include_archived and status != 'open':
+        archived = db.session.scalars(group_archived_tasks_select(group_id, assigned_to, after, per_page)).all()
+        tasks = merge_archived(tasks, archived)
+    return split_task_page(tasks, per_page)
+
+
+def group_due_tasks_select(group_id, start=None, end=None, limit=100):
+    """
+    SELECT otwartych zadań grupy z terminem w [start, end), od najbliższego
+    terminu. Bez start - wszystkie do end (zaległe: end = teraz).
+
+    Zakres po due_at w indeksie ix_task_group_completed_due
+    (group_id, is_completed, due_at) - czytamy tylko zwracane wiersze,
+    niezależnie od liczby zadań grupy.
+    """
+    query = group_tasks_query(group_id).filter(
+        Task.is_completed.is_(False), Task.due_at.isnot(None)
+    )
+    if start is not None:
+        query = query.filter(Task.due_at >= start)
+    if end is not None:
+        query = query.filter(Task.due_at < end)
+    return query.order_by(None).order_by(Task.due_at, Task.id).limit(limit).statement
+
+
+def week_end(now):
+    """Początek następnego tygodnia (poniedziałek 00:00) - koniec "tego tygodnia"."""
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return monday + timedelta(weeks=1)
+
+
+def group_due_tasks(group_id, now, limit=100):
+    """
+    Zadania grupy z terminem: (zaległe, na ten tydzień) - po najwyżej limit.
+
+    Zaległe - otwarte z terminem przed now; na ten tydzień - z terminem
+    od now do końca tygodnia (week_end).
+    """
+    overdue = db.session.scalars(group_due_tasks_select(group_id, end=now, limit=limit)).all()
+    this_week = db.session.scalars(
+        group_due_tasks_select(group_id, start=now, end=week_end(now), limit=limit)
+    ).all()
+    return overdue, this_week
+
+
+def group_member_list_select(group_id):
+    """
+    SELECT członków grupy: wiersze (user_id, email, role) posortowane po email.
+    """
+    return db.select(User.id, User.email, GroupMember.role).join(
+        GroupMember, GroupMember.user_id == User.id
+    ).where(GroupMember.group_id == group_id).order_by(User.email)
+
+
+def group_member_choices(group_id):
+    """
+    Lista (id, email) członków grupy do pól select - jedno zapytanie
+    zamiast iterowania group.members i ładowania m.user dla każdego.
+    """
+    rows = db.session.execute(group_member_list_select(group_id))
+    return [(user_id, email) for user_id, email, role in rows]
+
+
+def group_member_list(group_id):
+    """
+    Członkowie grupy jako wiersze (user_id, email, role) - jedno zapytanie.
+    """
+    return db.session.execute(group_member_list_select(group_id)).all()
+
+
+def user_dashboard_select(user_id):
+    """
+    SELECT grup użytkownika z podsumowaniem - jedno zapytanie niezależnie od liczby grup.
+
+    Wiersze (id, name, version, role, member_count, open_count,
+    completed_count, assigned_open_count):
+    - open_count/completed_count - liczniki utrzymywane w FamilyGroup
+    - member_count i assigned_open_count (otwarte zadania przypisane
+      do użytkownika) - skorelowane podzapytania po indeksach
+      ix_group_member_group_role i ix_task_assigned_to_id
+    """
+    member_count = db.select(db.func.count(GroupMember.id)).where(
+        GroupMember.group_id == FamilyGroup.id
+    ).correlate(FamilyGroup).scalar_subquery()
+
+    assigned_open_count = db.select(db.func.count(Task.id)).where(
+        Task.assigned_to_id == user_id,
+        Task.group_id == FamilyGroup.id,
+        Task.is_completed.is_(False)
+    ).correlate(FamilyGroup).scalar_subquery()
+
+    return (
+        db.select(
+            FamilyGroup.id,
+            FamilyGroup.name,
+            FamilyGroup.version,
+            GroupMember.role,
+            member_count.label('member_count'),
+            FamilyGroup.open_count,
+            FamilyGroup.completed_count,
+            assigned_open_count.label('assigned_open_count')
+        )
+        .join(GroupMember, GroupMember.group_id == FamilyGroup.id)
+        .where(GroupMember.user_id == user_id)
+        .order_by(FamilyGroup.name, FamilyGroup.id)
+    )
+
+
+def user_dashboard(user_id):
+    """
+    Grupy użytkownika z podsumowaniem (wiersze jak w user_dashboard_select).
+    """
+    return db.session.execute(user_dashboard_select(user_id)).all()
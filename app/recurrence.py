@@ -0,0 +1,232 @@
+"""
+Zadania powtarzane (cotygodniowe śmieci, comiesięczne rachunki).
+
+Seria to zwykłe zadania z terminem (due_at). Regułę (task.recurrence)
+ma tylko najnowsze wystąpienie - gdy jego termin minie, harmonogram
+(`flask schedule-recurring`, np. z crona co kilka minut) tworzy
+następne wystąpienie i przenosi na nie regułę. W każdej chwili seria ma
+więc jedno nadchodzące zadanie. Usunięcie zadania z regułą kończy serię.
+
+Reguła: jednostka ('daily', 'weekly', 'monthly', 'yearly') i opcjonalny
+interwał po dwukropku - 'weekly:2' to co dwa tygodnie. Terminy
+przeoczone (harmonogram nie działał) są pomijane - nowe wystąpienie
+dostaje pierwszy termin w przyszłości.
+
+Serie miesięczne i roczne trzymają dzień pierwszego terminu (kotwicę)
+i przycinają go do długości miesiąca: 31.01 -> 28.02 -> 31.03 -> 30.04,
+28.02 zostaje 28. dniem, 29.02 co rok -> 28.02 -> ... -> 29.02 w roku
+przestępnym. Dni 29-31 zapisujemy w regule po '@' ('monthly@31',
+anchor_rule przy tworzeniu zadania) - reguła przechodzi na kolejne
+wystąpienia razem z kotwicą. Dni 1-28 są w każdym miesiącu, więc
+kotwicą jest po prostu dzień terminu.
+
+Nowe wystąpienia tworzone są z wyłączonym triggerem indeksu wyszukiwania
+(app.search.suspend_index) - paczka trafia do indeksu jednym INSERT ...
+SELECT zamiast wiersz po wierszu.
+
+Harmonogram:
+- czyta tylko zadania z regułą i minionym terminem - indeks częściowy
+  ix_task_recurrence_due, więc przebieg bez pracy to jeden odczyt indeksu
+  niezależnie od liczby zadań w bazie
+- paczka = SELECT najstarszych zaległych wystąpień, UPDATE ... RETURNING
+  zdejmujący z nich regułę (tylko tam, gdzie wciąż jest - dwa równoległe
+  przebiegi nie utworzą duplikatów), jeden INSERT nowych (executemany)
+  i jeden UPDATE liczników grup (executemany); paczka = jedna transakcja
+- po przekroczeniu budżetu czasu przebieg kończy się po bieżącej paczce,
+  resztą zajmie się następny (najstarsze terminy idą pierwsze)
+
+Nowe wystąpienia trafiają do historii grup (app.audit, bez autora)
+i podbijają wersję grup (ETag API), ale nie wysyłają
+zdarzeń SSE - harmonogram działa w osobnym procesie, a broker zdarzeń
+jest lokalny dla procesu.
+"""
+
+import calendar
+import time
+from datetime import timedelta
+from flask import current_app
+from app import db, audit, search
+from app.models import Task, FamilyGroup, utcnow
+
+# reguły do wyboru w formularzu: (wartość, etykieta)
+RECURRENCE_CHOICES = [
+    ('', 'Nie powtarzaj'),
+    ('daily', 'Codziennie'),
+    ('weekly', 'Co tydzień'),
+    ('weekly:2', 'Co dwa tygodnie'),
+    ('monthly', 'Co miesiąc'),
+    ('yearly', 'Co rok'),
+]
+
+UNITS = ('daily', 'weekly', 'monthly', 'yearly')
+
+# najdłuższy interwał w regule (np. 'daily:365')
+MAX_INTERVAL = 365
+
+# jednostki liczone w miesiącach - tylko one mają kotwicę dnia
+MONTH_UNITS = ('monthly', 'yearly')
+
+# kotwica w regule tylko dla dni, których nie ma w każdym miesiącu
+ANCHOR_DAYS = range(29, 32)
+
+
+def parse_rule(rule):
+    """
+    'weekly:2' -> ('weekly', 2, None), 'monthly@31' -> ('monthly', 1, 31).
+    Błędna reguła - ValueError.
+    """
+    rule_part, has_anchor, anchor = rule.partition('@')
+    unit, _, interval = rule_part.partition(':')
+    interval = int(interval) if interval else 1
+    anchor = int(anchor) if has_anchor else None
+    if unit not in UNITS or not 1 <= interval <= MAX_INTERVAL:
+        raise ValueError(f'błędna reguła powtarzania: {rule!r}')
+    if anchor is not None and (unit not in MONTH_UNITS or anchor not in ANCHOR_DAYS):
+        raise ValueError(f'błędna reguła powtarzania: {rule!r}')
+    return unit, interval, anchor
+
+
+def anchor_rule(rule, due_at):
+    """
+    Reguła nowej serii z kotwicą dnia pierwszego terminu: 'monthly'
+    z terminem 31.01 -> 'monthly@31'. Pozostałe reguły bez zmian.
+    """
+    if not rule or due_at is None:
+        return rule
+    unit, _, anchor = parse_rule(rule)
+    if unit in MONTH_UNITS and anchor is None and due_at.day in ANCHOR_DAYS:
+        return f'{rule}@{due_at.day}'
+    return rule
+
+
+def advance(due_at, rule, steps=1):
+    """Termin o `steps` wystąpień późniejszy niż due_at."""
+    unit, interval, anchor = parse_rule(rule)
+    if unit == 'daily':
+        return due_at + timedelta(days=interval * steps)
+    if unit == 'weekly':
+        return due_at + timedelta(weeks=interval * steps)
+    months = interval * steps * (12 if unit == 'yearly' else 1)
+    return _add_months(due_at, months, anchor or due_at.day)
+
+
+def next_occurrence(due_at, rule, after):
+    """Pierwszy termin serii późniejszy niż `after` (przeoczone pomijamy)."""
+    unit, interval, _ = parse_rule(rule)
+    if unit in ('daily', 'weekly'):
+        period = timedelta(days=interval * (7 if unit == 'weekly' else 1))
+        # ile okresów przeskoczyć - bez pętli po każdym dniu przerwy
+        steps = max(1, (after - due_at) // period + 1)
+        return due_at + period * steps
+    steps = 1
+    while (candidate := advance(due_at, rule, steps)) <= after:
+        steps += 1
+    return candidate
+
+
+def _add_months(value, months, anchor):
+    # dzień kotwicy serii, przycięty do długości miesiąca - nie dzień bieżącego
+    # terminu, który mógł już być przycięty (31.01 -> 28.02 -> 31.03, nie 28.03)
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    day = min(anchor, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def materialize_due(now=None, batch_size=1000, budget=None):
+    """
+    Utwórz następne wystąpienia serii, których termin minął.
+
+    budget - limit czasu w sekundach (None - do końca); sprawdzany między
+    paczkami. Commit po każdej paczce. Zwraca statystyki przebiegu:
+    rules (przetworzone serie), created, invalid (błędne reguły - seria
+    zakończona), batches, seconds, complete (False - przerwany budżetem).
+    """
+    now = now or utcnow()
+    started = time.perf_counter()
+    stats = {'rules': 0, 'created': 0, 'invalid': 0, 'batches': 0, 'complete': False}
+    while budget is None or time.perf_counter() - started < budget:
+        rows = _claim_batch(now, batch_size)
+        if not rows:
+            stats['complete'] = True
+            break
+        created, invalid = _create_occurrences(rows, now)
+        db.session.commit()
+        stats['rules'] += len(rows)
+        stats['created'] += created
+        stats['invalid'] += invalid
+        stats['batches'] += 1
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def _claim_batch(now, batch_size):
+    # najstarsze zaległe wystąpienia z regułą (indeks ix_task_recurrence_due)
+    table = Task.__table__
+    due = db.and_(table.c.recurrence.isnot(None), table.c.due_at <= now)
+    batch = db.select(
+        table.c.id, table.c.title, table.c.description, table.c.group_id,
+        table.c.assigned_to_id, table.c.created_by_id, table.c.due_at, table.c.recurrence
+    ).where(due).order_by(table.c.due_at, table.c.id).limit(batch_size)
+    if db.session.get_bind().dialect.name == 'postgresql':
+        batch = batch.with_for_update(skip_locked=True)
+    rows = db.session.execute(batch).all()
+    if not rows:
+        return rows
+    # zdejmij regułę - tylko z wierszy, które wciąż ją mają; RETURNING mówi,
+    # które wystąpienia są nasze (równoległy przebieg mógł je już przejąć)
+    claimed = set(db.session.scalars(
+        db.update(table)
+        .where(table.c.id.in_([row.id for row in rows]), table.c.recurrence.isnot(None))
+        .values(recurrence=None)
+        .returning(table.c.id)
+    ))
+    return [row for row in rows if row.id in claimed]
+
+
+def _create_occurrences(rows, now):
+    new_tasks, open_deltas, invalid = [], {}, 0
+    for row in rows:
+        try:
+            due_at = next_occurrence(row.due_at, row.recurrence, now)
+        except ValueError:
+            # reguła spoza formularza (np. ręczna zmiana w bazie) - seria się kończy
+            current_app.logger.warning('Zadanie %d: %r - seria zakończona', row.id, row.recurrence)
+            invalid += 1
+            continue
+        new_tasks.append({
+            'title': row.title,
+            'description': row.description,
+            'group_id': row.group_id,
+            'assigned_to_id': row.assigned_to_id,
+            'created_by_id': row.created_by_id,
+            'is_completed': False,
+            'created_at': now,
+            'due_at': due_at,
+            'recurrence': row.recurrence,
+        })
+        open_deltas[row.group_id] = open_deltas.get(row.group_id, 0) + 1
+
+    if new_tasks:
+        # Core (tabela, nie model) - bez przetwarzania wierszy przez ORM;
+        # id w kolejności wierszy - do wpisów w historii grup. Indeks
+        # wyszukiwania jednym INSERT ... SELECT po paczce, nie triggerem
+        # na każdy wiersz
+        table = Task.__table__
+        connection = db.session.connection()
+        search.suspend_index(connection)
+        ids = db.session.scalars(table.insert().returning(table.c.id, sort_by_parameter_order=True), new_tasks).all()
+        search.resume_index(connection, min(ids))
+        audit.record_many(audit.TASK_CREATED, [
+            {'group_id': task['group_id'], 'task_id': task_id, 'data': {'title': task['title']}}
+            for task_id, task in zip(ids, new_tasks)
+        ])
+        groups = FamilyGroup.__table__.c
+        db.session.execute(
+            db.update(FamilyGroup.__table__)
+            .where(groups.id == db.bindparam('group'))
+            .values(open_count=groups.open_count + db.bindparam('delta'),
+                    version=groups.version + 1, last_activity_at=now),
+            [{'group': group_id, 'delta': delta} for group_id, delta in open_deltas.items()]
+        )
+    return len(new_tasks), invalid
@@ -0,0 +1,200 @@
+"""
+Wyszukiwanie pełnotekstowe zadań w obrębie grupy (tytuł + opis).
+
+SQLite: tabela FTS5 task_fts (rowid = task.id), utrzymywana przez
+triggery na tabeli task - każdy zapis zadania (ORM, Core, ręczny SQL)
+aktualizuje indeks w tej samej transakcji. Import wsadowy wyłącza
+trigger INSERT na czas transakcji i indeksuje nowe zadania na końcu
+(suspend_index / resume_index).
+Kolumna grp ("g<id grupy>") zawęża dopasowanie do grupy już w indeksie,
+więc koszt zapytania zależy od grupy i szukanych słów, a nie od liczby
+wszystkich zadań w bazie. Tokenizer unicode61 z remove_diacritics -
+"smieci" znajduje "śmieci".
+
+Słowa szukamy po prefiksie z indeksu prefiksów (3-5 znaków): dłuższe
+słowo obcinamy do 5 znaków - "śmieciami" znajdzie "śmieci" (odmiana),
+kosztem czasem nadmiarowych trafień. Prefiks innej długości niż
+w indeksie FTS5 składa z list wszystkich pasujących słów w całej bazie -
+wtedy czas rośnie z rozmiarem bazy, stąd stałe długości.
+
+Postgres: indeks GIN na wyrażeniu to_tsvector (TSVECTOR_SQL) - zapytanie
+używa dokładnie tego samego wyrażenia, inaczej planner nie użyje indeksu.
+
+Inne bazy: LIKE '%słowo%' (pełny skan zadań grupy).
+
+Wyniki posortowane po trafności (SQLite: słowa w tytule, potem
+najnowsze; Postgres: ts_rank), stronicowane numerem strony -
+wyszukiwania rzadko wychodzą poza kilka pierwszych stron.
+
+Schemat zakładają migracja e5b9d1f3a7c2 i db.create_all() (zdarzenie
+after_create tabeli task). Uwaga: przebudowa tabeli task
+(batch_alter_table z recreate) usuwa triggery - trzeba je założyć
+ponownie (create_search_index).
+"""
+
+import re
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models import Task
+
+# słowa zapytania - najwyżej tyle
+MAX_TERMS = 8
+
+# długości prefiksów w indeksie FTS5 (prefix = '3 4 5')
+MIN_PREFIX, MAX_PREFIX = 3, 5
+
+TSVECTOR_SQL = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))"
+
+SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        title, description, grp,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '3 4 5'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts (rowid, title, description, grp)
+        VALUES (new.id, new.title, coalesce(new.description, ''), 'g' || new.group_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        DELETE FROM task_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description, group_id ON task BEGIN
+        UPDATE task_fts SET title = new.title, description = coalesce(new.description, ''),
+                            grp = 'g' || new.group_id
+        WHERE rowid = old.id;
+    END
+    """,
+)
+
+SQLITE_BACKFILL = """
+    INSERT INTO task_fts (rowid, title, description, grp)
+    SELECT id, title, coalesce(description, ''), 'g' || group_id FROM task
+"""
+
+POSTGRES_DDL = (
+    f'CREATE INDEX IF NOT EXISTS ix_task_search ON task USING gin (({TSVECTOR_SQL}))',
+)
+
+
+def create_search_index(connection, backfill=False):
+    """Załóż indeks wyszukiwania dla bazy połączenia (backfill - zaindeksuj istniejące zadania)."""
+    dialect = connection.dialect.name
+    statements = SQLITE_DDL if dialect == 'sqlite' else POSTGRES_DDL if dialect == 'postgresql' else ()
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+    if backfill and dialect == 'sqlite':
+        connection.exec_driver_sql('DELETE FROM task_fts')
+        connection.exec_driver_sql(SQLITE_BACKFILL)
+
+
+def suspend_index(connection):
+    """
+    Import wsadowy: wyłącz trigger INSERT do końca transakcji - nowe
+    zadania zaindeksuje resume_index jednym INSERT ... SELECT (dużo
+    szybciej niż wiersz po wierszu). DDL w SQLite jest transakcyjny,
+    rollback przywraca trigger.
+    """
+    if connection.dialect.name == 'sqlite':
+        # pysqlite otwiera transakcję dopiero przed INSERT/UPDATE/DELETE -
+        # DROP jako pierwsza instrukcja zatwierdziłby się od razu
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
+        connection.exec_driver_sql('DROP TRIGGER IF EXISTS task_fts_insert')
+
+
+def resume_index(connection, first_task_id):
+    """Zaindeksuj zadania od first_task_id i przywróć trigger (po suspend_index)."""
+    if connection.dialect.name != 'sqlite':
+        return
+    connection.exec_driver_sql(SQLITE_BACKFILL + ' WHERE id >= ?', (first_task_id,))
+    connection.exec_driver_sql(SQLITE_DDL[1])
+
+
+@event.listens_for(Task.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    create_search_index(connection)
+
+
+@event.listens_for(Task.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        # triggery znikają razem z tabelą task, tabela FTS zostałaby
+        connection.exec_driver_sql('DROP TABLE IF EXISTS task_fts')
+
+
+def search_terms(text):
+    """Słowa zapytania użytkownika (bez operatorów i znaków specjalnych)."""
+    return re.findall(r'\w+', (text or '').lower())[:MAX_TERMS]
+
+
+def search_tasks_select(group_id, terms, page=1, per_page=20, dialect='sqlite'):
+    """
+    SELECT jednej strony wyników (per_page + 1 wierszy - nadmiarowy
+    mówi, czy jest następna strona). Zadania z użytkownikami jak na liście zadań.
+    """
+    query = db.select(Task).options(
+        joinedload(Task.assigned_to),
+        joinedload(Task.created_by),
+    ).where(Task.group_id == group_id)
+
+    if dialect == 'sqlite':
+        # grupa i słowa (prefiksy) dopasowane w indeksie; słowa tylko w tytule i opisie
+        words = ' AND '.join(_fts_term(term) for term in terms)
+        group = f'grp : g{int(group_id)}'
+        # trafność: najpierw zadania ze wszystkimi słowami w tytule, potem najnowsze.
+        # Nie bm25 - liczy IDF czytając całe listy trafień fraz (cała grupa, słowo
+        # we wszystkich grupach), więc czas rósłby z rozmiarem bazy.
+        hits = db.text(
+            'SELECT rowid AS task_id, rowid IN ('
+            '    SELECT rowid FROM task_fts WHERE task_fts MATCH :title_match'
+            ') AS in_title '
+            'FROM task_fts WHERE task_fts MATCH :match'
+        ).bindparams(
+            match=f'{group} AND {{title description}} : ({words})',
+            title_match=f'{group} AND title : ({words})',
+        ).columns(task_id=db.Integer, in_title=db.Boolean).subquery('hits')
+        query = query.join(hits, hits.c.task_id == Task.id).order_by(
+            hits.c.in_title.desc(), Task.created_at.desc(), Task.id.desc()
+        )
+    elif dialect == 'postgresql':
+        vector = db.literal_column(TSVECTOR_SQL)
+        tsquery = db.func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms))
+        query = query.where(vector.op('@@')(tsquery)).order_by(
+            db.func.ts_rank(vector, tsquery).desc(), Task.id.desc()
+        )
+    else:
+        for term in terms:
+            pattern = f'%{term}%'
+            query = query.where(db.or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+        query = query.order_by(Task.created_at.desc(), Task.id.desc())
+
+    return query.limit(per_page + 1).offset((page - 1) * per_page)
+
+
+def _fts_term(term):
+    # krótkie słowa ("do", "na") dokładnie, dłuższe po prefiksie z indeksu
+    if len(term) < MIN_PREFIX:
+        return f'"{term}"'
+    return f'"{term[:MAX_PREFIX]}"*'
+
+
+def search_tasks(group_id, text, page=1, per_page=20):
+    """
+    Wyszukaj zadania grupy. Zwraca (zadania, czy jest następna strona);
+    puste zapytanie = brak wyników.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return [], False
+    dialect = db.session.get_bind().dialect.name
+    statement = search_tasks_select(group_id, terms, max(page, 1), per_page, dialect)
+    tasks = db.session.scalars(statement).unique().all()
+    return tasks[:per_page], len(tasks) > per_page
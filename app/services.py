@@ -0,0 +1,282 @@
+"""
+Operacje zmieniające grupy, członkostwa i zadania.
+
+Widoki HTML i API korzystają z tych samych funkcji, więc każda zmiana
+podbija wersję grupy (FamilyGroup.touch) w tej samej transakcji.
+Zmiany zadań aktualizują też liczniki open_count/completed_count -
+o tyle, ile wierszy faktycznie zmieniło UPDATE/DELETE (RETURNING),
+więc równoległe przełączenia tego samego zadania nie psują liczników.
+
+Każda zmiana zapisuje też zdarzenie (app.events) - strumienie SSE grupy
+dostają je dopiero po commit - i wpis w historii grupy (app.audit),
+w tej samej transakcji co sama zmiana. Praca, która nie musi zdążyć przed
+odpowiedzią (powiadomienia), jest zlecana jako zadanie w tle
+(app.jobs) - też w tej samej transakcji.
+
+Funkcje NIE robią commit - robi go wywołujący (jedna transakcja na
+request, rollback w razie błędu). Po udanym commit wywołujący unieważnia
+cache członkostw (invalidate_membership), jeśli zmieniały się członkostwa.
+"""
+
+from sqlalchemy import case
+from app import db, events, jobs, audit
+from app.models import GroupMember, FamilyGroup, Task
+from app.recurrence import anchor_rule
+
+
+def add_member(group, user, role='member'):
+    """Dodaj użytkownika do grupy (nowi członkowie zawsze jako 'member')."""
+    membership = GroupMember(user=user, group=group, role=role)
+    db.session.add(membership)
+    version = FamilyGroup.touch(group.id)
+    events.record(group.id, version, 'member.added', user_id=user.id, email=user.email, role=role)
+    audit.record(group.id, audit.MEMBER_ADDED, user_id=user.id, role=role)
+    return membership
+
+
+def remove_member(membership):
+    """Usuń członkostwo."""
+    group_id, user_id = membership.group_id, membership.user_id
+    db.session.delete(membership)
+    version = FamilyGroup.touch(group_id)
+    events.record(group_id, version, 'member.removed', user_id=user_id)
+    audit.record(group_id, audit.MEMBER_REMOVED, user_id=user_id)
+
+
+def is_last_admin(group_id, user_id):
+    """Czy użytkownik jest jedynym administratorem grupy."""
+    admin_count = GroupMember.query.filter_by(
+        group_id=group_id,
+        role='admin'
+    ).count()
+    role = db.session.query(GroupMember.role).filter_by(
+        group_id=group_id,
+        user_id=user_id
+    ).scalar()
+    return role == 'admin' and admin_count <= 1
+
+
+def rename_group(group, name):
+    """Zmień nazwę grupy."""
+    old_name = group.name
+    group.name = name
+    version = FamilyGroup.touch(group.id)
+    events.record(group.id, version, 'group.renamed', name=name)
+    audit.record(group.id, audit.GROUP_RENAMED, old_name=old_name, name=name)
+
+
+def create_task(group_id, created_by_id, title, description=None, assigned_to_id=None,
+                due_at=None, recurrence=None):
+    """Nowe zadanie w grupie (recurrence - reguła powtarzania, app.recurrence)."""
+    task = Task(
+        title=title,
+        description=description,
+        group_id=group_id,
+        assigned_to_id=assigned_to_id,
+        created_by_id=created_by_id,
+        due_at=due_at,
+        recurrence=anchor_rule(recurrence, due_at) or None
+    )
+    db.session.add(task)
+    # touch() robi autoflush - po nim zadanie ma już id
+    version = FamilyGroup.touch(group_id, open_delta=1)
+    events.record(group_id, version, 'task.created', task={
+        'id': task.id,
+        'title': task.title,
+        'description': task.description,
+        'assigned_to_id': task.assigned_to_id,
+        'created_by_id': task.created_by_id,
+        'due_at': task.due_at.isoformat() if task.due_at else None,
+        'recurrence': task.recurrence,
+    })
+    audit.record(group_id, audit.TASK_CREATED, task_id=task.id, title=task.title)
+    _notify_assigned([(task.id, assigned_to_id)], created_by_id)
+    return task
+
+
+def set_task_completed(task, completed):
+    """Oznacz zadanie jako zrobione/niezrobione."""
+    # warunkowy UPDATE zamiast przypisania atrybutu - liczniki zmieniamy
+    # tylko gdy ten request naprawdę zmienił status
+    changed = db.session.execute(
+        db.update(Task)
+        .where(Task.id == task.id, Task.is_completed.is_(not completed))
+        .values(is_completed=completed, completed_at=db.func.now() if completed else None)
+    ).rowcount
+    if changed:
+        version = _touch_completed(task.group_id, 1 if completed else -1)
+        events.record(task.group_id, version, 'task.toggled', task_id=task.id, is_completed=completed)
+        audit.record(task.group_id, audit.TASK_COMPLETED if completed else audit.TASK_REOPENED, task_id=task.id)
+
+
+def delete_task(task):
+    """Usuń zadanie."""
+    rows = db.session.execute(
+        db.delete(Task).where(Task.id == task.id).returning(Task.is_completed)
+    ).scalars().all()
+    if rows:
+        version = _touch_deleted(task.group_id, rows)
+        events.record(task.group_id, version, 'task.deleted', task_id=task.id)
+        # tytuł we wpisie - zadania już nie ma w tabeli task
+        audit.record(task.group_id, audit.TASK_DELETED, task_id=task.id, title=task.title)
+
+
+def _notify_assigned(assignments, created_by_id):
+    """
+    Powiadomienia dla przypisanych osób (w tle, jedno zlecenie na wszystkie zadania) -
+    assignments: lista (id zadania, assigned_to_id). Pomija zadania, które ktoś przypisał sam sobie.
+    """
+    jobs.enqueue_many('task-assigned', [
+        (f'task-assigned:{task_id}:{user_id}', {'task_id': task_id, 'user_id': user_id})
+        for task_id, user_id in assignments
+        if user_id and user_id != created_by_id
+    ])
+
+
+def _touch_completed(group_id, delta):
+    """touch() po zmianie statusu: delta > 0 - tyle zadań zrobionych, < 0 - przywróconych. Zwraca wersję."""
+    return FamilyGroup.touch(group_id, open_delta=-delta, completed_delta=delta)
+
+
+def _touch_deleted(group_id, completed_flags):
+    """touch() po usunięciu zadań (completed_flags - is_completed usuniętych). Zwraca wersję."""
+    done = sum(1 for flag in completed_flags if flag)
+    return FamilyGroup.touch(group_id, open_delta=done - len(completed_flags), completed_delta=-done)
+
+
+def _bulk_task_filter(group_id, task_ids, user_id=None, role=None):
+    """
+    Warunek "zadania z listy, które current_user może zmieniać":
+    należą do grupy, a dla nie-adminów (gdy podano user_id) - są jego.
+
+    Autoryzacja jest częścią WHERE tego samego UPDATE/DELETE, więc nie ma
+    osobnego get_or_404 + sprawdzenia dla każdego zadania.
+    """
+    conditions = [Task.group_id == group_id, Task.id.in_(task_ids)]
+    if user_id is not None and role != 'admin':
+        conditions.append(Task.created_by_id == user_id)
+    return conditions
+
+
+def bulk_create_tasks(group_id, created_by_id, items):
+    """
+    Wiele zadań jednym INSERT (executemany).
+
+    items: lista słowników z kluczami title, description, assigned_to_id
+    (opcjonalnie due_at, recurrence)
+    Zwraca listę id nowych zadań.
+    """
+    if not items:
+        return []
+    rows = [
+        {
+            'title': item['title'],
+            'description': item.get('description'),
+            'assigned_to_id': item.get('assigned_to_id'),
+            'due_at': item.get('due_at'),
+            'recurrence': anchor_rule(item.get('recurrence'), item.get('due_at')) or None,
+            'group_id': group_id,
+            'created_by_id': created_by_id,
+        }
+        for item in items
+    ]
+    # kolejność id jak kolejność wierszy (powiadomienia niżej): baza nadaje rosnące id
+    # w kolejności wstawiania, a sort_by_parameter_order bez kolumny-wartownika
+    # to osobny INSERT na każdy wiersz zamiast paczek insertmanyvalues
+    ids = sorted(db.session.scalars(db.insert(Task).returning(Task.id), rows))
+    version = FamilyGroup.touch(group_id, open_delta=len(ids))
+    events.record(group_id, version, 'tasks.created', task_ids=ids)
+    audit.record_many(audit.TASK_CREATED, [
+        {'group_id': group_id, 'task_id': task_id, 'data': {'title': row['title']}}
+        for task_id, row in zip(ids, rows)
+    ])
+    _notify_assigned([(task_id, row['assigned_to_id']) for task_id, row in zip(ids, rows)], created_by_id)
+    return ids
+
+
+def bulk_set_completed(group_id, task_ids, completed):
+    """
+    Oznacz wiele zadań grupy jako zrobione/niezrobione jednym UPDATE.
+
+    Zadania spoza grupy i te, które już mają ten status, są pomijane.
+    Zwraca listę id zmienionych zadań.
+    """
+    if not task_ids:
+        return []
+    ids = db.session.scalars(
+        db.update(Task)
+        .where(*_bulk_task_filter(group_id, task_ids), Task.is_completed.is_(not completed))
+        .values(is_completed=completed, completed_at=db.func.now() if completed else None)
+        .returning(Task.id),
+        execution_options={'synchronize_session': False}
+    ).all()
+    if ids:
+        version = _touch_completed(group_id, len(ids) if completed else -len(ids))
+        events.record(group_id, version, 'tasks.updated', task_ids=ids, is_completed=completed)
+        audit.record_many(audit.TASK_COMPLETED if completed else audit.TASK_REOPENED,
+                          [{'group_id': group_id, 'task_id': task_id} for task_id in ids])
+    return ids
+
+
+def bulk_delete_tasks(group_id, task_ids, user_id, role):
+    """
+    Usuń wiele zadań grupy jednym DELETE.
+
+    Admin usuwa dowolne zadania grupy, pozostali tylko swoje - reszta
+    jest pomijana. Zwraca listę id usuniętych zadań.
+    """
+    if not task_ids:
+        return []
+    rows = db.session.execute(
+        db.delete(Task)
+        .where(*_bulk_task_filter(group_id, task_ids, user_id=user_id, role=role))
+        .returning(Task.id, Task.is_completed, Task.title),
+        execution_options={'synchronize_session': False}
+    ).all()
+    ids = [row.id for row in rows]
+    if rows:
+        version = _touch_deleted(group_id, [row.is_completed for row in rows])
+        events.record(group_id, version, 'tasks.deleted', task_ids=ids)
+        audit.record_many(audit.TASK_DELETED, [
+            {'group_id': group_id, 'task_id': row.id, 'data': {'title': row.title}} for row in rows
+        ])
+    return ids
+
+
+def recount_task_counters(fix=True):
+    """
+    Przelicz liczniki zadań wszystkich grup jednym GROUP BY.
+
+    Zwraca listę (group_id, (open, completed) w bazie, (open, completed) policzone)
+    dla grup z rozjechanymi licznikami; fix=True - poprawia je
+    (i podbija wersję, żeby klienci API nie trzymali starych liczników).
+    """
+    is_done = db.func.coalesce(db.func.sum(case((Task.is_completed.is_(True), 1), else_=0)), 0)
+    is_open = db.func.coalesce(db.func.sum(case((Task.is_completed.is_(False), 1), else_=0)), 0)
+    rows = db.session.execute(
+        db.select(
+            FamilyGroup.id, FamilyGroup.open_count, FamilyGroup.completed_count,
+            is_open, is_done
+        )
+        .outerjoin(Task, Task.group_id == FamilyGroup.id)
+        .group_by(FamilyGroup.id, FamilyGroup.open_count, FamilyGroup.completed_count)
+    ).all()
+
+    drift = [
+        (group_id, (stored_open, stored_done), (real_open, real_done))
+        for group_id, stored_open, stored_done, real_open, real_done in rows
+        if (stored_open, stored_done) != (real_open, real_done)
+    ]
+    if fix and drift:
+        # UPDATE po kluczu głównym, executemany
+        db.session.execute(db.update(FamilyGroup), [
+            {'id': group_id, 'open_count': real[0], 'completed_count': real[1]}
+            for group_id, _, real in drift
+        ])
+        db.session.execute(
+            db.update(FamilyGroup)
+            .where(FamilyGroup.id.in_([group_id for group_id, _, _ in drift]))
+            .values(version=FamilyGroup.version + 1),
+            execution_options={'synchronize_session': False}
+        )
+    return drift
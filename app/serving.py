@@ -0,0 +1,113 @@
+"""
+Adapter WSGI -> ASGI dla asgi.py (uvicorn) z ograniczonymi pulami wątków.
+
+asgiref.wsgi.WsgiToAsgi uruchamia aplikację przez sync_to_async
+z thread_sensitive=True - wszystkie requesty idą po kolei przez jeden
+wspólny wątek, więc jeden otwarty strumień SSE blokuje cały proces.
+PooledWsgiToAsgi uruchamia aplikację w dwóch osobnych pulach:
+
+- zwykłe requesty - ASGI_THREADS wątków
+- strumienie (STREAM_ENDPOINTS) - EVENTS_MAX_STREAMS wątków i kilka
+  zapasowych na szybką odpowiedź 503 (limit strumieni w app.events)
+
+Strumienie nie zabierają więc wątków zwykłym requestom. Rozłączenie
+klienta (http.disconnect) kończy strumień przy najbliższym pingu
+(EVENTS_KEEPALIVE), a nie dopiero po EVENTS_STREAM_TIMEOUT - uvicorn
+po rozłączeniu po cichu ignoruje send().
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from werkzeug.exceptions import HTTPException
+
+# widoki, które trzymają połączenie (text/event-stream)
+STREAM_ENDPOINTS = frozenset({'api.group_events'})
+
+# wątki ponad limit strumieni - odpowiedź 503, gdy limit jest wyczerpany
+SPARE_STREAM_THREADS = 2
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """
+    WsgiToAsgi z pulami wątków zamiast jednego wspólnego wątku.
+
+    flask_app - aplikacja z create_app(); rozmiary pul z jej konfiguracji
+    (ASGI_THREADS, EVENTS_MAX_STREAMS).
+    """
+
+    def __init__(self, flask_app):
+        super().__init__(flask_app)
+        threads = flask_app.config['ASGI_THREADS']
+        streams = flask_app.config['EVENTS_MAX_STREAMS'] or threads
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='asgi-request')
+        self.stream_executor = ThreadPoolExecutor(streams + SPARE_STREAM_THREADS,
+                                                  thread_name_prefix='asgi-stream')
+        # dopasowanie ścieżki do widoku - tylko w wątku pętli zdarzeń
+        self._urls = flask_app.url_map.bind('localhost')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await super().__call__(scope, receive, send)
+        executor = self.stream_executor if self.is_stream(scope) else self.executor
+        await _PooledInstance(self.wsgi_application, executor)(scope, receive, send)
+
+    def is_stream(self, scope):
+        try:
+            endpoint, _ = self._urls.match(scope['path'], method=scope['method'])
+        except HTTPException:
+            return False
+        return endpoint in STREAM_ENDPOINTS
+
+
+class _PooledInstance(WsgiToAsgiInstance):
+    """Jedno połączenie: aplikacja w wątku z puli, koniec przy rozłączeniu klienta."""
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+        self.disconnected = threading.Event()
+
+    async def __call__(self, scope, receive, send):
+        self.receive = receive
+        await super().__call__(scope, receive, send)
+
+    async def run_wsgi_app(self, body):
+        watcher = asyncio.ensure_future(self._wait_for_disconnect())
+        try:
+            await sync_to_async(self._run_wsgi_app, thread_sensitive=False, executor=self.executor)(body)
+        finally:
+            watcher.cancel()
+
+    async def _wait_for_disconnect(self):
+        while (await self.receive())['type'] != 'http.disconnect':
+            pass
+        self.disconnected.set()
+
+    def _run_wsgi_app(self, body):
+        """Jak WsgiToAsgiInstance.run_wsgi_app, ale z close() odpowiedzi (WSGI) i końcem przy rozłączeniu."""
+        environ = self.build_environ(self.scope, body)
+        output = self.wsgi_application(environ, self.start_response)
+        try:
+            bytes_sent = 0
+            for chunk in output:
+                if self.disconnected.is_set():
+                    return
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                if self.response_content_length is not None:
+                    chunk = chunk[:self.response_content_length - bytes_sent]
+                self.sync_send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                bytes_sent += len(chunk)
+                if bytes_sent == self.response_content_length:
+                    break
+            if not self.response_started:
+                self.response_started = True
+                self.sync_send(self.response_start)
+            self.sync_send({'type': 'http.response.body'})
+        finally:
+            if hasattr(output, 'close'):
+                output.close()
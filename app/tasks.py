@@ -0,0 +1,259 @@
+"""
+Widoki listy zadań (TODO) grupy.
+
+Każda trasa obsługuje:
+1. Walidację danych wejściowych
+2. Logikę biznesową
+3. Operacje w bazie danych
+4. Flash messages dla użytkownika
+5. Przekierowania
+"""
+
+from flask import Blueprint, render_template, flash, redirect, url_for, request, current_app, abort
+from app import db, services
+from app.forms import CreateTaskForm, BulkTaskForm
+from app.queries import group_tasks_page, group_member_choices, group_due_tasks, TASK_STATUSES
+from app.decorators import group_member_required, get_task_access
+from app.fragments import group_fragment
+from app.search import search_tasks
+from app.models import utcnow
+from flask_login import current_user, login_required
+
+bp = Blueprint('tasks', __name__)
+
+
+def task_filters():
+    """
+    Filtry listy zadań z query string - domyślnie ukrywamy zrobione zadania.
+    Zwraca (status, assigned z URL, assigned_to dla zapytania, kursor after,
+    archived - razem z zadaniami z archiwum).
+    """
+    status = request.args.get('status', 'open')
+    if status not in TASK_STATUSES:
+        status = 'open'
+    assigned = request.args.get('assigned', '')
+    assigned_to = int(assigned) if assigned.isdigit() else None
+    archived = request.args.get('archived') == '1'
+    return status, assigned, assigned_to, request.args.get('after'), archived
+
+
+def task_list_vary(role, status, assigned_to, after, archived):
+    """
+    Elementy klucza cache fragmentu listy zadań (oprócz grupy, wersji i roli).
+    Nie-admin widzi "Usuń" tylko przy swoich zadaniach, więc jego id jest w kluczu.
+    """
+    viewer = current_user.id if role != 'admin' else ''
+    return (viewer, status, assigned_to, after, archived)
+
+
+def render_group_tasks(group, role, form, members, task_list, next_cursor, status, assigned, archived):
+    return render_template('group_tasks.html',
+                           title=f'Zadania - {group.name}',
+                           group=group,
+                           task_list=task_list,
+                           next_cursor=next_cursor,
+                           status=status,
+                           assigned=assigned,
+                           archived=archived,
+                           members=members,
+                           form=form,
+                           bulk_form=BulkTaskForm(),
+                           current_role=role)
+
+
+@bp.route('/group/<int:group_id>/tasks', methods=['GET', 'POST'])
+@login_required
+@group_member_required()
+def group_tasks(group_id, group, role):
+    """
+    Lista zadań grupy + dodawanie nowych.
+    """
+    form = CreateTaskForm()
+
+    #wypełnij wybory dla select - wszyscy członkowie grupy + "nikt"
+    members = [(0, '-- Nieprzypisane --')] + group_member_choices(group.id)
+    form.assigned_to.choices = members
+
+    #obsługa tworzenia zadania
+    if form.validate_on_submit():
+        try:
+            assigned_user_id = form.assigned_to.data if form.assigned_to.data != 0 else None
+
+            new_task = services.create_task(
+                group_id=group.id,
+                created_by_id=current_user.id,
+                title=form.title.data,
+                description=form.description.data,
+                assigned_to_id=assigned_user_id,
+                due_at=form.due_at.data,
+                recurrence=form.recurrence.data
+            )
+            db.session.commit()
+
+            flash(f'Zadanie "{new_task.title}" zostało dodane.', 'success')
+            return redirect(url_for('tasks.group_tasks', group_id=group.id))
+        except Exception as e:
+            db.session.rollback()
+            flash('Wystąpił błąd podczas dodawania zadania', 'danger')
+
+    status, assigned, assigned_to, after, archived = task_filters()
+
+    def build():
+        #jedna strona zadań (razem z użytkownikami - bez N+1)
+        tasks, next_cursor = group_tasks_page(
+            group.id,
+            status=status,
+            assigned_to=assigned_to,
+            after=after,
+            per_page=current_app.config['TASKS_PER_PAGE'],
+            include_archived=archived
+        )
+        html = render_template('_task_list.html', group=group, tasks=tasks, current_role=role)
+        return html.strip(), next_cursor
+
+    #lista zadań z cache fragmentów - przy trafieniu bez zapytania o zadania
+    task_list, next_cursor = group_fragment(
+        'tasks', group, role, task_list_vary(role, status, assigned_to, after, archived), build
+    )
+
+    return render_group_tasks(group, role, form, members, task_list, next_cursor, status, assigned, archived)
+
+@bp.route('/group/<int:group_id>/tasks/search')
+@login_required
+@group_member_required()
+def search_group_tasks(group_id, group, role):
+    """
+    Wyszukiwanie zadań grupy po tytule i opisie (app.search), od najtrafniejszych.
+    """
+    q = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    tasks, has_next = search_tasks(group.id, q, page=page, per_page=current_app.config['SEARCH_PER_PAGE'])
+
+    return render_template('group_search.html',
+                           title=f'Szukaj - {group.name}',
+                           group=group,
+                           tasks=tasks,
+                           q=q,
+                           page=page,
+                           has_next=has_next,
+                           bulk_form=BulkTaskForm(),
+                           current_role=role)
+
+@bp.route('/group/<int:group_id>/tasks/due')
+@login_required
+@group_member_required()
+def due_group_tasks(group_id, group, role):
+    """
+    Terminy: zadania zaległe i na ten tydzień (do niedzieli), od najbliższego terminu.
+
+    Bez cache fragmentów - zawartość zmienia się z upływem czasu, nie tylko z wersją grupy.
+    """
+    now = utcnow()
+    overdue, this_week = group_due_tasks(group.id, now, limit=current_app.config['TASKS_PER_PAGE'])
+
+    return render_template('group_due.html',
+                           title=f'Terminy - {group.name}',
+                           group=group,
+                           overdue=overdue,
+                           this_week=this_week,
+                           bulk_form=BulkTaskForm(),
+                           current_role=role)
+
+@bp.route('/group/<int:group_id>/tasks/bulk', methods=['POST'])
+@login_required
+@group_member_required()
+def bulk_tasks(group_id, group, role):
+    """
+    Zrób / przywróć / usuń wiele zaznaczonych zadań naraz.
+
+    Jeden request, jedno zapytanie i jeden commit zamiast osobnego
+    POST + commit + przekierowania dla każdego zadania.
+    """
+    form = BulkTaskForm()
+    task_ids = [int(i) for i in request.form.getlist('task_ids') if i.isdigit()]
+    task_ids = task_ids[:current_app.config['BULK_MAX_TASKS']]
+
+    if not form.validate_on_submit() or not task_ids:
+        flash('Nie zaznaczono żadnych zadań.', 'warning')
+        return redirect(url_for('tasks.group_tasks', group_id=group.id))
+
+    try:
+        if form.delete.data:
+            #usuwanie - admin wszystkie, pozostali tylko swoje
+            changed = services.bulk_delete_tasks(group.id, task_ids, current_user.id, role)
+            message = f'Usunięto zadań: {len(changed)}.'
+        else:
+            changed = services.bulk_set_completed(group.id, task_ids, completed=bool(form.complete.data))
+            message = f'Zaktualizowano zadań: {len(changed)}.'
+        db.session.commit()
+
+        skipped = len(set(task_ids)) - len(changed)
+        if skipped:
+            message += f' Pominięto: {skipped} (brak uprawnień lub bez zmian).'
+        flash(message, 'success')
+
+    except Exception as e:
+        db.session.rollback()
+        flash('Wystąpił błąd podczas aktualizacji zadań', 'danger')
+
+    return redirect(url_for('tasks.group_tasks', group_id=group.id))
+
+@bp.route('/task/<int:task_id>/toggle', methods=['POST'])
+@login_required
+def toggle_task(task_id):
+    """
+    Oznacz zadanie jako zrobione/niezrobione.
+    """
+    #zadanie i autoryzacja jednym zapytaniem
+    task, role = get_task_access(task_id)
+    if task is None:
+        abort(404)
+
+    if not role:
+        flash('Nie masz dostępu do tego zadania.', 'danger')
+        return redirect(url_for('groups.index'))
+    
+    try:
+        services.set_task_completed(task, not task.is_completed)
+        db.session.commit()
+
+        status = "ukończone" if task.is_completed else "do zrobienia"
+        flash(f'Zadanie "{task.title}" oznaczone jako {status}.', 'success')
+
+    except Exception as e:
+        db.session.rollback()
+        flash('Wystąpił błąd podczas aktualizacji zadania', 'danger')
+
+    return redirect(url_for('tasks.group_tasks', group_id=task.group_id))
+
+@bp.route('/task/<int:task_id>/delete', methods=['POST'])
+@login_required
+def delete_task(task_id):
+    """
+    Usuń zadanie. (tylko admin lub twórca)
+    """
+    #zadanie i autoryzacja jednym zapytaniem
+    task, role = get_task_access(task_id)
+    if task is None:
+        abort(404)
+
+    if not role:
+        flash('Nie masz dostępu do tego zadania', 'danger')
+        return redirect(url_for('groups.index'))
+    
+    #tylko admin lub twórca może usunąć
+    if role != 'admin' and task.created_by_id != current_user.id:
+        flash('Tylko administrator lub twórca zadania może je usunąć', 'warning')
+        return redirect(url_for('tasks.group_tasks', group_id=task.group_id))
+    
+    try:
+        group_id = task.group_id
+        services.delete_task(task)
+        db.session.commit()
+        flash(f'Zadanie "{task.title}" zostało usunięte', 'success')
+
+    except Exception as e:
+        db.session.rollback()
+        flash('Wystąpił błąd podczas usuwania zadania', 'danger')
+
+    return redirect(url_for('tasks.group_tasks', group_id=group_id))
@@ -0,0 +1,54 @@
+"""
+Pomocnicze narzędzia do testów wydajności (plugin pytest).
+
+Rejestruje go tests/conftest.py (pytest_plugins = ['app.testing']),
+który daje też fixture app - aplikację testową z własną bazą.
+
+Fixture max_queries sprawdza budżet zapytań trasy:
+
+    def test_group_tasks_queries(client, max_queries):
+        with max_queries(4):
+            client.get('/group/1/tasks')
+
+Budżety wszystkich tras do odczytu - tests/test_query_budgets.py.
+
+Przekroczenie = AssertionError z listą wykonanych zapytań. Razem
+z detektorem N+1 (app.nplusone, w testach rzuca NPlusOneError)
+regresje wydajności wywracają CI zamiast trafić na produkcję.
+"""
+
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+
+@contextmanager
+def assert_max_queries(limit, engine):
+    """Blok może wykonać co najwyżej limit zapytań SQL na silniku engine."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(' '.join(statement.split()))
+
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    if len(statements) > limit:
+        listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(statements, 1))
+        raise AssertionError(f'{len(statements)} zapytań SQL, limit {limit}:\n{listing}')
+
+
+@pytest.fixture
+def max_queries(app):
+    """with max_queries(n): ... - wymaga fixture app (aplikacja testowa)."""
+    from app import db
+
+    with app.app_context():
+        engine = db.engine
+
+    def check(limit):
+        return assert_max_queries(limit, engine)
+    return check
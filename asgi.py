@@ -0,0 +1,21 @@
+"""
+Punkt wejścia ASGI - serwowanie przez uvicorn zamiast serwera WSGI:
+
+    uvicorn asgi:app --workers 2
+
+Serwer ASGI sam obsługuje gniazda, więc powolny klient (wolne łącze,
+długi upload) nie blokuje wątku aplikacji - do Flaska trafia gotowe
+żądanie. Aplikacja Flask działa w ograniczonej puli ASGI_THREADS wątków
+(app.serving.PooledWsgiToAsgi), a strumienie SSE (/api/v1/groups/<id>/events)
+w osobnej puli EVENTS_MAX_STREAMS wątków - nie zajmują wątków zwykłym
+requestom. Z ASYNC_VIEWS=1 widoki do odczytu czytają bazę przez AsyncSession.
+
+Setki otwartych strumieni na proces - gunicorn z workerami gevent
+(`gunicorn -c gunicorn.conf.py run:app`), gdzie strumień to greenlet.
+Porównanie obu serwerów: python -m benchmarks.asgi.
+"""
+
+from app import create_app
+from app.serving import PooledWsgiToAsgi
+
+app = PooledWsgiToAsgi(create_app())
@@ -0,0 +1,25 @@
+"""
+Benchmarki aplikacji (poza samą aplikacją - nie importowane przez app).
+
+- dataset - syntetyczne dane (użytkownicy, grupy, członkostwa, zadania)
+- run - scenariusze użytkowników, wynik w JSON
+- compare - porównanie dwóch plików wyników
+- sse - strumienie SSE: obciążenie brokera i strumienie przez HTTP na serwerze wątkowym (app.events)
+- search - wyszukiwanie zadań: indeks pełnotekstowy vs LIKE
+- jobs - trasy zmieniające dane: powiadomienia w requeście vs w tle (app.jobs)
+- recurrence - harmonogram zadań powtarzanych i zapytania o terminy
+- audit - historia zmian w grupach: tabele miesięczne vs jedna tabela (app.audit)
+- archive - archiwizacja zrobionych zadań i lista zadań przed/po (app.archive)
+- startup - czas startu: import, create_app i pierwszy request (świeży proces)
+- metrics - narzut metryk requestów (app.metrics) - z metrykami vs bez
+- authorization - sprawdzanie dostępu do grupy z cache ról i bez (app.decorators)
+- membership - sprawdzanie członkostwa przy 100 tys. wierszy, z indeksami group_member i bez
+- passwords - hashe haseł na sekundę dla metod i pul (app.passwords)
+- concurrency - współbieżne przełączanie i listy zadań dla ustawień silnika bazy (app.engine)
+- bulk - operacje na wielu zadaniach: zadanie po zadaniu vs bulk
+- fragments - lista 2000 zadań grupy z cache fragmentów i bez (app.fragments)
+- asgi - serwery WSGI vs ASGI przy 200 połączeniach, z otwartymi strumieniami SSE
+"""
+
+# hasło wszystkich wygenerowanych użytkowników
+BENCH_PASSWORD = 'Benchmark123'
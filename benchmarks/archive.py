@@ -0,0 +1,199 @@
+"""
+Archiwizacja zrobionych zadań (app.archive) i lista zadań przed/po.
+
+    python -m benchmarks.archive --history 100000
+    python -m benchmarks.archive --history 100000 --batch-size 5000
+
+Baza SQLite w katalogu tymczasowym: pierwsza grupa ma --history zadań
+zrobionych 1-2 lata temu, --recent zrobionych w ostatnim miesiącu
+i --open otwartych; pozostałe --groups grup po --per-group zadań
+(połowa zrobiona dawno).
+
+Mierzymy (przed archiwizacją i po niej):
+- stronę listy zadań dużej grupy (queries.group_tasks_page): otwarte,
+  wszystkie i zrobione - pierwszą i "głęboką" (kursor w połowie zrobionych;
+  po archiwizacji tylko razem z archiwum)
+- całą stronę HTML /group/<id>/tasks?status=all (bez cache fragmentów)
+- przeliczenie liczników wszystkich grup (pełny GROUP BY po tabeli task)
+oraz przebieg archiwizacji (zadania/s) i listę z archiwum (include_archived).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHORES = ('Wynieść śmieci', 'Segregacja', 'Zapłacić rachunki', 'Czynsz', 'Prąd', 'Podlać kwiaty',
+          'Odkurzanie', 'Mycie okien', 'Pranie', 'Zakupy', 'Karma dla kota', 'Spacer z psem')
+
+
+def median_ms(run, repeat):
+    run()  # rozgrzewka (cache stron SQLite)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def fill(db, args, now, rnd, batch_size=10000):
+    from app import search, services, passwords
+    from app.models import User, FamilyGroup, GroupMember, Task
+    from benchmarks import BENCH_PASSWORD
+    connection = db.session.connection()
+    connection.execute(User.__table__.insert(), [
+        {'id': 1, 'email': 'bench@example.com', 'password': passwords.hash(BENCH_PASSWORD)}
+    ])
+    connection.execute(FamilyGroup.__table__.insert(), [
+        {'id': i, 'name': f'Rodzina {i}'} for i in range(1, args.groups + 1)
+    ])
+    connection.execute(GroupMember.__table__.insert(), [{'user_id': 1, 'group_id': 1, 'role': 'admin'}])
+    search.suspend_index(connection)
+
+    rows = []
+
+    def add(group_id, created_days, completed_days=None):
+        created_at = now - timedelta(days=created_days, seconds=rnd.randrange(86400))
+        rows.append({'title': rnd.choice(CHORES), 'group_id': group_id, 'created_by_id': 1,
+                     'assigned_to_id': 1 if rnd.random() < 0.5 else None,
+                     'is_completed': completed_days is not None, 'created_at': created_at,
+                     'completed_at': None if completed_days is None else
+                     min(now, created_at + timedelta(days=completed_days))})
+        if len(rows) >= batch_size:
+            connection.execute(Task.__table__.insert(), rows)
+            rows.clear()
+
+    # historia dużej grupy w kolejności dat - jak wstawiałaby ją aplikacja
+    for i in range(args.history):
+        add(1, 730 - 365 * i // args.history, completed_days=rnd.randint(0, 7))
+    for i in range(args.recent):
+        add(1, 30 - 30 * i // args.recent, completed_days=rnd.randint(0, 3))
+    for i in range(args.open):
+        add(1, 30 - 30 * i // args.open)
+    for group_id in range(2, args.groups + 1):
+        for i in range(args.per_group):
+            old = i < args.per_group // 2
+            add(group_id, rnd.randint(365, 730) if old else rnd.randint(0, 30),
+                completed_days=rnd.randint(0, 7) if old else None)
+    if rows:
+        connection.execute(Task.__table__.insert(), rows)
+    search.resume_index(connection, 1)
+
+    services.recount_task_counters(fix=True)
+    db.session.commit()
+
+
+def measure(db, app, args, deep=None, include_archived=False):
+    """Czasy listy zadań dużej grupy (ms) - ten sam zestaw przed i po archiwizacji."""
+    from app import services
+    from app.queries import group_tasks_page
+
+    def page(status, after=None):
+        return group_tasks_page(1, status, after=after, per_page=args.per_page, include_archived=include_archived)
+
+    result = {
+        'open_ms': median_ms(lambda: page('open'), args.repeat),
+        'all_ms': median_ms(lambda: page('all'), args.repeat),
+        'done_ms': median_ms(lambda: page('done'), args.repeat),
+    }
+    if deep:
+        result['done_deep_ms'] = median_ms(lambda: page('done', deep), args.repeat)
+    if not include_archived:
+        client = app.test_client()
+        from benchmarks import BENCH_PASSWORD
+        client.post('/api/v1/auth/login', json={'email': 'bench@example.com', 'password': BENCH_PASSWORD})
+        result['html_all_ms'] = median_ms(lambda: client.get('/group/1/tasks?status=all'), args.repeat)
+        result['recount_ms'] = median_ms(lambda: services.recount_task_counters(fix=False), args.repeat)
+    return result
+
+
+def report(label, times):
+    print(f'{label}: otwarte {times["open_ms"]} ms, wszystkie {times["all_ms"]} ms, '
+          f'zrobione {times["done_ms"]} ms'
+          + (f', zrobione - głęboka strona {times["done_deep_ms"]} ms' if 'done_deep_ms' in times else '')
+          + (f'; HTML {times["html_all_ms"]} ms, liczniki grup {times["recount_ms"]} ms'
+             if 'html_all_ms' in times else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Archiwizacja zrobionych zadań i lista zadań przed/po.')
+    parser.add_argument('--history', type=int, default=100000, help='zadań zrobionych 1-2 lata temu w dużej grupie')
+    parser.add_argument('--recent', type=int, default=300, help='zadań zrobionych w ostatnim miesiącu')
+    parser.add_argument('--open', type=int, default=200, help='otwartych zadań w dużej grupie')
+    parser.add_argument('--groups', type=int, default=1000)
+    parser.add_argument('--per-group', type=int, default=20, help='zadań w każdej z pozostałych grup')
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--days', type=int, default=90, help='archiwizuj zrobione ponad tyle dni temu')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-archive-')
+    from config import Config
+    from app import create_app, db, archive
+    from app.models import Task, ArchivedTask, utcnow
+    from app.queries import encode_task_cursor
+
+    class ArchiveBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir.name, "archive.db")}'
+        FRAGMENT_CACHE_ENABLED = False
+
+    app = create_app(ArchiveBenchConfig)
+    result = {'args': vars(args)}
+    with app.app_context():
+        db.create_all()
+        now = utcnow()
+        start = time.perf_counter()
+        fill(db, args, now, random.Random(args.seed))
+        result['fill_seconds'] = round(time.perf_counter() - start, 1)
+        total = db.session.scalar(db.select(db.func.count()).select_from(Task))
+        print(f'Dane: {total} zadań, duża grupa {args.history} + {args.recent} zrobionych, '
+              f'{args.open} otwartych ({result["fill_seconds"]} s)')
+
+        # kursor "głębokiej" strony: zadanie w połowie zrobionych dużej grupy
+        # (po archiwizacji jest już w archiwum - mierzymy go z include_archived)
+        middle = db.session.scalars(
+            db.select(Task).where(Task.group_id == 1, Task.is_completed.is_(True))
+            .order_by(Task.created_at.desc(), Task.id.desc()).offset((args.history + args.recent) // 2).limit(1)
+        ).one()
+        deep = encode_task_cursor(middle)
+
+        result['before'] = measure(db, app, args, deep)
+        report('Przed archiwizacją', result['before'])
+
+        stats = archive.archive_completed(days=args.days, batch_size=args.batch_size, now=now)
+        result['archive'] = {key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()}
+        left = db.session.scalar(db.select(db.func.count()).select_from(Task))
+        archived = db.session.scalar(db.select(db.func.count()).select_from(ArchivedTask))
+        assert left + archived == total, (left, archived, total)
+        print(f'Archiwizacja: {stats["tasks"]} zadań w {stats["seconds"]:.2f} s '
+              f'({stats["tasks"] / stats["seconds"]:.0f}/s), paczki {stats["batches"]}; w task zostało {left}')
+
+        result['after'] = measure(db, app, args)
+        report('Po archiwizacji', result['after'])
+        result['after_with_archive'] = measure(db, app, args, deep, include_archived=True)
+        report('Po archiwizacji, z archiwum', result['after_with_archive'])
+
+        db.session.remove()
+        db.engine.dispose()
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Serwery WSGI vs ASGI przy 200 jednoczesnych połączeniach (z otwartymi strumieniami SSE).
+
+    python -m benchmarks.asgi --connections 200 --duration 10
+    python -m benchmarks.asgi --streams 6 --output asgi.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset)
+i po kolei każdy serwer (SERVERS) jako jeden proces na tej samej bazie:
+
+- gunicorn gevent - WSGI, gunicorn.conf.py (strumień to greenlet)
+- werkzeug - WSGI, `flask run --with-threads` (wątek na połączenie)
+- uvicorn - ASGI, asgi.py (app.serving.PooledWsgiToAsgi, pule wątków)
+- uvicorn WsgiToAsgi - ASGI ze zwykłym adapterem asgiref (jeden wspólny
+  wątek) - punkt odniesienia
+
+Najpierw --streams połączeń otwiera strumień zdarzeń grupy i trzyma go
+do końca pomiaru, potem --connections połączeń keep-alive (klient asyncio)
+przez --duration sekund pobiera GET /api/v1/groups/<id>. Liczymy
+requesty/s, percentyle czasu odpowiedzi i błędy (status inny niż 200
+albo brak odpowiedzi w --timeout s).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    'gunicorn gevent': ['-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', '127.0.0.1:{port}', 'run:app'],
+    'werkzeug': ['-m', 'flask', '--app', 'run:app', 'run', '--port', '{port}', '--with-threads'],
+    'uvicorn': ['-m', 'uvicorn', 'asgi:app', '--port', '{port}', '--log-level', 'warning'],
+    'uvicorn WsgiToAsgi': ['-m', 'uvicorn', '--factory', 'benchmarks.asgi:asgiref_app', '--port', '{port}',
+                           '--log-level', 'warning'],
+}
+
+
+def asgiref_app():
+    """Aplikacja za zwykłym asgiref.wsgi.WsgiToAsgi (uvicorn --factory)."""
+    from asgiref.wsgi import WsgiToAsgi
+    from app import create_app
+    return WsgiToAsgi(create_app())
+
+
+def start_server(name, env):
+    from benchmarks.run import _free_port
+    port = _free_port()
+    command = [sys.executable] + [part.format(port=port) for part in SERVERS[name]]
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{name}: serwer zakończył się z kodem {process.returncode}')
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/login', timeout=2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f'{name}: serwer nie odpowiada')
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def log_in(port, email):
+    """Ciasteczko sesji administratora grupy."""
+    request = urllib.request.Request(
+        f'http://127.0.0.1:{port}/api/v1/auth/login',
+        data=json.dumps({'email': email, 'password': BENCH_PASSWORD}).encode(),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.headers['Set-Cookie'].split(';', 1)[0]
+
+
+async def get(reader, writer, path, cookie):
+    """GET na otwartym połączeniu - (status, czy serwer zostawia połączenie)."""
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n'.encode())
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    version, status = head[0].split(' ', 2)[:2]
+    headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status), version == 'HTTP/1.1' and headers.get('connection') != 'close'
+
+
+async def open_stream(port, path, cookie):
+    """Strumień SSE trzymany do końca pomiaru - (reader, writer) albo None przy 503."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n\r\n'.encode())
+    head = await reader.readuntil(b'\r\n\r\n')
+    if b' 200 ' not in head.split(b'\r\n', 1)[0]:
+        writer.close()
+        return None
+    return reader, writer
+
+
+async def connection(port, path, cookie, until, timeout, latencies, errors):
+    """Jedno połączenie keep-alive - requesty jeden po drugim do chwili until."""
+    reader = writer = None
+    while time.monotonic() < until:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            start = time.perf_counter()
+            status, keep_alive = await asyncio.wait_for(get(reader, writer, path, cookie), timeout)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            errors.append(type(e).__name__)
+            keep_alive = False
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, group_id, cookie, args):
+    streams = []
+    for _ in range(args.streams):
+        try:
+            stream = await asyncio.wait_for(open_stream(port, f'/api/v1/groups/{group_id}/events', cookie),
+                                            args.timeout)
+        except (OSError, asyncio.TimeoutError):
+            stream = None
+        if stream is not None:
+            streams.append(stream)
+
+    path = f'/api/v1/groups/{group_id}'
+    # rozgrzewka - połączenia, wątki i cache jak na działającym serwerze
+    await asyncio.gather(*(connection(port, path, cookie, time.monotonic() + 1, args.timeout, [], [])
+                           for _ in range(args.connections)))
+    latencies, errors = [], []
+    start = time.monotonic()
+    await asyncio.gather(*(connection(port, path, cookie, start + args.duration, args.timeout, latencies, errors)
+                           for _ in range(args.connections)))
+    elapsed = time.monotonic() - start
+    for _, writer in streams:
+        writer.close()
+    return len(streams), latencies, errors, elapsed
+
+
+def percentile(values, fraction):
+    return round(values[min(len(values) - 1, int(len(values) * fraction))] * 1000, 1) if values else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serwery WSGI vs ASGI przy wielu jednoczesnych połączeniach.')
+    parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+    parser.add_argument('--connections', type=int, default=200)
+    parser.add_argument('--streams', type=int, default=0, help='otwartych strumieni SSE w czasie pomiaru')
+    parser.add_argument('--duration', type=float, default=10, help='sekundy pomiaru na serwer')
+    parser.add_argument('--timeout', type=float, default=5, help='sekundy na odpowiedź, potem błąd')
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-asgi-')
+    database_uri = f'sqlite:///{os.path.join(workdir.name, "asgi.db")}'
+    env = dict(os.environ, DATABASE_URL=database_uri, METRICS_ENABLED='0', SLOW_REQUEST_MS='0',
+               EVENTS_MAX_STREAMS=str(max(args.streams, 1)), GUNICORN_WORKERS='1', PYTHONPATH=ROOT)
+
+    from config import Config
+    from app import create_app, db
+    from benchmarks import dataset
+
+    class AsgiBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+
+    app = create_app(AsgiBenchConfig)
+    with app.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        email, group_ids = dataset.admin_groups(1, seed=args.seed)[0]
+        db.engine.dispose()
+
+    result = {'args': vars(args), 'servers': {}}
+    print(f'{"serwer":<20} {"strumienie":>10} {"req/s":>8} {"p50 ms":>8} {"p99 ms":>8} {"błędy":>6}')
+    for name in args.servers:
+        process, port = start_server(name, env)
+        try:
+            cookie = log_in(port, email)
+            streams, latencies, errors, elapsed = asyncio.run(load(port, group_ids[0], cookie, args))
+        finally:
+            stop_server(process)
+        latencies.sort()
+        stats = {
+            'streams_open': streams,
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed),
+            'p50_ms': percentile(latencies, 0.5),
+            'p99_ms': percentile(latencies, 0.99),
+            'mean_ms': round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+            'errors': len(errors),
+            'error_kinds': sorted({str(error) for error in errors}),
+        }
+        result['servers'][name] = stats
+        print(f'{name:<20} {streams:>10} {stats["rps"]:>8} {stats["p50_ms"] or "-":>8} '
+              f'{stats["p99_ms"] or "-":>8} {stats["errors"]:>6}')
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
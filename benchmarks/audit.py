@@ -0,0 +1,190 @@
+"""
+Historia zmian w grupach (app.audit): tabele miesięczne vs jedna tabela.
+
+    python -m benchmarks.audit --months 12 --events 100000
+    python -m benchmarks.audit --groups 100 --page 100
+
+Baza SQLite w katalogu tymczasowym: --months miesięcy po --events wpisów
+(ostatni to bieżący), --groups grup, a pierwsza dostaje --large-share
+wszystkich wpisów. Te same wiersze trafiają też do jednej tabeli
+audit_flat (indeksy (group_id, id) i created_at) - tak wyglądałby log
+bez podziału na miesiące.
+
+Mierzymy:
+- dopisanie wpisu (audit.record + commit)
+- stronę historii dużej grupy: najnowszą i "głęboką" (kursor sprzed
+  połowy miesięcy) - audit.group_history (keyset w tabelach miesięcznych,
+  razem z emailami i tytułami) vs samo zapytanie do audit_flat z OFFSET
+  i z kursorem
+- retencję: DROP TABLE najstarszego miesiąca (audit.prune) vs DELETE
+  tych samych wierszy z audit_flat
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FLAT_DDL = (
+    """
+    CREATE TABLE audit_flat (
+        id INTEGER PRIMARY KEY, created_at DATETIME NOT NULL, group_id INTEGER NOT NULL,
+        code SMALLINT NOT NULL, actor_id INTEGER, task_id INTEGER, user_id INTEGER, data TEXT
+    )
+    """,
+    'CREATE INDEX ix_audit_flat_group_id ON audit_flat (group_id, id)',
+    'CREATE INDEX ix_audit_flat_created_at ON audit_flat (created_at)',
+)
+
+INSERT = 'INSERT INTO {name} (id, created_at, group_id, code, actor_id, task_id, user_id, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+
+
+def median_ms(run, repeat):
+    run()  # rozgrzewka (cache stron SQLite)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def month_start(month):
+    year, number = divmod(month, 100)
+    return datetime(year, number, 1)
+
+
+def fill(db, audit, args, months, rnd):
+    from app.models import User
+    connection = db.session.connection()
+    connection.execute(User.__table__.insert(), [
+        {'id': i, 'email': f'user{i}@example.com', 'password': '-'} for i in range(1, 101)
+    ])
+    for statement in FLAT_DDL:
+        connection.exec_driver_sql(statement)
+    codes = (audit.TASK_CREATED, audit.TASK_COMPLETED, audit.TASK_COMPLETED, audit.TASK_REOPENED, audit.TASK_DELETED)
+    flat_id = 0
+    for month in sorted(months):
+        audit.create_month(connection, month)
+        start = month_start(month)
+        seconds = 28 * 86400
+        rows = []
+        for i in range(args.events):
+            group_id = 1 if rnd.random() < args.large_share else rnd.randint(2, args.groups)
+            created_at = (start + timedelta(seconds=seconds * i // args.events)).strftime('%Y-%m-%d %H:%M:%S')
+            code = rnd.choice(codes)
+            data = '{"title":"Wynieść śmieci"}' if code in (audit.TASK_CREATED, audit.TASK_DELETED) else None
+            rows.append((month * audit.ID_MONTH_BASE + i + 1, created_at, group_id, code,
+                         rnd.randint(1, 100), rnd.randint(1, 10 ** 6), None, data))
+        connection.exec_driver_sql(INSERT.format(name=audit.table_name(connection, month)), rows)
+        flat = []
+        for row in rows:
+            flat_id += 1
+            flat.append((flat_id,) + row[1:])
+        connection.exec_driver_sql(INSERT.format(name='audit_flat'), flat)
+        # licznik AUTOINCREMENT za wstawionymi id
+        connection.exec_driver_sql('UPDATE sqlite_sequence SET seq = ? WHERE name = ?',
+                                   (month * audit.ID_MONTH_BASE + args.events, audit.table_name(connection, month)))
+    db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Historia zmian w grupach: tabele miesięczne vs jedna tabela.')
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--events', type=int, default=100000, help='wpisów na miesiąc')
+    parser.add_argument('--groups', type=int, default=1000)
+    parser.add_argument('--large-share', type=float, default=0.1, help='udział pierwszej (dużej) grupy we wpisach')
+    parser.add_argument('--page', type=int, default=50, help='wpisów na stronie historii')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-audit-')
+    from config import Config
+    from app import create_app, db, audit
+
+    class AuditBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir.name, "audit.db")}'
+
+    app = create_app(AuditBenchConfig)
+    result = {'args': vars(args)}
+    with app.app_context():
+        db.create_all()
+        current = audit.month_of(datetime.now(timezone.utc))
+        months = [audit.shift_month(current, -i) for i in range(args.months)]
+        start = time.perf_counter()
+        fill(db, audit, args, months, random.Random(args.seed))
+        result['fill_seconds'] = round(time.perf_counter() - start, 1)
+        print(f'Dane: {args.months} miesięcy x {args.events} wpisów, {args.groups} grup ({result["fill_seconds"]} s)')
+
+        def write():
+            audit.record(2, audit.TASK_COMPLETED, task_id=1)
+            db.session.commit()
+        result['record_ms'] = median_ms(write, args.repeat)
+        print(f'Wpis (record + commit): {result["record_ms"]} ms')
+
+        # kursor "głębokiej" strony: najnowszy wpis dużej grupy sprzed połowy miesięcy
+        deep_month = months[args.months // 2]
+        deep_cursor = db.session.execute(db.text(
+            f'SELECT max(id) FROM {audit.table_name(db.session.connection(), deep_month)} WHERE group_id = 1'
+        )).scalar() + 1
+        deep_offset = db.session.execute(db.text(
+            'SELECT count(*) FROM audit_flat WHERE group_id = 1 AND created_at >= :start'
+        ), {'start': month_start(audit.shift_month(deep_month, 1))}).scalar()
+        flat_page = db.text('SELECT * FROM audit_flat WHERE group_id = 1 ORDER BY id DESC LIMIT :limit OFFSET :offset')
+        flat_keyset = db.text('SELECT * FROM audit_flat WHERE group_id = 1 AND id < :before ORDER BY id DESC LIMIT :limit')
+        flat_cursor = db.session.execute(db.text(
+            'SELECT id FROM audit_flat WHERE group_id = 1 ORDER BY id DESC LIMIT 1 OFFSET :offset'
+        ), {'offset': deep_offset}).scalar() + 1
+
+        result['history_first_ms'] = median_ms(lambda: audit.group_history(1, limit=args.page), args.repeat)
+        result['history_deep_ms'] = median_ms(lambda: audit.group_history(1, before=deep_cursor, limit=args.page), args.repeat)
+        result['flat_first_ms'] = median_ms(
+            lambda: db.session.execute(flat_page, {'limit': args.page, 'offset': 0}).all(), args.repeat)
+        result['flat_deep_offset_ms'] = median_ms(
+            lambda: db.session.execute(flat_page, {'limit': args.page, 'offset': deep_offset}).all(), args.repeat)
+        result['flat_deep_keyset_ms'] = median_ms(
+            lambda: db.session.execute(flat_keyset, {'limit': args.page, 'before': flat_cursor}).all(), args.repeat)
+        result['deep_offset'] = deep_offset
+        print(f'Historia dużej grupy, {args.page} wpisów: pierwsza strona {result["history_first_ms"]} ms, '
+              f'głęboka (keyset) {result["history_deep_ms"]} ms')
+        print(f'Jedna tabela (samo zapytanie): pierwsza strona {result["flat_first_ms"]} ms, '
+              f'głęboka: OFFSET {deep_offset} {result["flat_deep_offset_ms"]} ms, '
+              f'kursor {result["flat_deep_keyset_ms"]} ms')
+
+        # retencja - najstarszy miesiąc
+        oldest = months[-1]
+        start = time.perf_counter()
+        dropped = audit.prune(args.months - 1)
+        db.session.commit()
+        result['prune_drop_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        assert dropped == [oldest], dropped
+        start = time.perf_counter()
+        deleted = db.session.execute(db.text('DELETE FROM audit_flat WHERE created_at < :end'),
+                                     {'end': month_start(audit.shift_month(oldest, 1))}).rowcount
+        db.session.commit()
+        result['prune_delete_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        print(f'Retencja ({deleted} wpisów): DROP TABLE {result["prune_drop_ms"]} ms, '
+              f'DELETE {result["prune_delete_ms"]} ms')
+
+        db.session.remove()
+        db.engine.dispose()
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Przepustowość sprawdzania dostępu do grupy (app.decorators) z cache ról
+(membership_cache) i bez niego.
+
+    python -m benchmarks.authorization --groups 2000 --checks 20000
+    python -m benchmarks.authorization --write-ratio 0.2 --output authorization.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset).
+Dla każdego wariantu osobna aplikacja na tej samej bazie:
+
+- cache - MEMBERSHIP_CACHE_ENABLED=1, grupy bez zmian (wpisy zawsze aktualne)
+- cache + zmiany - jak wyżej, ale przed --write-ratio sprawdzeń grupa
+  zmienia wersję (jak zmiana w innym workerze), więc wpis trzeba
+  zweryfikować z bazą (czas zmiany poza pomiarem)
+- bez cache - MEMBERSHIP_CACHE_ENABLED=0
+
+Mierzymy get_group_access w świeżym kontekście requestu (własne g
+i sesja, jak każdy request) - sprawdzenia/s - oraz całe żądania
+GET /api/v1/groups/<id> (requesty/s).
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VARIANTS = (
+    ('cache', True, False),
+    ('cache + zmiany', True, True),
+    ('bez cache', False, False),
+)
+
+
+def make_app(database_uri, cache_enabled):
+    from config import Config
+    from app import create_app
+
+    class AuthorizationBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        MEMBERSHIP_CACHE_ENABLED = cache_enabled
+        METRICS_ENABLED = False
+
+    return create_app(AuthorizationBenchConfig)
+
+
+def pairs(app, users):
+    """(użytkownik, id grupy) - odłączone od sesji obiekty User."""
+    from app import db
+    from app.models import User
+    from benchmarks.dataset import admin_groups
+    with app.app_context():
+        result = []
+        for email, group_ids in admin_groups(users):
+            user = db.session.scalars(db.select(User).filter_by(email=email)).one()
+            result.extend((user, group_id) for group_id in group_ids)
+        db.session.expunge_all()
+    return result
+
+
+def measure_checks(app, pairs, checks, write_ratio, rnd):
+    """(sprawdzenia/s, liczba zmian grup) - get_group_access w nowym kontekście requestu."""
+    from flask_login import login_user
+    from app import db
+    from app.decorators import get_group_access
+    from app.models import FamilyGroup
+
+    elapsed = 0.0
+    denied = changes = 0
+    for _ in range(checks):
+        user, group_id = rnd.choice(pairs)
+        if write_ratio and rnd.random() < write_ratio:
+            with app.app_context():
+                FamilyGroup.touch(group_id)
+                db.session.commit()
+            changes += 1
+        with app.test_request_context():
+            login_user(user)
+            start = time.perf_counter()
+            if get_group_access(group_id).role is None:
+                denied += 1
+            elapsed += time.perf_counter() - start
+    assert not denied, denied
+    return round(checks / elapsed), changes
+
+
+def measure_requests(app, pairs, requests, rnd):
+    """Requesty/s - GET /api/v1/groups/<id> zalogowanych administratorów."""
+    clients = {}
+    for user, _ in pairs:
+        if user.id not in clients:
+            clients[user.id] = app.test_client()
+            clients[user.id].post('/api/v1/auth/login', json={'email': user.email, 'password': BENCH_PASSWORD})
+    start = time.perf_counter()
+    for _ in range(requests):
+        user, group_id = rnd.choice(pairs)
+        response = clients[user.id].get(f'/api/v1/groups/{group_id}')
+        assert response.status_code == 200, response.status_code
+    return round(requests / (time.perf_counter() - start))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sprawdzanie dostępu do grupy z cache ról i bez.')
+    parser.add_argument('--groups', type=int, default=2000)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--users', type=int, default=200, help='administratorów, w których imieniu sprawdzamy dostęp')
+    parser.add_argument('--checks', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.1,
+                        help='część sprawdzeń poprzedzona zmianą grupy (wariant "cache + zmiany")')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-authorization-')
+    database_uri = f'sqlite:///{os.path.join(workdir.name, "authorization.db")}'
+
+    from app import db, membership_cache
+    from benchmarks import dataset
+
+    setup = make_app(database_uri, True)
+    with setup.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        db.engine.dispose()
+
+    result = {'args': vars(args), 'variants': {}}
+    for name, cache_enabled, writes in VARIANTS:
+        app = make_app(database_uri, cache_enabled)
+        sample = pairs(app, args.users)
+        # rozgrzewka - cache ról i stron SQLite jak na działającym serwerze
+        measure_checks(app, sample, len(sample), 0, random.Random(args.seed))
+        checks, changes = measure_checks(app, sample, args.checks, args.write_ratio if writes else 0,
+                                random.Random(args.seed))
+        requests = measure_requests(app, sample, args.requests, random.Random(args.seed))
+        with app.app_context():
+            stats = membership_cache.stats()
+            db.engine.dispose()
+        result['variants'][name] = {'checks_per_second': checks, 'requests_per_second': requests,
+                                   'group_changes': changes, 'cache': stats}
+        print(f'{name}: {checks} sprawdzeń/s, {requests} requestów/s'
+              + (f' (cache: trafienia {stats["hits"]}, chybienia {stats["misses"]})' if cache_enabled else '')
+              + (f', zmian grup {changes}' if changes else ''))
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
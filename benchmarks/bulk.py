@@ -0,0 +1,149 @@
+"""
+Operacje na wielu zadaniach: zadanie po zadaniu vs jedno żądanie bulk
+(POST /api/v1/groups/<id>/tasks/bulk-create|bulk-update|bulk-delete).
+
+    python -m benchmarks.bulk --count 1000 --rounds 5
+    python -m benchmarks.bulk --output bulk.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset).
+Administrator grupy w każdej rundzie tworzy --count zadań, oznacza je
+jako zrobione i usuwa - raz requestami na pojedyncze zadanie
+(POST .../tasks, PATCH i DELETE /api/v1/tasks/<id>), raz trzema
+requestami bulk. Kolejność wariantów zmienia się co rundę.
+
+Wynik: mediana czasu etapu, zadania/s i liczba zapytań SQL na etap.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STAGES = ('utworzenie', 'zmiana statusu', 'usunięcie')
+
+
+def make_app(database_uri):
+    from config import Config
+    from app import create_app
+
+    class BulkBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        METRICS_ENABLED = False
+        SLOW_REQUEST_MS = 0
+
+    return create_app(BulkBenchConfig)
+
+
+def titles(count, round_number):
+    return [f'Zadanie {round_number}-{i}' for i in range(count)]
+
+
+def per_item(client, group_id, names):
+    """Generator etapów - po każdym etapie zwraca jego nazwę."""
+    ids = []
+    for title in names:
+        response = client.post(f'/api/v1/groups/{group_id}/tasks', json={'title': title})
+        assert response.status_code == 201, response.status_code
+        ids.append(response.get_json()['id'])
+    yield 'utworzenie'
+    for task_id in ids:
+        assert client.patch(f'/api/v1/tasks/{task_id}', json={'is_completed': True}).status_code == 200
+    yield 'zmiana statusu'
+    for task_id in ids:
+        assert client.delete(f'/api/v1/tasks/{task_id}').status_code == 204
+    yield 'usunięcie'
+
+
+def bulk(client, group_id, names):
+    response = client.post(f'/api/v1/groups/{group_id}/tasks/bulk-create',
+                           json={'tasks': [{'title': title} for title in names]})
+    assert response.status_code == 201, response.status_code
+    ids = response.get_json()['ids']
+    yield 'utworzenie'
+    response = client.post(f'/api/v1/groups/{group_id}/tasks/bulk-update', json={'ids': ids, 'is_completed': True})
+    assert len(response.get_json()['ids']) == len(ids)
+    yield 'zmiana statusu'
+    response = client.post(f'/api/v1/groups/{group_id}/tasks/bulk-delete', json={'ids': ids})
+    assert len(response.get_json()['ids']) == len(ids)
+    yield 'usunięcie'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Zadanie po zadaniu vs operacje bulk.')
+    parser.add_argument('--count', type=int, default=1000, help='zadań w rundzie (najwyżej BULK_MAX_TASKS)')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-bulk-')
+    from sqlalchemy import event
+    from app import db
+    from benchmarks import dataset
+
+    app = make_app(f'sqlite:///{os.path.join(workdir.name, "bulk.db")}')
+    with app.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        email, group_ids = dataset.admin_groups(1, seed=args.seed)[0]
+        engine = db.engine
+
+    statements = [0]
+
+    def count_statement(*_):
+        statements[0] += 1
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    client = app.test_client()
+    client.post('/api/v1/auth/login', json={'email': email, 'password': BENCH_PASSWORD})
+
+    variants = {'zadanie po zadaniu': per_item, 'bulk': bulk}
+    times = {name: {stage: [] for stage in STAGES} for name in variants}
+    queries = {name: {} for name in variants}
+    for round_number in range(args.rounds):
+        order = list(variants) if round_number % 2 == 0 else list(variants)[::-1]
+        for name in order:
+            names = titles(args.count, round_number)
+            start, statements[0] = time.perf_counter(), 0
+            for stage in variants[name](client, group_ids[0], names):
+                times[name][stage].append(time.perf_counter() - start)
+                queries[name][stage] = statements[0]
+                start, statements[0] = time.perf_counter(), 0
+    event.remove(engine, 'before_cursor_execute', count_statement)
+    with app.app_context():
+        db.engine.dispose()
+    workdir.cleanup()
+
+    result = {'args': vars(args), 'variants': {}}
+    header = f'{"wariant":<20} {"etap":<16} {"ms":>8} {"zadania/s":>10} {"SQL":>6}'
+    print(header)
+    print('-' * len(header))
+    for name in variants:
+        result['variants'][name] = {}
+        for stage in STAGES:
+            seconds = statistics.median(times[name][stage])
+            stats = {'median_ms': round(seconds * 1000, 1), 'tasks_per_second': round(args.count / seconds),
+                     'sql_statements': queries[name][stage]}
+            result['variants'][name][stage] = stats
+            print(f'{name:<20} {stage:<16} {stats["median_ms"]:>8} {stats["tasks_per_second"]:>10} '
+                  f'{stats["sql_statements"]:>6}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
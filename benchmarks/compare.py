@@ -0,0 +1,75 @@
+"""
+Porównanie dwóch przebiegów benchmarks.run:
+
+    python -m benchmarks.compare przed.json po.json [--fail-over 10]
+
+Dla każdej fazy: przepustowość, p50, p99 i zapytania SQL na request,
+ze zmianą procentową. --fail-over N - kod wyjścia 1, gdy p50 lub p99
+którejś fazy pogorszyło się o ponad N% (np. w CI).
+"""
+
+import argparse
+import json
+import sys
+
+COLUMNS = (
+    # klucz, nagłówek, czy większa wartość jest lepsza
+    ('rps', 'req/s', True),
+    ('p50_ms', 'p50 ms', False),
+    ('p99_ms', 'p99 ms', False),
+    ('queries_mean', 'SQL/req', False),
+)
+
+
+def change(before, after):
+    if before in (None, 0) or after is None:
+        return None
+    return (after - before) / before * 100
+
+
+def _value(value):
+    return '-' if value is None else value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Porównaj dwa pliki wyników benchmarku.')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--fail-over', type=float, metavar='PROCENT',
+                        help='błąd, gdy p50/p99 którejś fazy wzrosło o ponad PROCENT')
+    args = parser.parse_args(argv)
+
+    with open(args.before, encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, encoding='utf-8') as f:
+        after = json.load(f)
+
+    for label, report in (('przed', before), ('po', after)):
+        meta = report['meta']
+        print(f'{label:>5}: {meta["timestamp"]} commit {meta["commit"]} ({meta["mode"]})')
+    print()
+
+    print(f'{"faza":<10}' + ''.join(f' {title:>24}' for _, title, _ in COLUMNS))
+    regressions = []
+    for name, stats in after['scenarios'].items():
+        old = before['scenarios'].get(name)
+        if not old or not old.get('requests') or not stats.get('requests'):
+            continue
+        cells = []
+        for key, _, higher_is_better in COLUMNS:
+            delta = change(old[key], stats[key])
+            cells.append(f'{_value(old[key]):>8} -> {_value(stats[key]):<8}'
+                         + (f'{delta:+6.1f}%' if delta is not None else ' ' * 7))
+            if (args.fail_over is not None and delta is not None and not higher_is_better
+                    and key.endswith('_ms') and delta > args.fail_over):
+                regressions.append(f'{name} {key} {delta:+.1f}%')
+        print(f'{name:<10}' + ''.join(f' {cell:>24}' for cell in cells))
+
+    if regressions:
+        print('\nPogorszenie ponad próg: ' + ', '.join(regressions))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
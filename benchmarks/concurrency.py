@@ -0,0 +1,178 @@
+"""
+Współbieżne przełączanie zadań i listy zadań - ustawienia silnika bazy
+(app.engine: WAL, busy timeout, pula połączeń).
+
+    python -m benchmarks.concurrency --threads 8 --duration 5
+    python -m benchmarks.concurrency --write-ratio 0.5 --output concurrency.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset);
+każdy wariant (VARIANTS) dostaje świeżą kopię i własną aplikację.
+--threads wątków (jak wątki workera), każdy z własnym klientem testowym
+i administratorem innej grupy, przez --duration sekund na zmianę
+przełącza zadanie (PATCH /api/v1/tasks/<id>, część --write-ratio)
+albo pobiera listę zadań (GET /api/v1/groups/<id>/tasks).
+
+Dla przełączeń i list osobno: requesty/s, percentyle czasu i błędy
+(np. 500 z "database is locked"), a do tego czekanie na połączenie
+z puli (app.engine.pool_stats).
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# nazwa -> ustawienia configu
+VARIANTS = {
+    'WAL': {},
+    'bez WAL': {'SQLITE_WAL': False},
+    'bez WAL i busy timeout': {'SQLITE_WAL': False, 'SQLITE_BUSY_TIMEOUT': 0},
+    'pula 2 połączeń': {'DB_POOL_SIZE': 2, 'DB_MAX_OVERFLOW': 0},
+}
+
+
+def make_app(database_uri, settings):
+    from config import Config
+    from app import create_app
+
+    class ConcurrencyBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        METRICS_ENABLED = False
+        SLOW_REQUEST_MS = 0
+    for key, value in settings.items():
+        setattr(ConcurrencyBenchConfig, key, value)
+    app = create_app(ConcurrencyBenchConfig)
+    # błędy (500 przy "database is locked") liczymy, bez tracebacków na konsoli
+    app.logger.disabled = True
+    return app
+
+
+def percentile(values, fraction):
+    return round(values[min(len(values) - 1, int(len(values) * fraction))] * 1000, 1) if values else None
+
+
+def run_variant(app, users, args):
+    """{operacja: statystyki} - wątki przełączające zadania i pobierające listy."""
+    timings = {'przełączenie': [], 'lista': []}
+    errors = {'przełączenie': 0, 'lista': 0}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(len(users) + 1)
+
+    def worker(number, email, group_id, task_ids):
+        rnd = random.Random(args.seed + number)
+        client = app.test_client()
+        client.post('/api/v1/auth/login', json={'email': email, 'password': BENCH_PASSWORD})
+        start_barrier.wait()
+        until = time.monotonic() + args.duration
+        while time.monotonic() < until:
+            if rnd.random() < args.write_ratio:
+                operation = 'przełączenie'
+                call = lambda: client.patch(f'/api/v1/tasks/{rnd.choice(task_ids)}',
+                                            json={'is_completed': rnd.random() < 0.5})
+            else:
+                operation = 'lista'
+                call = lambda: client.get(f'/api/v1/groups/{group_id}/tasks?status=all')
+            began = time.perf_counter()
+            status = call().status_code
+            elapsed = time.perf_counter() - began
+            with lock:
+                if status == 200:
+                    timings[operation].append(elapsed)
+                else:
+                    errors[operation] += 1
+
+    threads = [threading.Thread(target=worker, args=(number, *user)) for number, user in enumerate(users)]
+    for thread in threads:
+        thread.start()
+    start_barrier.wait()
+    for thread in threads:
+        thread.join()
+
+    result = {}
+    for operation, values in timings.items():
+        values.sort()
+        result[operation] = {
+            'requests': len(values),
+            'rps': round(len(values) / args.duration),
+            'p50_ms': percentile(values, 0.5),
+            'p99_ms': percentile(values, 0.99),
+            'errors': errors[operation],
+        }
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Współbieżne przełączanie i listy zadań dla ustawień silnika bazy.')
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5, help='sekundy na wariant')
+    parser.add_argument('--write-ratio', type=float, default=0.3, help='część requestów przełączających zadanie')
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-concurrency-')
+    seed_path = os.path.join(workdir.name, 'seed.db')
+
+    from app import db
+    from app.engine import pool_stats
+    from benchmarks import dataset
+
+    setup = make_app(f'sqlite:///{seed_path}', {})
+    with setup.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        users = []
+        for email, group_ids in dataset.admin_groups(args.threads, seed=args.seed):
+            users.append((email, group_ids[0], dataset.sample_task_ids(group_ids[:1])[group_ids[0]]))
+        # sesja oddaje połączenie - inaczej dispose() go nie zamknie
+        db.session.remove()
+        db.engine.dispose()
+
+    result = {'args': vars(args), 'variants': {}}
+    header = f'{"wariant":<24} {"operacja":<13} {"req/s":>6} {"p50 ms":>8} {"p99 ms":>8} {"błędy":>6}'
+    print(header)
+    print('-' * len(header))
+    for name in args.variants:
+        settings = VARIANTS[name]
+        path = os.path.join(workdir.name, f'variant-{len(result["variants"])}.db')
+        dataset.copy_database(seed_path, path)
+        if not settings.get('SQLITE_WAL', True):
+            # tryb WAL zostaje w pliku bazy - wariant bez WAL wraca do dziennika DELETE
+            connection = sqlite3.connect(path)
+            connection.execute('PRAGMA journal_mode=DELETE')
+            connection.close()
+        app = make_app(f'sqlite:///{path}', settings)
+        operations = run_variant(app, users, args)
+        with app.app_context():
+            pool = pool_stats(db.engine)
+            db.engine.dispose()
+        result['variants'][name] = {'settings': settings, 'operations': operations, 'pool': pool}
+        for operation, stats in operations.items():
+            print(f'{name:<24} {operation:<13} {stats["rps"]:>6} {stats["p50_ms"] or "-":>8} '
+                  f'{stats["p99_ms"] or "-":>8} {stats["errors"]:>6}')
+        print(f'{"":<24} czekanie na połączenie: max {pool["wait_seconds_max"] * 1000:.1f} ms, '
+              f'razem {pool["wait_seconds_total"] * 1000:.0f} ms')
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Syntetyczny zbiór danych do benchmarków.
+
+Rozkład zbliżony do prawdziwego:
+- grupy (rodziny) po 2-6 członków, pierwszy członek to administrator
+- użytkownik należy zwykle do jednej grupy, czasem do 2-3
+- liczba zadań w grupie z rozkładu Pareto - większość grup ma kilka-
+  kilkadziesiąt zadań, nieliczne tysiące
+- starsze zadania częściej są zrobione, połowa jest przypisana
+
+Wszystko wstawiane wsadowo (Core INSERT, executemany), hasło hashowane
+raz i współdzielone przez wszystkich użytkowników (BENCH_PASSWORD).
+Liczniki zadań grup liczy na końcu services.recount_task_counters.
+"""
+
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from app import db, passwords, services
+from app.models import User, FamilyGroup, GroupMember, Task
+from benchmarks import BENCH_PASSWORD
+
+# liczba członków rodziny -> waga
+FAMILY_SIZES = {2: 30, 3: 25, 4: 25, 5: 12, 6: 8}
+
+
+def _insert(model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(db.insert(model), rows[start:start + batch_size])
+
+
+def seed(groups=200, tasks=20000, max_tasks_per_group=5000, batch_size=5000, seed=42):
+    """
+    Wypełnij pustą bazę. Zwraca rozmiary zbioru (stats).
+    """
+    rnd = random.Random(seed)
+
+    # grupy i ich rozmiary
+    sizes = rnd.choices(list(FAMILY_SIZES), weights=list(FAMILY_SIZES.values()), k=groups)
+    # ~15% użytkowników należy do więcej niż jednej grupy
+    user_count = max(2, int(sum(sizes) * 0.85))
+
+    password = passwords.hash(BENCH_PASSWORD)
+    _insert(User, [
+        {'email': f'user{i}@example.com', 'password': password} for i in range(1, user_count + 1)
+    ], batch_size)
+    user_ids = db.session.scalars(db.select(User.id).order_by(User.id)).all()
+
+    _insert(FamilyGroup, [{'name': f'Rodzina {i}'} for i in range(1, groups + 1)], batch_size)
+    group_ids = db.session.scalars(db.select(FamilyGroup.id).order_by(FamilyGroup.id)).all()
+
+    memberships, members_of = [], {}
+    next_user = 0
+    for group_id, size in zip(group_ids, sizes):
+        members = []
+        while len(members) < size:
+            # najpierw kolejni "nowi" użytkownicy, potem losowi (druga, trzecia grupa)
+            if next_user < len(user_ids):
+                user_id = user_ids[next_user]
+                next_user += 1
+            else:
+                user_id = rnd.choice(user_ids)
+            if user_id not in members:
+                members.append(user_id)
+        members_of[group_id] = members
+        memberships.extend(
+            {'user_id': user_id, 'group_id': group_id, 'role': 'admin' if i == 0 else 'member'}
+            for i, user_id in enumerate(members)
+        )
+    _insert(GroupMember, memberships, batch_size)
+
+    # zadania - wagi Pareto, przeskalowane do łącznej liczby
+    weights = [rnd.paretovariate(1.16) for _ in group_ids]
+    scale = tasks / sum(weights)
+    now = datetime.now().replace(microsecond=0)
+    task_count = 0
+    rows = []
+    for group_id, weight in zip(group_ids, weights):
+        members = members_of[group_id]
+        for _ in range(min(max_tasks_per_group, max(1, round(weight * scale)))):
+            age = rnd.random()
+            rows.append({
+                'title': f'Zadanie {task_count + 1}',
+                'description': 'Opis zadania' if rnd.random() < 0.3 else None,
+                'group_id': group_id,
+                'created_by_id': rnd.choice(members),
+                'assigned_to_id': rnd.choice(members) if rnd.random() < 0.5 else None,
+                # starsze zadania częściej zrobione
+                'is_completed': rnd.random() < age,
+                'created_at': now - timedelta(days=365 * age, seconds=rnd.randrange(86400)),
+            })
+            task_count += 1
+            if len(rows) >= batch_size:
+                _insert(Task, rows, batch_size)
+                rows = []
+    _insert(Task, rows, batch_size)
+
+    services.recount_task_counters(fix=True)
+    db.session.commit()
+    return stats()
+
+
+def stats():
+    """Rozmiary zbioru w bazie - także dla danych z poprzedniego przebiegu."""
+    count = db.func.count()
+    largest = db.select(db.func.max(FamilyGroup.open_count + FamilyGroup.completed_count))
+    return {
+        'users': db.session.scalar(db.select(count).select_from(User)),
+        'groups': db.session.scalar(db.select(count).select_from(FamilyGroup)),
+        'memberships': db.session.scalar(db.select(count).select_from(GroupMember)),
+        'tasks': db.session.scalar(db.select(count).select_from(Task)),
+        'largest_group_tasks': db.session.scalar(largest),
+    }
+
+
+def admin_groups(limit, seed=42):
+    """
+    (email, [id grup]) dla `limit` administratorów - wirtualni użytkownicy
+    benchmarku (admin może też usuwać zadania).
+    Losujemy ważąc liczbą zadań, żeby trafiały się też duże grupy.
+    """
+    rows = db.session.execute(
+        db.select(User.email, GroupMember.group_id, FamilyGroup.open_count + FamilyGroup.completed_count)
+        .join(GroupMember, GroupMember.user_id == User.id)
+        .join(FamilyGroup, FamilyGroup.id == GroupMember.group_id)
+        .where(GroupMember.role == 'admin')
+        .order_by(User.id)
+    ).all()
+    groups_of = {}
+    weights = {}
+    for email, group_id, task_total in rows:
+        groups_of.setdefault(email, []).append(group_id)
+        weights[email] = weights.get(email, 0) + task_total + 1
+
+    rnd = random.Random(seed)
+    emails = list(groups_of)
+    chosen = set()
+    while len(chosen) < min(limit, len(emails)):
+        chosen.add(rnd.choices(emails, weights=[weights[e] for e in emails])[0])
+    return [(email, groups_of[email]) for email in sorted(chosen)]
+
+
+def sample_task_ids(group_ids, per_group=200):
+    """Id zadań wybranych grup (do przełączania/usuwania) - {group_id: [id]}."""
+    result = {}
+    for group_id in group_ids:
+        result[group_id] = db.session.scalars(
+            db.select(Task.id).where(Task.group_id == group_id).order_by(Task.id.desc()).limit(per_group)
+        ).all()
+    return result
+
+
+def copy_database(source_path, target_path):
+    """
+    Kopia bazy przez API backup SQLite - razem z tym, co jest jeszcze
+    w pliku -wal (kopia samego pliku bazy w trybie WAL może nie mieć danych).
+    """
+    source, target = sqlite3.connect(source_path), sqlite3.connect(target_path)
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
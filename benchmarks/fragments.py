@@ -0,0 +1,142 @@
+"""
+Renderowanie listy 2000 zadań grupy z cache fragmentów (app.fragments) i bez.
+
+    python -m benchmarks.fragments --count 2000 --requests 50
+    python -m benchmarks.fragments --output fragments.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset)
+i dodatkową grupą z --count zadaniami. TASKS_PER_PAGE=--count, więc
+cała lista to jedna strona. Dla każdego wariantu osobna aplikacja:
+
+- cache - FRAGMENT_CACHE_ENABLED=1, grupa bez zmian (trafienia)
+- cache po zmianie - przed każdym requestem zadanie zmienia status
+  (nowa wersja grupy, więc chybienie; czas zmiany poza pomiarem)
+- bez cache - FRAGMENT_CACHE_ENABLED=0
+
+Mierzymy GET /group/<id>/tasks?status=all administratora grupy -
+mediana i p90 czasu requestu oraz trafienia cache.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VARIANTS = (
+    ('cache', True, False),
+    ('cache po zmianie', True, True),
+    ('bez cache', False, False),
+)
+
+ADMIN_EMAIL = 'fragmenty@example.com'
+
+
+def make_app(database_uri, cache_enabled, per_page):
+    from config import Config
+    from app import create_app
+
+    class FragmentsBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        FRAGMENT_CACHE_ENABLED = cache_enabled
+        TASKS_PER_PAGE = per_page
+        METRICS_ENABLED = False
+        SLOW_REQUEST_MS = 0
+
+    return create_app(FragmentsBenchConfig)
+
+
+def seed_large_group(count):
+    """Grupa z count zadaniami i jej administrator - (id grupy, id zadań)."""
+    from app import db, passwords, services
+    from app.models import User, FamilyGroup
+    admin = User(email=ADMIN_EMAIL, password=passwords.hash(BENCH_PASSWORD))
+    group = FamilyGroup(name='Duża rodzina')
+    db.session.add_all([admin, group])
+    db.session.flush()
+    services.add_member(group, admin, role='admin')
+    ids = services.bulk_create_tasks(group.id, admin.id, [
+        {'title': f'Zadanie numer {i}', 'assigned_to_id': admin.id if i % 2 else None} for i in range(count)
+    ])
+    db.session.commit()
+    return group.id, ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lista zadań dużej grupy z cache fragmentów i bez.')
+    parser.add_argument('--count', type=int, default=2000, help='zadań w grupie (i na stronie)')
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-fragments-')
+    database_uri = f'sqlite:///{os.path.join(workdir.name, "fragments.db")}'
+
+    from app import db, fragment_cache
+    from benchmarks import dataset
+
+    setup = make_app(database_uri, True, args.count)
+    with setup.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        group_id, task_ids = seed_large_group(args.count)
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        db.engine.dispose()
+
+    path = f'/group/{group_id}/tasks?status=all'
+    result = {'args': vars(args), 'variants': {}}
+    for name, cache_enabled, changes in VARIANTS:
+        app = make_app(database_uri, cache_enabled, args.count)
+        client = app.test_client()
+        client.post('/api/v1/auth/login', json={'email': ADMIN_EMAIL, 'password': BENCH_PASSWORD})
+        # rozgrzewka - szablony i strony SQLite jak na działającym serwerze
+        assert client.get(path).status_code == 200
+        with app.app_context():
+            before = fragment_cache.stats()
+
+        times = []
+        for number in range(args.requests):
+            if changes:
+                # kolejne otwarte zadanie - każda zmiana podbija wersję grupy
+                task_id = task_ids[number % len(task_ids)]
+                client.patch(f'/api/v1/tasks/{task_id}', json={'is_completed': number < len(task_ids)})
+            start = time.perf_counter()
+            response = client.get(path)
+            times.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.status_code
+        size = len(response.data)
+
+        with app.app_context():
+            after = fragment_cache.stats()
+            db.engine.dispose()
+        times.sort()
+        stats = {
+            'median_ms': round(statistics.median(times) * 1000, 1),
+            'p90_ms': round(times[int(len(times) * 0.9)] * 1000, 1),
+            'cache_hits': after['hits'] - before['hits'],
+            'cache_misses': after['misses'] - before['misses'],
+            'page_kb': round(size / 1024),
+        }
+        result['variants'][name] = stats
+        print(f'{name}: mediana {stats["median_ms"]} ms, p90 {stats["p90_ms"]} ms, strona {stats["page_kb"]} KB'
+              + (f' (cache: trafienia {stats["cache_hits"]}, chybienia {stats["cache_misses"]})'
+                 if cache_enabled else ''))
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Czas odpowiedzi tras zmieniających dane z powiadomieniami wysyłanymi
+w requeście (JOBS_BACKEND=inline) i w tle (thread, database).
+
+    python -m benchmarks.jobs --requests 200 --delivery-delay 0.05
+    python -m benchmarks.jobs --backends inline,database --worker-concurrency 4
+
+app.notifications.deliver zastępuje SlowDelivery - liczy powiadomienia
+i każde "dostarcza" --delivery-delay sekund (jak zdalna usługa, np. poczta).
+Dla każdego backendu osobna baza SQLite w katalogu tymczasowym:
+
+- create - POST /api/v1/groups/<id>/tasks z przypisaniem innego członka
+  (jedno powiadomienie)
+- bulk - POST .../tasks/bulk-create z --bulk-size przypisanymi zadaniami
+
+Mierzymy percentyle czasu requestu (p50, p95, p99) i czas, po którym
+wszystkie powiadomienia zostały dostarczone ("drain" - dla 'database'
+uruchamiamy worker po fazie requestów, jak `flask jobs-worker --once`).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class SlowDelivery:
+    """Zamiennik notifications.deliver - czeka delay sekund i liczy powiadomienia."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.received = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, user, subject, body):
+        time.sleep(self.delay)
+        with self.lock:
+            self.received += 1
+
+    def wait_for(self, count, timeout):
+        deadline = time.monotonic() + timeout
+        while self.received < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.received >= count
+
+
+def percentiles(durations):
+    durations = sorted(durations)
+    count = len(durations)
+
+    def at(p):
+        # najbliższa ranga
+        return round(durations[min(count - 1, max(0, round(p / 100 * count + 0.5) - 1))] * 1000, 2)
+
+    return {'requests': count, 'p50_ms': at(50), 'p95_ms': at(95), 'p99_ms': at(99),
+            'mean_ms': round(sum(durations) / count * 1000, 2)}
+
+
+def bench_backend(backend, args, delivery):
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-jobs-')
+    from config import Config
+    from app import create_app, db, passwords, jobs, services
+    from app.models import User, FamilyGroup
+
+    class JobsBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir.name, "jobs.db")}'
+        SLOW_REQUEST_MS = 0
+        JOBS_BACKEND = backend
+        JOBS_WORKERS = args.workers
+        JOBS_POLL_INTERVAL = 0.05
+
+    app = create_app(JobsBenchConfig)
+    with app.app_context():
+        db.create_all()
+        password = passwords.hash(BENCH_PASSWORD)
+        admin = User(email='admin@example.com', password=password)
+        member = User(email='member@example.com', password=password)
+        group = FamilyGroup(name='Rodzina')
+        db.session.add_all([admin, member, group])
+        db.session.flush()
+        services.add_member(group, admin, role='admin')
+        services.add_member(group, member)
+        db.session.commit()
+        group_id, member_id = group.id, member.id
+
+    client = app.test_client()
+    response = client.post('/api/v1/auth/login', json={'email': 'admin@example.com', 'password': BENCH_PASSWORD})
+    assert response.status_code == 200, response.status_code
+
+    sent_before = delivery.received
+    result = {'backend': backend}
+    start = time.perf_counter()
+    for phase in ('create', 'bulk'):
+        durations = []
+        for i in range(args.requests):
+            if phase == 'create':
+                path, body = f'/api/v1/groups/{group_id}/tasks', {'title': f'Zadanie {i}', 'assigned_to': member_id}
+            else:
+                path = f'/api/v1/groups/{group_id}/tasks/bulk-create'
+                body = {'tasks': [{'title': f'Zadanie {i}.{n}', 'assigned_to': member_id}
+                                  for n in range(args.bulk_size)]}
+            started = time.perf_counter()
+            response = client.post(path, json=body)
+            durations.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.get_data(as_text=True)
+        result[phase] = percentiles(durations)
+
+    expected = args.requests * (1 + args.bulk_size)
+    if backend == 'database':
+        with app.app_context():
+            jobs.work(app, concurrency=args.worker_concurrency, once=True)
+    delivered = delivery.wait_for(sent_before + expected, timeout=args.timeout)
+    result['notifications'] = delivery.received - sent_before
+    result['drain_seconds'] = round(time.perf_counter() - start, 2) if delivered else None
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    workdir.cleanup()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Trasy zmieniające dane: powiadomienia w requeście vs w tle.')
+    parser.add_argument('--backends', default='inline,thread,database', help='JOBS_BACKEND, po przecinku')
+    parser.add_argument('--requests', type=int, default=200, help='requestów w każdej fazie')
+    parser.add_argument('--bulk-size', type=int, default=10, help='przypisanych zadań w jednym bulk-create')
+    parser.add_argument('--delivery-delay', type=float, default=0.05, help='czas dostarczenia jednego powiadomienia (s)')
+    parser.add_argument('--workers', type=int, default=4, help='JOBS_WORKERS (pula wątków backendu thread)')
+    parser.add_argument('--worker-concurrency', type=int, default=4, help='wątki workera backendu database')
+    parser.add_argument('--timeout', type=float, default=600, help='ile czekać na dostarczenie powiadomień (s)')
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    from app import notifications
+    delivery = SlowDelivery(delay=args.delivery_delay)
+    notifications.deliver = delivery
+    results = []
+    print(f'{"backend":>9} {"create p50":>11} {"create p95":>11} {"bulk p50":>9} {"bulk p95":>9} '
+          f'{"powiad.":>7} {"drain s":>8}   (ms)')
+    for backend in args.backends.split(','):
+        result = bench_backend(backend, args, delivery)
+        results.append(result)
+        print(f'{backend:>9} {result["create"]["p50_ms"]:>11} {result["create"]["p95_ms"]:>11} '
+              f'{result["bulk"]["p50_ms"]:>9} {result["bulk"]["p95_ms"]:>9} '
+              f'{result["notifications"]:>7} {str(result["drain_seconds"]):>8}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Sprawdzanie członkostwa w grupie przy ~100 tys. wierszy group_member,
+z indeksami tabeli (uq_group_member_user_group, ix_group_member_group_role)
+i bez nich.
+
+    python -m benchmarks.membership --groups 29500 --checks 2000
+    python -m benchmarks.membership --output membership.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset,
+~3,4 członka na grupę). Wariant bez indeksów to kopia tej bazy, w której
+group_member ma schemat sprzed indeksów (tylko klucz główny id). Na obu
+bazach ta sama aplikacja (cache ról wyłączony) i te same losowe pary
+(użytkownik, grupa):
+
+- dostęp do grupy - app.decorators.get_group_access (każda chroniona trasa)
+- ostatni admin - services.is_last_admin (usuwanie członka)
+- lista członków - queries.group_member_list (strona grupy)
+
+Wynik: operacje/s i plan zapytania SQLite (EXPLAIN QUERY PLAN) dla
+sprawdzenia dostępu.
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# group_member jak przed migracją z indeksami
+PLAIN_TABLE = '''
+ALTER TABLE group_member RENAME TO group_member_indexed;
+CREATE TABLE group_member (
+    id INTEGER NOT NULL PRIMARY KEY,
+    user_id INTEGER REFERENCES user (id),
+    group_id INTEGER REFERENCES family_group (id),
+    role VARCHAR(50) NOT NULL
+);
+INSERT INTO group_member (id, user_id, group_id, role)
+    SELECT id, user_id, group_id, role FROM group_member_indexed;
+DROP TABLE group_member_indexed;
+'''
+
+
+def make_app(database_uri):
+    from config import Config
+    from app import create_app
+
+    class MembershipBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        MEMBERSHIP_CACHE_ENABLED = False
+        METRICS_ENABLED = False
+
+    return create_app(MembershipBenchConfig)
+
+
+def drop_indexes(path):
+    connection = sqlite3.connect(path)
+    connection.executescript(PLAIN_TABLE)
+    connection.execute('VACUUM')
+    connection.close()
+
+
+def measure(app, users, pairs):
+    """Operacje/s dla każdej operacji na tych samych parach (user_id, group_id)."""
+    from flask_login import login_user
+    from app import services
+    from app.decorators import get_group_access
+    from app.queries import group_member_list
+
+    def access(user_id, group_id):
+        with app.test_request_context():
+            login_user(users[user_id])
+            start = time.perf_counter()
+            assert get_group_access(group_id).role is not None
+            return time.perf_counter() - start
+
+    def last_admin(user_id, group_id):
+        with app.app_context():
+            start = time.perf_counter()
+            services.is_last_admin(group_id, user_id)
+            return time.perf_counter() - start
+
+    def member_list(user_id, group_id):
+        with app.app_context():
+            start = time.perf_counter()
+            assert group_member_list(group_id)
+            return time.perf_counter() - start
+
+    result = {}
+    for name, operation in (('dostęp do grupy', access), ('ostatni admin', last_admin),
+                            ('lista członków', member_list)):
+        # rozgrzewka - strony SQLite w pamięci jak na działającym serwerze
+        for user_id, group_id in pairs[:50]:
+            operation(user_id, group_id)
+        elapsed = sum(operation(user_id, group_id) for user_id, group_id in pairs)
+        result[name] = round(len(pairs) / elapsed)
+    return result
+
+
+def query_plan(app, user_id, group_id):
+    """EXPLAIN QUERY PLAN zapytania o rolę członka grupy."""
+    from app import db
+    with app.app_context():
+        rows = db.session.execute(db.text(
+            'EXPLAIN QUERY PLAN SELECT role FROM group_member WHERE user_id = :user AND group_id = :group'
+        ), {'user': user_id, 'group': group_id})
+        return [row[-1] for row in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Sprawdzanie członkostwa z indeksami group_member i bez.')
+    parser.add_argument('--groups', type=int, default=29500, help='~3,4 członka na grupę - 29500 to ~100 tys. wierszy')
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--checks', type=int, default=2000, help='par (użytkownik, grupa) na operację')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-membership-')
+    indexed_path = os.path.join(workdir.name, 'indexed.db')
+    plain_path = os.path.join(workdir.name, 'plain.db')
+
+    from app import db
+    from app.models import User, GroupMember
+    from benchmarks import dataset
+
+    setup = make_app(f'sqlite:///{indexed_path}')
+    with setup.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        stats = dataset.stats()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in stats.items()))
+        rows = db.session.execute(db.select(GroupMember.user_id, GroupMember.group_id)).all()
+        pairs = [tuple(row) for row in random.Random(args.seed).sample(rows, min(args.checks, len(rows)))]
+        users = {user.id: user for user in db.session.scalars(
+            db.select(User).where(User.id.in_({user_id for user_id, _ in pairs})))}
+        db.session.expunge_all()
+        # sesja oddaje połączenie - inaczej dispose() go nie zamknie
+        db.session.remove()
+        db.engine.dispose()
+    dataset.copy_database(indexed_path, plain_path)
+    drop_indexes(plain_path)
+
+    result = {'args': vars(args), 'dataset': stats, 'variants': {}}
+    for name, path in (('z indeksami', indexed_path), ('bez indeksów', plain_path)):
+        app = make_app(f'sqlite:///{path}')
+        operations = measure(app, users, pairs)
+        plan = query_plan(app, *pairs[0])
+        with app.app_context():
+            db.engine.dispose()
+        result['variants'][name] = {'operations_per_second': operations, 'query_plan': plan}
+        print(f'{name}: ' + ', '.join(f'{operation} {value}/s' for operation, value in operations.items()))
+        print(f'  plan: {"; ".join(plan)}')
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Narzut metryk requestów (app.metrics): te same requesty z metrykami i bez.
+
+    python -m benchmarks.metrics --rounds 100 --chunk 40
+    python -m benchmarks.metrics --max-overhead 2 --output metrics.json
+
+Baza SQLite w katalogu tymczasowym z syntetycznym zbiorem (benchmarks.dataset)
+i dwie aplikacje na niej: METRICS_ENABLED=1 i 0. Administrator grupy
+wykonuje na zmianę paczki po --chunk requestów po trasach z ROUTES
+w jednej i drugiej aplikacji, --rounds razy (kolejność w rundzie też
+na zmianę). Na czas paczki bez metryk słuchacze zdarzeń silnika
+SQLAlchemy są odłączani (metrics.listen_engine_events), więc wariant
+bez metryk nie płaci za nic z app.metrics.
+
+Liczymy czas CPU procesu (klient testowy działa w jednym wątku - to cały
+koszt requestu, bez szumu planisty). Krótkie, przeplatane paczki
+rozkładają dryf maszyny po równo; narzut to mediana ilorazów z par
+paczek w tej samej rundzie. Kod wyjścia 1, jeśli przekracza --max-overhead.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# strony HTML (szablony), API (JSON) i zmiana danych (zapisy, więcej SQL)
+ROUTES = ('/', '/group/{group}', '/group/{group}/tasks?status=all', '/api/v1/groups/{group}/tasks',
+          'PATCH /api/v1/tasks/{task}')
+
+
+def make_app(database_uri, enabled):
+    from config import Config
+    from app import create_app
+
+    class MetricsBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        METRICS_ENABLED = enabled
+        # bez logu wolnych requestów - mierzymy samo zbieranie metryk
+        SLOW_REQUEST_MS = 0
+
+    return create_app(MetricsBenchConfig)
+
+
+def make_runner(app, email, calls):
+    client = app.test_client()
+    client.post('/api/v1/auth/login', json={'email': email, 'password': BENCH_PASSWORD})
+    state = {'requests': 0}
+
+    def run(count):
+        """Czas CPU (s) count kolejnych requestów z listy calls."""
+        start = time.process_time()
+        for _ in range(count):
+            method, path = calls[state['requests'] % len(calls)]
+            if method == 'PATCH':
+                response = client.patch(path, json={'is_completed': state['requests'] % 2 == 0})
+            else:
+                response = client.get(path)
+            assert response.status_code == 200, (path, response.status_code)
+            state['requests'] += 1
+        return time.process_time() - start
+    return run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Narzut metryk requestów (METRICS_ENABLED=1 vs 0).')
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--tasks', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--chunk', type=int, default=40, help='requestów w paczce')
+    parser.add_argument('--max-overhead', type=float, default=2.0, help='dopuszczalny narzut w procentach')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-metrics-')
+    database_uri = f'sqlite:///{os.path.join(workdir.name, "metrics.db")}'
+    from app import db, metrics
+    from app.metrics import listen_engine_events
+    from benchmarks import dataset
+
+    enabled, disabled = make_app(database_uri, True), make_app(database_uri, False)
+    with disabled.app_context():
+        db.create_all()
+        dataset.seed(groups=args.groups, tasks=args.tasks, seed=args.seed)
+        db.session.commit()
+        print('Dane: ' + ', '.join(f'{key} {value}' for key, value in dataset.stats().items()))
+        email, group_ids = dataset.admin_groups(1, seed=args.seed)[0]
+        task_id = dataset.sample_task_ids(group_ids[:1], per_group=1)[group_ids[0]][0]
+
+    calls = []
+    for route in ROUTES:
+        method, _, path = route.rpartition(' ')
+        calls.append((method or 'GET', path.format(group=group_ids[0], task=task_id)))
+    variants = {'z metrykami': (True, make_runner(enabled, email, calls)),
+                'bez metryk': (False, make_runner(disabled, email, calls))}
+
+    times = {name: [] for name in variants}
+
+    def measure(name, count):
+        listeners, run = variants[name]
+        listen_engine_events(listeners)
+        seconds = run(count)
+        listen_engine_events(True)
+        return seconds
+
+    # rozgrzewka - szablony, cache i strony SQLite jak na działającym serwerze
+    for name in variants:
+        measure(name, len(calls) * 20)
+    for round_number in range(args.rounds):
+        order = list(variants) if round_number % 2 == 0 else list(variants)[::-1]
+        for name in order:
+            times[name].append(measure(name, args.chunk))
+
+    with enabled.app_context():
+        counted = sum(stats['count'] for stats in metrics.snapshot().values())
+        db.engine.dispose()
+    with disabled.app_context():
+        db.engine.dispose()
+    workdir.cleanup()
+
+    overhead = statistics.median(
+        (on / off - 1) * 100 for on, off in zip(times['z metrykami'], times['bez metryk'])
+    )
+    per_request = {name: sum(values) / (len(values) * args.chunk) * 1000 for name, values in times.items()}
+    result = {
+        'args': vars(args),
+        'routes': list(ROUTES),
+        'request_cpu_ms': {name: round(value, 4) for name, value in per_request.items()},
+        'overhead_percent': round(overhead, 2),
+        'requests_counted': counted,
+    }
+
+    for name, value in per_request.items():
+        print(f'{name}: {value:.3f} ms CPU/request ({args.rounds} paczek po {args.chunk} requestów)')
+    print(f'Narzut metryk: {overhead:+.2f}% (limit {args.max_overhead}%), requestów w metrykach: {counted}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0 if overhead <= args.max_overhead else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
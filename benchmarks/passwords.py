@@ -0,0 +1,102 @@
+"""
+Hashowanie haseł (app.passwords) - hashe/s i czas jednego sprawdzenia
+dla każdej konfiguracji metody i puli.
+
+    python -m benchmarks.passwords --concurrency 8 --duration 3
+    python -m benchmarks.passwords --methods scrypt pbkdf2:sha256:600000 --pools "" thread
+
+Każda konfiguracja (PASSWORD_HASH_METHOD x PASSWORD_HASH_POOL) to osobna
+aplikacja Flask z własną pulą. --concurrency wątków (jak wątki workera
+przy fali logowań) przez --duration sekund sprawdza hasło
+(passwords.verify, jak logowanie) na hashu policzonym tą metodą.
+Na maszynie z jednym rdzeniem pula nie zwiększy przepustowości -
+ogranicza tylko liczbę hashy liczonych naraz.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from flask import Flask
+from app.passwords import PasswordHasher
+
+METHODS = ('scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:1000')
+POOLS = ('', 'thread', 'process')
+PASSWORD = 'Haslo12345'
+
+
+def measure(method, pool, workers, concurrency, duration):
+    """(hashe/s, czasy sprawdzeń w s) - concurrency wątków wywołujących verify."""
+    app = Flask(__name__)
+    app.config.update(PASSWORD_HASH_METHOD=method, PASSWORD_HASH_POOL=pool, PASSWORD_HASH_WORKERS=workers)
+    passwords = PasswordHasher(app)
+    with app.app_context():
+        stored = passwords.hash(PASSWORD)
+        # rozgrzewka - start procesów/wątków puli
+        for _ in range(workers):
+            passwords.verify(stored, PASSWORD)
+
+    latencies, lock = [], threading.Lock()
+    until = time.monotonic() + duration
+
+    def caller():
+        with app.app_context():
+            while time.monotonic() < until:
+                start = time.perf_counter()
+                assert passwords.verify(stored, PASSWORD)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=caller) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    executor = app.extensions['passwords'].executor
+    if executor is not None:
+        executor.shutdown()
+    return len(latencies) / elapsed, sorted(latencies)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hashe haseł na sekundę dla metod i pul.')
+    parser.add_argument('--methods', nargs='+', default=list(METHODS))
+    parser.add_argument('--pools', nargs='+', default=list(POOLS), help="'' (wątek requestu), thread, process")
+    parser.add_argument('--workers', type=int, default=2, help='PASSWORD_HASH_WORKERS')
+    parser.add_argument('--concurrency', type=int, default=8, help='wątki wywołujące naraz')
+    parser.add_argument('--duration', type=float, default=3, help='sekundy na konfigurację')
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    result = {'args': vars(args), 'configurations': []}
+    header = f'{"metoda":<24} {"pula":<8} {"hashe/s":>8} {"p50 ms":>8} {"p99 ms":>8}'
+    print(header)
+    print('-' * len(header))
+    for method in args.methods:
+        for pool in args.pools:
+            rate, latencies = measure(method, pool, args.workers, args.concurrency, args.duration)
+            stats = {
+                'method': method,
+                'pool': pool,
+                'hashes_per_second': round(rate, 1),
+                'p50_ms': round(statistics.median(latencies) * 1000, 1),
+                'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 1),
+                'hashes': len(latencies),
+            }
+            result['configurations'].append(stats)
+            print(f'{method:<24} {pool or "-":<8} {stats["hashes_per_second"]:>8} '
+                  f'{stats["p50_ms"]:>8} {stats["p99_ms"]:>8}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
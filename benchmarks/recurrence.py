@@ -0,0 +1,158 @@
+"""
+Harmonogram zadań powtarzanych (app.recurrence) i zapytania o terminy.
+
+    python -m benchmarks.recurrence --rules 100000 --tasks 500000
+    python -m benchmarks.recurrence --rules 100000 --budget 2
+
+Baza SQLite w katalogu tymczasowym: --groups grup, --rules serii
+z minionym terminem (wszystkie do przetworzenia w pierwszym przebiegu)
+i --tasks zwykłych zadań (połowa z terminem +-30 dni), a pierwsza grupa
+dostaje --large-group z nich.
+
+Mierzymy:
+- pierwszy przebieg harmonogramu (--budget, --batch-size) - serie/s;
+  przy zbyt małym budżecie kolejne przebiegi dokończą pracę
+- przebieg bez pracy: indeks częściowy vs pełny skan tabeli zadań
+  (tak wyglądałby "tick", który przegląda wszystkie zadania)
+- zaległe / na ten tydzień dla dużej grupy (indeks ix_task_group_completed_due)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RULES = ('daily', 'weekly', 'weekly', 'weekly:2', 'monthly', 'monthly', 'yearly')
+
+# tytuły z małego słownika - jak prawdziwe obowiązki (unikalne słowa w każdym
+# tytule sztucznie zawyżałyby koszt indeksu wyszukiwania)
+CHORES = ('Wynieść śmieci', 'Segregacja', 'Zapłacić rachunki', 'Czynsz', 'Prąd', 'Podlać kwiaty',
+          'Odkurzanie', 'Mycie okien', 'Pranie', 'Zakupy', 'Karma dla kota', 'Spacer z psem',
+          'Przegląd samochodu', 'Basen', 'Trening', 'Urodziny babci', 'Wymiana filtra', 'Lekcje')
+
+
+def median_ms(run, repeat):
+    run()  # rozgrzewka (cache stron SQLite)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def fill(db, args, now, rnd, batch_size=10000):
+    from app import search
+    from app.models import User, FamilyGroup, Task
+    connection = db.session.connection()
+    connection.execute(User.__table__.insert(), [{'id': 1, 'email': 'bench@example.com', 'password': '-'}])
+    connection.execute(FamilyGroup.__table__.insert(), [
+        {'id': i, 'name': f'Rodzina {i}'} for i in range(1, args.groups + 1)
+    ])
+    # indeks wyszukiwania raz na końcu, jak w imporcie
+    search.suspend_index(connection)
+
+    rows = []
+
+    def add(row):
+        rows.append(row)
+        if len(rows) >= batch_size:
+            connection.execute(Task.__table__.insert(), rows)
+            rows.clear()
+
+    for i in range(args.rules):
+        add({'title': rnd.choice(CHORES), 'group_id': rnd.randint(1, args.groups), 'created_by_id': 1,
+             'is_completed': False, 'created_at': now - timedelta(days=30),
+             'due_at': now - timedelta(seconds=rnd.randrange(7 * 86400)), 'recurrence': rnd.choice(RULES)})
+    for i in range(args.tasks):
+        group_id = 1 if i < args.large_group else rnd.randint(2, args.groups)
+        due_at = now + timedelta(seconds=rnd.randrange(-30 * 86400, 30 * 86400)) if rnd.random() < 0.5 else None
+        add({'title': rnd.choice(CHORES), 'group_id': group_id, 'created_by_id': 1,
+             'is_completed': rnd.random() < 0.5, 'created_at': now - timedelta(days=60), 'due_at': due_at})
+    if rows:
+        connection.execute(Task.__table__.insert(), rows)
+    search.resume_index(connection, 1)
+
+    from app import services
+    services.recount_task_counters(fix=True)
+    db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Harmonogram zadań powtarzanych i zapytania o terminy.')
+    parser.add_argument('--rules', type=int, default=100000, help='serie z minionym terminem')
+    parser.add_argument('--tasks', type=int, default=500000, help='zwykłe zadania')
+    parser.add_argument('--groups', type=int, default=20000)
+    parser.add_argument('--large-group', type=int, default=20000, help='zadań w pierwszej (dużej) grupie')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--budget', type=float, default=30, help='budżet czasu przebiegu (s)')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-recurrence-')
+    from config import Config
+    from app import create_app, db, recurrence
+    from app.models import Task, utcnow
+    from app.queries import group_due_tasks
+
+    class RecurrenceBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir.name, "recurrence.db")}'
+
+    app = create_app(RecurrenceBenchConfig)
+    result = {'args': vars(args)}
+    with app.app_context():
+        db.create_all()
+        now = utcnow()
+        start = time.perf_counter()
+        fill(db, args, now, random.Random(args.seed))
+        result['fill_seconds'] = round(time.perf_counter() - start, 1)
+        print(f'Dane: {args.rules} serii, {args.tasks} zadań, {args.groups} grup ({result["fill_seconds"]} s)')
+
+        runs = []
+        while True:
+            stats = recurrence.materialize_due(now=now, batch_size=args.batch_size, budget=args.budget)
+            runs.append({key: round(value, 3) if isinstance(value, float) else value for key, value in stats.items()})
+            print(f'Przebieg {len(runs)}: {stats["rules"]} serii w {stats["seconds"]:.2f} s '
+                  f'({stats["rules"] / stats["seconds"]:.0f}/s), paczki {stats["batches"]}'
+                  + ('' if stats['complete'] else ' - przerwany (budżet)'))
+            if stats['complete']:
+                break
+        result['runs'] = runs
+        created = db.session.scalar(db.select(db.func.count()).select_from(Task).where(Task.recurrence.isnot(None)))
+        assert created == args.rules, created
+
+        # przebieg bez pracy - indeks częściowy vs pełny skan
+        result['idle_run_ms'] = median_ms(lambda: recurrence.materialize_due(now=now), args.repeat)
+        scan = db.text('SELECT id FROM task NOT INDEXED WHERE recurrence IS NOT NULL AND due_at <= :now '
+                       'ORDER BY due_at, id LIMIT 1000')
+        result['idle_full_scan_ms'] = median_ms(lambda: db.session.execute(scan, {'now': now}).all(), args.repeat)
+        print(f'Przebieg bez pracy: {result["idle_run_ms"]} ms (pełny skan: {result["idle_full_scan_ms"]} ms)')
+
+        found = group_due_tasks(1, now)
+        result['due_group_ms'] = median_ms(lambda: group_due_tasks(1, now), args.repeat)
+        result['due_group_found'] = [len(found[0]), len(found[1])]
+        print(f'Zaległe + na ten tydzień (grupa z {args.large_group} zadaniami): {result["due_group_ms"]} ms '
+              f'({len(found[0])} + {len(found[1])} zadań)')
+
+        db.session.remove()
+        db.engine.dispose()
+    workdir.cleanup()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
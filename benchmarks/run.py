@@ -0,0 +1,484 @@
+"""
+Benchmark całej aplikacji: syntetyczny zbiór danych + scenariusze użytkowników.
+
+    python -m benchmarks.run --groups 500 --tasks 50000 --users 40 --concurrency 8
+    python -m benchmarks.run --server uvicorn --workers 1 --set ASYNC_VIEWS=1
+    python -m benchmarks.compare wyniki-przed.json wyniki-po.json
+
+Kolejne fazy (--scenarios): logowanie, strona główna, lista zadań,
+dodanie, przełączenie i usunięcie zadania. Każdy wirtualny użytkownik
+(administrator jednej lub kilku grup) wykonuje w fazie --iterations
+operacji, --concurrency wątków naraz.
+
+Domyślnie requesty idą przez klienta testowego Flaska, w tym samym
+procesie (bez sieci i serwera - mierzymy aplikację). --server uruchamia
+prawdziwy serwer (werkzeug albo uvicorn) na tej samej bazie; liczbę
+zapytań SQL bierzemy wtedy z /metrics (średnia na request mierzonego
+endpointu w fazie).
+
+--set KLUCZ=WARTOŚĆ ustawia zmienną środowiskową przed utworzeniem
+aplikacji (i serwera) - tak jak config.py, np. --set FRAGMENT_CACHE_ENABLED=0.
+
+Wynik: tabela na konsoli i JSON (--output) - parametry przebiegu,
+rozmiar zbioru, commit i dla każdej fazy: liczba requestów, błędy,
+przepustowość, percentyle czasu i zapytania SQL na request.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import secrets
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.cookiejar import CookieJar
+from urllib.parse import urlencode
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = ('login', 'dashboard', 'task_list', 'create', 'toggle', 'delete')
+
+CSRF_RE = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+# zapytania SQL bieżącego requestu (tryb klienta testowego - request w wątku wywołującego)
+_queries = threading.local()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark aplikacji na syntetycznych danych.')
+    data = parser.add_argument_group('zbiór danych')
+    data.add_argument('--db', help='plik SQLite (domyślnie tymczasowy); istniejący z danymi jest używany ponownie')
+    data.add_argument('--fresh', action='store_true', help='usuń plik --db i wygeneruj dane od nowa')
+    data.add_argument('--groups', type=int, default=200, help='liczba grup (rodzin)')
+    data.add_argument('--tasks', type=int, default=20000, help='łączna liczba zadań')
+    data.add_argument('--max-tasks-per-group', type=int, default=5000)
+    data.add_argument('--seed', type=int, default=42)
+
+    load = parser.add_argument_group('obciążenie')
+    load.add_argument('--users', type=int, default=20, help='wirtualni użytkownicy')
+    load.add_argument('--iterations', type=int, default=25, help='operacji na użytkownika w fazie')
+    load.add_argument('--concurrency', type=int, default=4, help='równoległe wątki')
+    load.add_argument('--scenarios', default=','.join(SCENARIOS),
+                      help=f'fazy po przecinku, dostępne: {",".join(SCENARIOS)}')
+    load.add_argument('--server', choices=('werkzeug', 'uvicorn'), help='uruchom prawdziwy serwer zamiast klienta testowego')
+    load.add_argument('--workers', type=int, default=1, help='procesy uvicorn (metryki SQL tylko dla 1)')
+    load.add_argument('--port', type=int, default=0, help='port serwera (0 = wolny)')
+    load.add_argument('--set', action='append', default=[], metavar='KLUCZ=WARTOŚĆ',
+                      help='zmienna środowiskowa konfiguracji (można powtarzać)')
+
+    parser.add_argument('--output', default='benchmark-results.json', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'nieznane scenariusze: {", ".join(sorted(unknown))}')
+    for item in args.set:
+        if '=' not in item:
+            parser.error(f'--set oczekuje KLUCZ=WARTOŚĆ, jest: {item}')
+    return args
+
+
+# --- klienci HTTP ---
+
+class TestClient:
+    """Klient testowy Flaska - request wykonuje się w bieżącym wątku."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.headers.get('Location'), response.get_data(as_text=True)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # jak klient testowy - przekierowanie to odpowiedź, nie kolejny request
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpClient:
+    """Prawdziwy HTTP (urllib) z własnymi ciasteczkami - jeden na użytkownika."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(CookieJar()), _NoRedirect
+        )
+
+    def request(self, method, path, data=None):
+        body = urlencode(data).encode() if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method)
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                return response.status, response.headers.get('Location'), response.read().decode()
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers.get('Location'), error.read().decode()
+
+
+# --- wirtualny użytkownik i scenariusze ---
+
+class VirtualUser:
+
+    def __init__(self, number, email, group_ids, task_ids, make_client):
+        self.number = number
+        self.email = email
+        self.group_ids = group_ids
+        # id istniejących zadań jego grup - do przełączania
+        self.task_ids = [(group_id, task_id) for group_id in group_ids for task_id in task_ids[group_id]]
+        # zadania dodane w fazie create - usuwa je faza delete
+        self.created = []
+        self.make_client = make_client
+        self.client = None
+        self.csrf_token = None
+
+    def log_in(self, samples=None):
+        """Nowa sesja: GET /login (token CSRF) i POST /login - ten drugi mierzony, jeśli samples."""
+        client = self.make_client()
+        _, _, body = client.request('GET', '/login')
+        form = {'email': self.email, 'password': BENCH_PASSWORD, 'csrf_token': _csrf(body)}
+        if samples is None:
+            status, _, _ = client.request('POST', '/login', form)
+            if status != 302:
+                raise RuntimeError(f'Nie udało się zalogować {self.email} (HTTP {status})')
+        else:
+            _timed(samples, client, 'POST', '/login', form, expect=302)
+        self.client = client
+        self.csrf_token = None
+
+
+def scenario_login(vu, rnd, samples):
+    vu.log_in(samples)
+
+
+def scenario_dashboard(vu, rnd, samples):
+    _timed(samples, vu.client, 'GET', '/')
+
+
+def scenario_task_list(vu, rnd, samples):
+    group_id = rnd.choice(vu.group_ids)
+    status = rnd.choices(('open', 'done', 'all'), weights=(70, 20, 10))[0]
+    _timed(samples, vu.client, 'GET', f'/group/{group_id}/tasks?status={status}')
+
+
+def scenario_create(vu, rnd, samples):
+    group_id = rnd.choice(vu.group_ids)
+    if vu.csrf_token is None:
+        # token CSRF sesji - z formularza na stronie zadań (niemierzone)
+        _, _, body = vu.client.request('GET', f'/group/{group_id}/tasks')
+        vu.csrf_token = _csrf(body)
+    title = f'Benchmark vu{vu.number} {len(vu.created) + 1}'
+    form = {'title': title, 'description': '', 'assigned_to': '0', 'csrf_token': vu.csrf_token}
+    status, location = _timed(samples, vu.client, 'POST', f'/group/{group_id}/tasks', form, expect=302)
+    if status == 302:
+        vu.created.append((group_id, title))
+        _follow(vu.client, location)
+
+
+def scenario_toggle(vu, rnd, samples):
+    if not vu.task_ids:
+        return
+    _, task_id = rnd.choice(vu.task_ids)
+    _, location = _timed(samples, vu.client, 'POST', f'/task/{task_id}/toggle', expect=302)
+    _follow(vu.client, location)
+
+
+def scenario_delete(vu, rnd, samples):
+    # id dodanych zadań uzupełnia main() przed fazą delete
+    if not vu.created:
+        return
+    task_id = vu.created.pop()
+    _, location = _timed(samples, vu.client, 'POST', f'/task/{task_id}/delete', expect=302)
+    _follow(vu.client, location)
+
+
+# mierzony endpoint scenariusza (etykiety /metrics)
+SCENARIO_ENDPOINTS = {
+    'login': ('auth.login', 'POST'),
+    'dashboard': ('groups.index', 'GET'),
+    'task_list': ('tasks.group_tasks', 'GET'),
+    'create': ('tasks.group_tasks', 'POST'),
+    'toggle': ('tasks.toggle_task', 'POST'),
+    'delete': ('tasks.delete_task', 'POST'),
+}
+
+SCENARIO_FUNCTIONS = {
+    'login': scenario_login,
+    'dashboard': scenario_dashboard,
+    'task_list': scenario_task_list,
+    'create': scenario_create,
+    'toggle': scenario_toggle,
+    'delete': scenario_delete,
+}
+
+
+def _csrf(body):
+    match = CSRF_RE.search(body)
+    return match.group(1) if match else ''
+
+
+def _timed(samples, client, method, path, data=None, expect=200):
+    """Jeden mierzony request: (czas, zapytania SQL, ok) trafia do samples."""
+    _queries.count = 0
+    start = time.perf_counter()
+    try:
+        status, location, _ = client.request(method, path, data)
+    except Exception:
+        status, location = None, None
+    samples.append((time.perf_counter() - start, _queries.count, status == expect))
+    return status, location
+
+
+def _follow(client, location):
+    # przeglądarka i tak pobierze stronę po przekierowaniu (i zdejmie flash z sesji) - niemierzone
+    if location:
+        if '://' in location:
+            location = '/' + location.split('://', 1)[1].split('/', 1)[-1]
+        client.request('GET', location)
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    _queries.count = getattr(_queries, 'count', 0) + 1
+
+
+# --- przebieg ---
+
+def run_phase(name, vus, args):
+    """Wszyscy użytkownicy wykonują scenariusz `name` --iterations razy. Zwraca (próbki, czas)."""
+    scenario = SCENARIO_FUNCTIONS[name]
+
+    def worker(vu):
+        rnd = random.Random(f'{args.seed}:{name}:{vu.number}')
+        samples = []
+        for _ in range(args.iterations):
+            scenario(vu, rnd, samples)
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(worker, vus))
+    elapsed = time.perf_counter() - start
+    return [sample for samples in results for sample in samples], elapsed
+
+
+def summarize(samples, elapsed, server=False, server_queries=None):
+    """
+    Statystyki fazy. W trybie --server zapytania SQL z /metrics
+    (server_queries - łącznie w fazie, None gdy nieznane).
+    """
+    count = len(samples)
+    if not count:
+        return {'requests': 0}
+    durations = sorted(seconds for seconds, _, _ in samples)
+
+    def percentile(p):
+        # najbliższa ranga
+        return durations[min(count - 1, max(0, round(p / 100 * count + 0.5) - 1))] * 1000
+
+    if not server:
+        queries = [sql for _, sql, _ in samples]
+        queries_mean, queries_max = round(sum(queries) / count, 2), max(queries)
+    else:
+        queries_mean = round(server_queries / count, 2) if server_queries is not None else None
+        queries_max = None
+
+    return {
+        'requests': count,
+        'errors': sum(1 for _, _, ok in samples if not ok),
+        'seconds': round(elapsed, 3),
+        'rps': round(count / elapsed, 1),
+        'mean_ms': round(sum(durations) / count * 1000, 2),
+        'p50_ms': round(percentile(50), 2),
+        'p90_ms': round(percentile(90), 2),
+        'p99_ms': round(percentile(99), 2),
+        'max_ms': round(durations[-1] * 1000, 2),
+        'queries_mean': queries_mean,
+        'queries_max': queries_max,
+    }
+
+
+def server_sql_queries(base_url, endpoint, method):
+    """app_sql_queries_total endpointu z /metrics serwera."""
+    metrics = urllib.request.Request(base_url + '/metrics',
+                                     headers={'Authorization': f'Bearer {os.environ["METRICS_TOKEN"]}'})
+    with urllib.request.urlopen(metrics, timeout=30) as response:
+        text = response.read().decode()
+    prefix = f'app_sql_queries_total{{endpoint="{endpoint}",method="{method}"}} '
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return int(float(line[len(prefix):]))
+    return 0
+
+
+def start_server(args, env):
+    port = args.port or _free_port()
+    if args.server == 'uvicorn':
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port),
+                   '--workers', str(args.workers), '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'run:app', 'run', '--port', str(port), '--with-threads']
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'Serwer zakończył się z kodem {process.returncode}')
+        try:
+            urllib.request.urlopen(base_url + '/login', timeout=2).close()
+            return process, base_url
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Serwer nie odpowiada')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results):
+    header = f'{"faza":<10} {"req":>6} {"błędy":>6} {"req/s":>8} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"max ms":>8} {"SQL/req":>8}'
+    print(header)
+    print('-' * len(header))
+    for name, stats in results.items():
+        if not stats['requests']:
+            print(f'{name:<10} {0:>6}')
+            continue
+        print(f'{name:<10} {stats["requests"]:>6} {stats["errors"]:>6} {stats["rps"]:>8} '
+              f'{stats["p50_ms"]:>8} {stats["p90_ms"]:>8} {stats["p99_ms"]:>8} {stats["max_ms"]:>8} '
+              f'{stats["queries_mean"] if stats["queries_mean"] is not None else "-":>8}')
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    workdir = None
+    if args.db:
+        db_path = os.path.abspath(args.db)
+        if args.fresh and os.path.exists(db_path):
+            os.remove(db_path)
+    else:
+        workdir = tempfile.TemporaryDirectory(prefix='benchmark-')
+        db_path = os.path.join(workdir.name, 'benchmark.db')
+
+    # konfiguracja przez środowisko - jak config.py, wspólna dla aplikacji i serwera
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f'sqlite:///{db_path}'
+    env.setdefault('SLOW_REQUEST_MS', '0')
+    # /metrics jest tylko z tokenem - w trybie --server czytamy z niego liczbę zapytań
+    env.setdefault('METRICS_TOKEN', secrets.token_hex(16))
+    env.update(item.split('=', 1) for item in args.set)
+    os.environ.update(env)
+
+    sys.path.insert(0, ROOT)
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import create_app, db
+    from app.models import Task, User
+    from benchmarks import dataset
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if db.session.scalar(db.select(User.id).limit(1)) is None:
+            print(f'Generowanie danych: {args.groups} grup, {args.tasks} zadań...')
+            start = time.perf_counter()
+            dataset.seed(groups=args.groups, tasks=args.tasks,
+                         max_tasks_per_group=args.max_tasks_per_group, seed=args.seed)
+            print(f'  gotowe w {time.perf_counter() - start:.1f} s')
+        else:
+            print(f'Używam istniejących danych z {db_path}')
+        stats = dataset.stats()
+        accounts = dataset.admin_groups(args.users, seed=args.seed)
+        task_ids = dataset.sample_task_ids({group_id for _, group_ids in accounts for group_id in group_ids})
+    print('Zbiór: ' + ', '.join(f'{key} {value}' for key, value in stats.items()))
+
+    server = None
+    if args.server:
+        server, base_url = start_server(args, env)
+        def make_client():
+            return HttpClient(base_url)
+    else:
+        base_url = None
+        def make_client():
+            return TestClient(app)
+        event.listen(Engine, 'before_cursor_execute', _count_query)
+
+    results = {}
+    try:
+        vus = [VirtualUser(number, email, group_ids, task_ids, make_client)
+               for number, (email, group_ids) in enumerate(accounts, 1)]
+        for vu in vus:
+            vu.log_in()
+
+        for name in args.scenarios:
+            if name == 'delete':
+                # id zadań dodanych w fazie create (po tytułach)
+                with app.app_context():
+                    for vu in vus:
+                        titles = [title for _, title in vu.created]
+                        vu.created = db.session.scalars(
+                            db.select(Task.id).where(Task.title.in_(titles))
+                        ).all() if titles else []
+            # metryki są per proces - przy kilku workerach nie zsumujemy ich tutaj
+            measured = server and args.workers == 1
+            if measured:
+                before = server_sql_queries(base_url, *SCENARIO_ENDPOINTS[name])
+            samples, elapsed = run_phase(name, vus, args)
+            queries = server_sql_queries(base_url, *SCENARIO_ENDPOINTS[name]) - before if measured else None
+            results[name] = summarize(samples, elapsed, bool(server), queries)
+            print(f'  {name}: {results[name]["requests"]} requestów w {elapsed:.1f} s')
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        else:
+            event.remove(Engine, 'before_cursor_execute', _count_query)
+
+    print()
+    print_table(results)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': args.server or 'test_client',
+            'args': {key: value for key, value in vars(args).items() if key != 'output'},
+            'dataset': stats,
+        },
+        'scenarios': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f'\nWyniki zapisane w {args.output}')
+
+    if workdir is not None:
+        workdir.cleanup()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Wyszukiwanie zadań: indeks pełnotekstowy (app.search) vs LIKE '%słowo%'.
+
+    python -m benchmarks.search --sizes 1000,10000,100000,1000000
+    python -m benchmarks.search --single-group --sizes 1000,10000,100000
+
+Dla każdego rozmiaru (łączna liczba zadań w bazie) osobna baza SQLite:
+przeszukiwana grupa ma --group-size zadań (kilka lat obowiązków),
+reszta zadań należy do innych grup tej samej wielkości.
+--single-group - wszystkie zadania w przeszukiwanej grupie (najgorszy
+przypadek: częste słowo ma tysiące trafień w grupie, które trzeba
+posortować, więc czas rośnie z rozmiarem grupy - dużo wolniej niż LIKE).
+
+Mierzymy medianę czasu pierwszej strony wyników:
+- rzadkie słowo (kilkanaście zadań w grupie)
+- częste słowo (co ~10. zadanie) - ranking sortuje wszystkie trafienia
+- prefiks ("odku" -> odkurzanie)
+- dwa słowa (częste + średnio częste)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ('pranie', 'prasowanie', 'zakupy', 'rachunki', 'obiad', 'kolacja', 'ogród', 'podlewanie',
+         'samochód', 'przegląd', 'szkoła', 'zebranie', 'lekarz', 'wizyta', 'apteka', 'paczka',
+         'poczta', 'basen', 'trening', 'urodziny', 'prezent', 'remont', 'malowanie', 'naprawa',
+         'kran', 'żarówka', 'pies', 'spacer', 'weterynarz', 'kot', 'kuweta', 'śmieci', 'segregacja',
+         'okna', 'mycie', 'łazienka', 'kuchnia', 'lodówka', 'rozmrażanie', 'piekarnik')
+COMMON = 'odkurzanie'
+RARE = 'zmywarka'
+
+QUERIES = {'rzadkie': RARE, 'częste': COMMON, 'prefiks': 'odku', 'dwa słowa': 'odkurzanie kuchnia'}
+
+
+def fill(db, Task, group_sizes, user_id, rnd, batch_size=10000):
+    """Zadania grup: {group_id: liczba}; rzadkie słowo tylko w pierwszej grupie."""
+    table = Task.__table__
+    connection = db.session.connection()
+    rows = []
+    for number, (group_id, size) in enumerate(group_sizes.items()):
+        rare_positions = set(rnd.sample(range(size), min(size, 15))) if number == 0 else ()
+        for i in range(size):
+            words = rnd.sample(WORDS, 3)
+            if i % 10 == 0:
+                words.append(COMMON)
+            if i in rare_positions:
+                words.append(RARE)
+            rows.append({
+                'group_id': group_id, 'created_by_id': user_id, 'is_completed': rnd.random() < 0.5,
+                'title': ' '.join(words[:2]).capitalize(), 'description': ' '.join(words[2:]),
+            })
+            if len(rows) == batch_size:
+                connection.execute(table.insert(), rows)
+                rows = []
+    if rows:
+        connection.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def measure(run, repeat):
+    run()  # rozgrzewka (cache stron SQLite)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(times), 3)
+
+
+def bench_size(size, group_size, repeat, seed):
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-search-')
+    from config import Config
+    from app import create_app, db
+    from app.models import User, FamilyGroup, Task
+    from app.search import search_terms, search_tasks_select
+
+    class SearchBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(workdir.name, "search.db")}'
+        SLOW_REQUEST_MS = 0
+
+    app = create_app(SearchBenchConfig)
+    with app.app_context():
+        db.create_all()
+        # przeszukiwana grupa + kolejne grupy po group_size zadań
+        sizes = [min(size, group_size)]
+        while sum(sizes) < size:
+            sizes.append(min(group_size, size - sum(sizes)))
+        user = User(email='bench@example.com', password='-')
+        groups = [FamilyGroup(name=f'Rodzina {i}') for i in range(len(sizes))]
+        db.session.add_all([user, *groups])
+        db.session.commit()
+        group = groups[0]
+
+        start = time.perf_counter()
+        fill(db, Task, {g.id: n for g, n in zip(groups, sizes)}, user.id, random.Random(seed))
+        fill_seconds = time.perf_counter() - start
+
+        result = {'tasks_total': size, 'tasks_in_group': sizes[0], 'groups': len(sizes),
+                  'fill_seconds': round(fill_seconds, 1)}
+        for label, text in QUERIES.items():
+            terms = search_terms(text)
+            for method, dialect in (('fts', 'sqlite'), ('like', 'default')):
+                statement = search_tasks_select(group.id, terms, per_page=20, dialect=dialect)
+
+                def run():
+                    return db.session.scalars(statement).unique().all()
+                found = len(run())
+                result[f'{label}_{method}_ms'] = measure(run, repeat)
+                result[f'{label}_{method}_found'] = found
+        db.session.remove()
+        db.engine.dispose()
+    workdir.cleanup()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Wyszukiwanie zadań: FTS vs LIKE.')
+    parser.add_argument('--sizes', default='1000,10000,100000,1000000', help='łączne liczby zadań, po przecinku')
+    parser.add_argument('--group-size', type=int, default=10000, help='zadania w przeszukiwanej grupie')
+    parser.add_argument('--single-group', action='store_true', help='wszystkie zadania w jednej grupie')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    results = []
+    header = f'{"zadania":>9}' + ''.join(f' {label + " fts":>12} {label + " like":>12}' for label in QUERIES)
+    print(header + '   (mediana ms, pierwsza strona)')
+    for size in (int(value) for value in args.sizes.split(',')):
+        result = bench_size(size, size if args.single_group else args.group_size, args.repeat, args.seed)
+        results.append(result)
+        print(f'{size:>9}' + ''.join(
+            f' {result[label + "_fts_ms"]:>12} {result[label + "_like_ms"]:>12}' for label in QUERIES
+        ))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'repeat': args.repeat, 'single_group': args.single_group, 'results': results}, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
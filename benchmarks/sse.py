@@ -0,0 +1,351 @@
+"""
+Obciążenie strumieni zdarzeń SSE (app.events) - sam broker i strumienie
+przez HTTP.
+
+    python -m benchmarks.sse --subscribers 1000 --events 50
+    python -m benchmarks.sse --parts http --streams 8 32 128 256 --max-streams 0
+    python -m benchmarks.sse --parts broker --output sse.json
+
+broker - każdy słuchacz to generator Events.stream() czytany w osobnym
+wątku (jak jeden otwarty strumień SSE w workerze). Mierzymy czas od
+publish() do odebrania zdarzenia przez słuchacza oraz liczbę rozłączeń
+(resync) z powodu przepełnionej kolejki. Bez bazy - sam broker w pustej
+aplikacji Flask (stan Events należy do aplikacji).
+
+http - cała aplikacja na serwerze wątkowym werkzeug w tym procesie (jak
+`flask run --with-threads`, wątek na połączenie), baza SQLite w katalogu
+tymczasowym z jedną grupą. Dla każdej liczby z --streams klient otwiera
+tyle strumieni GET /api/v1/groups/<id>/events (gniazda czytane w jednym
+wątku przez selectors - wątki i pamięć procesu to koszt serwera), potem:
+
+- zwykłe requesty - --requests x GET /api/v1/groups/<id> przy otwartych,
+  bezczynnych strumieniach (p50, p99)
+- zdarzenia - lokalny wydawca w procesie (events.publish) wysyła --events
+  zdarzeń, mierzymy czas do odebrania przez wszystkie strumienie
+- koszt strumienia - przyrost wątków i pamięci (VmRSS) procesu na strumień
+
+Strumienie ponad EVENTS_MAX_STREAMS (--max-streams, domyślnie z Config)
+dostają 503 - liczymy je osobno. Gunicorn gevent i uvicorn: benchmarks.asgi.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import selectors
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from flask import Flask
+from benchmarks import BENCH_PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GROUP_ID = 1
+
+ADMIN_EMAIL = 'strumienie@example.com'
+
+
+def listen(stream, expected, delays, resyncs, lock):
+    received = 0
+    for chunk in stream:
+        if chunk.startswith('event: resync') or '\nevent: resync' in chunk:
+            with lock:
+                resyncs.append(1)
+            return
+        if 'event: bench' not in chunk:
+            continue
+        data = json.loads(chunk.split('data: ', 1)[1])
+        delay = time.perf_counter() - data['sent']
+        with lock:
+            delays.append(delay)
+        received += 1
+        if received == expected:
+            return
+
+
+def percentile(values, p):
+    return round(values[min(len(values) - 1, int(p / 100 * len(values)))] * 1000, 2) if values else None
+
+
+def bench_broker(args):
+    from app import db
+    from app.events import Events, LocalBroker
+
+    app = Flask(__name__)
+    app.config.update(EVENTS_BACKEND=LocalBroker(queue_size=args.queue_size),
+                      EVENTS_KEEPALIVE=60, EVENTS_STREAM_TIMEOUT=600)
+    events = Events(app, db)
+    context = app.app_context()
+    context.push()
+
+    delays, resyncs, lock = [], [], threading.Lock()
+    threads = []
+    for _ in range(args.subscribers):
+        stream = events.stream(GROUP_ID, 0)
+        # nagłówek i "hello" - potem generator jest zapisany w brokerze
+        next(stream), next(stream)
+        thread = threading.Thread(target=listen, args=(stream, args.events, delays, resyncs, lock), daemon=True)
+        thread.start()
+        threads.append(thread)
+
+    start = time.perf_counter()
+    for version in range(1, args.events + 1):
+        events.publish({'type': 'bench', 'group_id': GROUP_ID, 'version': version, 'sent': time.perf_counter()})
+        time.sleep(args.interval)
+    for thread in threads:
+        thread.join(timeout=30)
+    elapsed = time.perf_counter() - start
+    context.pop()
+
+    delays.sort()
+    return {
+        'subscribers': args.subscribers,
+        'events': args.events,
+        'delivered': len(delays),
+        'expected': args.subscribers * args.events,
+        'resyncs': len(resyncs),
+        'seconds': round(elapsed, 3),
+        'p50_ms': percentile(delays, 50),
+        'p90_ms': percentile(delays, 90),
+        'p99_ms': percentile(delays, 99),
+        'max_ms': round(delays[-1] * 1000, 2) if delays else None,
+    }
+
+
+def rss_kb():
+    """Pamięć procesu (VmRSS, KB) - None poza Linuksem."""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+
+def open_stream(port, path, cookie):
+    """Gniazdo z otwartym strumieniem - (gniazdo, status, odebrana reszta). HTTP/1.0 - bez chunked."""
+    sock = socket.create_connection(('127.0.0.1', port), timeout=10)
+    sock.sendall(f'GET {path} HTTP/1.0\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+                 'Accept: text/event-stream\r\n\r\n'.encode())
+    head = b''
+    while b'\r\n\r\n' not in head:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        head += chunk
+    status = int(head.split(b' ', 2)[1])
+    if status != 200:
+        sock.close()
+        return None, status, b''
+    sock.setblocking(False)
+    return sock, status, head.split(b'\r\n\r\n', 1)[1]
+
+
+def read_events(sockets, expected, timeout):
+    """Czytaj strumienie do expected zdarzeń "bench" na każdym - lista opóźnień (s)."""
+    selector = selectors.DefaultSelector()
+    buffers, counts, delays = {}, {}, []
+    for sock, rest in sockets:
+        selector.register(sock, selectors.EVENT_READ)
+        buffers[sock], counts[sock] = rest, 0
+    deadline = time.monotonic() + timeout
+    waiting = len(sockets)
+    while waiting and time.monotonic() < deadline:
+        for key, _ in selector.select(timeout=0.5):
+            sock = key.fileobj
+            try:
+                data = sock.recv(65536)
+            except BlockingIOError:
+                continue
+            received = time.perf_counter()
+            lines = (buffers[sock] + data).split(b'\n')
+            buffers[sock] = lines.pop()
+            for line in lines:
+                if not line.startswith(b'data: '):
+                    continue
+                message = json.loads(line[6:])
+                if message.get('type') == 'bench':
+                    delays.append(received - message['sent'])
+                    counts[sock] += 1
+                    if counts[sock] == expected:
+                        waiting -= 1
+            if not data:
+                selector.unregister(sock)
+                waiting -= counts[sock] < expected
+    selector.close()
+    return delays
+
+
+def make_app(database_uri, max_streams):
+    from config import Config
+    from app import create_app
+
+    class SseBenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        METRICS_ENABLED = False
+        SLOW_REQUEST_MS = 0
+        # ping co sekundę - serwer szybko zwalnia wątki zamkniętych strumieni
+        EVENTS_KEEPALIVE = 1
+        EVENTS_QUEUE_SIZE = 1000
+    if max_streams is not None:
+        SseBenchConfig.EVENTS_MAX_STREAMS = max_streams
+    app = create_app(SseBenchConfig)
+    # logi requestów werkzeug przy setkach połączeń tylko przeszkadzają
+    import logging
+    logging.getLogger('werkzeug').disabled = True
+    return app
+
+
+def bench_http(args):
+    from werkzeug.serving import make_server
+    from app import db, events, passwords, services
+    from app.models import User, FamilyGroup
+
+    workdir = tempfile.TemporaryDirectory(prefix='benchmark-sse-')
+    app = make_app(f'sqlite:///{os.path.join(workdir.name, "sse.db")}', args.max_streams)
+    with app.app_context():
+        db.create_all()
+        admin = User(email=ADMIN_EMAIL, password=passwords.hash(BENCH_PASSWORD))
+        group = FamilyGroup(name='Rodzina')
+        db.session.add_all([admin, group])
+        db.session.flush()
+        services.add_member(group, admin, role='admin')
+        db.session.commit()
+        group_id = group.id
+        db.session.remove()
+        max_streams = events.state.max_streams
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    def get(path, cookie='', body=None):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        headers = {'Cookie': cookie}
+        if body is not None:
+            headers['Content-Type'] = 'application/json'
+        connection.request('POST' if body else 'GET', path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        connection.close()
+        return response
+
+    response = get('/api/v1/auth/login', body=json.dumps({'email': ADMIN_EMAIL, 'password': BENCH_PASSWORD}))
+    assert response.status == 200, response.status
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+    # rozgrzewka
+    for _ in range(10):
+        assert get(f'/api/v1/groups/{group_id}', cookie).status == 200
+
+    levels = []
+    version = 0
+    for count in args.streams:
+        threads_before, rss_before = threading.active_count(), rss_kb()
+        sockets, rejected = [], 0
+        for _ in range(count):
+            sock, status, rest = open_stream(port, f'/api/v1/groups/{group_id}/events', cookie)
+            if sock is None:
+                assert status == 503, status
+                rejected += 1
+            else:
+                sockets.append((sock, rest))
+        time.sleep(0.5)
+        threads, rss = threading.active_count() - threads_before, rss_kb()
+
+        durations = []
+        for _ in range(args.requests):
+            started = time.perf_counter()
+            assert get(f'/api/v1/groups/{group_id}', cookie).status == 200
+            durations.append(time.perf_counter() - started)
+        durations.sort()
+
+        reader = {}
+        thread = threading.Thread(target=lambda: reader.update(
+            delays=read_events(sockets, args.events, args.timeout)))
+        thread.start()
+        start = time.perf_counter()
+        with app.app_context():
+            for _ in range(args.events):
+                version += 1
+                events.publish({'type': 'bench', 'group_id': group_id, 'version': version,
+                                'sent': time.perf_counter()})
+                time.sleep(args.interval)
+        thread.join()
+        delays = sorted(reader['delays'])
+
+        for sock, _ in sockets:
+            sock.close()
+        with app.app_context():
+            deadline = time.monotonic() + 10
+            while events.state.open_streams and time.monotonic() < deadline:
+                time.sleep(0.1)
+
+        opened = len(sockets)
+        levels.append({
+            'streams': count,
+            'opened': opened,
+            'rejected': rejected,
+            'threads_per_stream': round(threads / opened, 2) if opened else None,
+            'rss_kb_per_stream': round((rss - rss_before) / opened) if opened and rss else None,
+            'request_p50_ms': round(statistics.median(durations) * 1000, 2),
+            'request_p99_ms': percentile(durations, 99),
+            'delivered': len(delays),
+            'expected': opened * args.events,
+            'event_p50_ms': percentile(delays, 50),
+            'event_p99_ms': percentile(delays, 99),
+            'seconds': round(time.perf_counter() - start, 2),
+        })
+
+    server.shutdown()
+    with app.app_context():
+        db.engine.dispose()
+    workdir.cleanup()
+    return {'max_streams': max_streams, 'levels': levels}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Obciążenie strumieni zdarzeń SSE.')
+    parser.add_argument('--parts', nargs='+', choices=('broker', 'http'), default=['broker', 'http'])
+    parser.add_argument('--subscribers', type=int, default=1000, help='słuchaczy brokera (broker)')
+    parser.add_argument('--streams', type=int, nargs='+', default=[8, 32, 128],
+                        help='liczby otwartych strumieni HTTP (http)')
+    parser.add_argument('--max-streams', type=int, help='EVENTS_MAX_STREAMS (0 - bez limitu; http)')
+    parser.add_argument('--requests', type=int, default=200, help='zwykłych requestów na poziom (http)')
+    parser.add_argument('--events', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=0.01, help='sekundy między zdarzeniami')
+    parser.add_argument('--queue-size', type=int, default=100)
+    parser.add_argument('--timeout', type=float, default=60, help='ile czekać na zdarzenia (s, http)')
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, ROOT)
+    result = {'args': vars(args)}
+    if 'broker' in args.parts:
+        result['broker'] = bench_broker(args)
+        print(json.dumps(result['broker'], indent=2))
+    if 'http' in args.parts:
+        result['http'] = bench_http(args)
+        print(f'EVENTS_MAX_STREAMS = {result["http"]["max_streams"]}')
+        header = (f'{"strumienie":>10} {"503":>5} {"wątki/str.":>10} {"KB/str.":>8} {"req p50":>8} '
+                  f'{"req p99":>8} {"zdarz. p50":>10} {"zdarz. p99":>10} {"dostarczone":>12}')
+        print(header)
+        print('-' * len(header))
+        for level in result['http']['levels']:
+            print(f'{level["streams"]:>10} {level["rejected"]:>5} {str(level["threads_per_stream"]):>10} '
+                  f'{str(level["rss_kb_per_stream"]):>8} {level["request_p50_ms"]:>8} '
+                  f'{level["request_p99_ms"]:>8} {str(level["event_p50_ms"]):>10} '
+                  f'{str(level["event_p99_ms"]):>10} {level["delivered"]:>6}/{level["expected"]:<5}')
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
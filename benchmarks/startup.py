@@ -0,0 +1,86 @@
+"""
+Czas startu aplikacji: import + create_app + pierwszy request.
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --runs 10 --output startup.json
+
+Każdy pomiar to świeży proces Pythona (jak nowy worker gunicorna albo
+test w CI): import pakietu app, create_app() i pierwszy GET / (strona
+dla niezalogowanych) oraz GET /auth/login (formularz). Do wyniku trafia
+mediana i maksimum każdego etapu oraz to, czy proces załadował narzędzia
+migracji (flask_migrate/alembic) - poza `flask db` nie powinien.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# kod mierzony w procesie potomnym - wynik jako JSON na stdout
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+client = app.test_client()
+status = client.get('/').status_code
+first = time.perf_counter()
+client.get('/auth/login')
+second = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (first - created) * 1000,
+    'second_route_ms': (second - first) * 1000,
+    'total_ms': (second - start) * 1000,
+    'status': status,
+    'migrate_loaded': 'flask_migrate' in sys.modules or 'alembic' in sys.modules,
+}))
+'''
+
+STAGES = ('import_ms', 'create_app_ms', 'first_request_ms', 'second_route_ms', 'total_ms')
+
+
+def run_once(env):
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Czas startu aplikacji (import, create_app, pierwszy request).')
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--output', help='plik JSON z wynikami')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark-startup-') as workdir:
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{os.path.join(workdir, "startup.db")}')
+        # rozgrzewka - pliki .pyc i cache systemu plików jak na działającym serwerze
+        run_once(env)
+        runs = [run_once(env) for _ in range(args.runs)]
+
+    result = {'runs': args.runs}
+    for stage in STAGES:
+        values = [run[stage] for run in runs]
+        result[stage] = {'median': round(statistics.median(values), 1), 'max': round(max(values), 1)}
+    result['status'] = sorted({run['status'] for run in runs})
+    result['migrate_loaded'] = any(run['migrate_loaded'] for run in runs)
+
+    for stage in STAGES:
+        print(f'{stage}: mediana {result[stage]["median"]} ms, max {result[stage]["max"]} ms')
+    print(f'flask_migrate/alembic załadowane: {"tak" if result["migrate_loaded"] else "nie"}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Konfiguracja aplikacji.
+
+Wartości czytane ze zmiennych środowiskowych (lub pliku .env),
+z bezpiecznymi domyślnymi dla developmentu.
+create_app() przyjmuje klasę konfiguracji - testy i benchmarki mogą
+podać własną (dziedziczącą po Config).
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Załaduj zmienne środowiskowe z pliku .env
+# WAŻNE .env w .gitignore - wrażliwe dane
+load_dotenv()
+
+
+class Config:
+    # Konfiguracja SECRET_KEY ze zmiennych środowiskowych
+    # w produkcyjnej aplikacji zmienić!
+    SECRET_KEY = os.environ.get('SECRET_KEY') or 'klucz-zastepczy-zmienic-w-produkcji'
+
+    # Konfiguracja bazy danych - domyślnie SQLite dla prostoty
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///site.db'
+
+    # Wyłącz tracking modyfikacji - oszczędza pamięć i nie jest używany
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pula połączeń (Postgres/MySQL, SQLite w pliku) - patrz app.engine
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+    # SQLite: WAL + busy timeout (ms) zamiast "database is locked" przy równoległych zapisach
+    SQLITE_WAL = os.environ.get('SQLITE_WAL', '1') == '1'
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT') or 5000)
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', '1') == '1'
+
+    # Ile zadań pokazujemy na jednej stronie listy zadań
+    TASKS_PER_PAGE = int(os.environ.get('TASKS_PER_PAGE') or 50)
+
+    # Ile wyników wyszukiwania zadań na stronie
+    SEARCH_PER_PAGE = int(os.environ.get('SEARCH_PER_PAGE') or 20)
+
+    # Maksymalna liczba zadań w jednej operacji zbiorczej (bulk)
+    BULK_MAX_TASKS = int(os.environ.get('BULK_MAX_TASKS') or 1000)
+
+    # Cache ról w grupach (user_id, group_id) -> (rola, wersja grupy), współdzielony między requestami
+    # Wpis jest sprawdzany z wersją grupy w bazie, więc zmiana członkostwa w innym
+    # workerze działa od razu - TTL ogranicza tylko czas trzymania wpisu w pamięci
+    # MEMBERSHIP_CACHE_ENABLED=0 wyłącza cache
+    MEMBERSHIP_CACHE_ENABLED = os.environ.get('MEMBERSHIP_CACHE_ENABLED', '1') == '1'
+    MEMBERSHIP_CACHE_SIZE = int(os.environ.get('MEMBERSHIP_CACHE_SIZE') or 10000)
+    MEMBERSHIP_CACHE_TTL = int(os.environ.get('MEMBERSHIP_CACHE_TTL') or 300)
+
+    # Cache lekkiej tożsamości użytkownika dla Flask-Login (id, email) - bez SELECT na każdy request
+    IDENTITY_CACHE_ENABLED = os.environ.get('IDENTITY_CACHE_ENABLED', '1') == '1'
+    IDENTITY_CACHE_SIZE = int(os.environ.get('IDENTITY_CACHE_SIZE') or 10000)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 60)
+
+    # Cache wyrenderowanych fragmentów (lista zadań, lista członków).
+    # Klucz zawiera wersję grupy, więc każda zmiana daje nowy klucz - stare wpisy wypadają z LRU/TTL
+    FRAGMENT_CACHE_ENABLED = os.environ.get('FRAGMENT_CACHE_ENABLED', '1') == '1'
+    FRAGMENT_CACHE_SIZE = int(os.environ.get('FRAGMENT_CACHE_SIZE') or 2000)
+    FRAGMENT_CACHE_TTL = int(os.environ.get('FRAGMENT_CACHE_TTL') or 600)
+
+    # Metryki requestów (GET /metrics, format Prometheusa) i log wolnych requestów.
+    # METRICS_TOKEN - /metrics wymaga "Authorization: Bearer <token>"; bez tokenu nie ma /metrics
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+    SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS') or 500)
+
+    # Detektor N+1 (app.nplusone): puste = włączony w debug/testach, w testach rzuca wyjątek
+    NPLUSONE_ENABLED = {'1': True, '0': False}.get(os.environ.get('NPLUSONE_ENABLED', ''))
+    NPLUSONE_THRESHOLD = int(os.environ.get('NPLUSONE_THRESHOLD') or 5)
+    NPLUSONE_RAISE = {'1': True, '0': False}.get(os.environ.get('NPLUSONE_RAISE', ''))
+
+    # Widoki tylko do odczytu w wersji async (app.async_views) - ASYNC_VIEWS=1.
+    # ASYNC_DATABASE_URI - puste = ta sama baza co SQLALCHEMY_DATABASE_URI ze sterownikiem async
+    ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URI') or None
+    # Wątki na zwykłe requesty pod uvicorn (asgi.py, app.serving); strumienie SSE mają osobną pulę
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS') or 32)
+
+    # Zdarzenia zmian w grupach (SSE, /api/v1/groups/<id>/events)
+    EVENTS_ENABLED = os.environ.get('EVENTS_ENABLED', '1') == '1'
+    EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE') or 100)
+    EVENTS_KEEPALIVE = int(os.environ.get('EVENTS_KEEPALIVE') or 15)
+    EVENTS_STREAM_TIMEOUT = int(os.environ.get('EVENTS_STREAM_TIMEOUT') or 300)
+    # Limit otwartych strumieni w procesie - ponad limit 503. Strumień trzyma wątek
+    # (serwer wątkowy, osobna pula ASGI) albo greenlet (gunicorn -k gevent - tam
+    # gunicorn.conf.py liczy limit z worker_connections). 128 wg benchmarks.sse
+    # (http, 1 rdzeń): bezczynny strumień to wątek i ~40 KB, zwykłe requesty bez zmian
+    # przy 256 strumieniach, ale zdarzenie dochodzi do wszystkich w p99 ~35 ms przy 128
+    # i ~150 ms przy 256 (rozsyłanie po wątkach)
+    EVENTS_MAX_STREAMS = int(os.environ.get('EVENTS_MAX_STREAMS') or 128)
+
+    # Hashowanie haseł - metoda werkzeug i opcjonalna pula (''/'thread'/'process')
+    # zmiana metody = stare hashe przeliczane przy następnym logowaniu
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt'
+    PASSWORD_HASH_POOL = os.environ.get('PASSWORD_HASH_POOL') or ''
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+
+    # Zadania w tle (app.jobs): 'thread' - pula wątków w procesie, 'database' - kolejka
+    # w tabeli job i osobny `flask jobs-worker`, 'inline' - od razu po commit
+    JOBS_BACKEND = os.environ.get('JOBS_BACKEND') or 'thread'
+    JOBS_WORKERS = int(os.environ.get('JOBS_WORKERS') or 2)
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS') or 5)
+    JOBS_RETRY_DELAY = float(os.environ.get('JOBS_RETRY_DELAY') or 10)
+    JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL') or 1)
+    JOBS_LEASE = int(os.environ.get('JOBS_LEASE') or 300)
+
+    # Archiwizacja zrobionych zadań (`flask archive-tasks`, app.archive) - po ilu dniach od zrobienia
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS') or 90)
+
+    # Historia zmian w grupach (app.audit) - ile ostatnich miesięcy trzyma `flask audit-prune`
+    AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS') or 12)
+    # Ile wpisów historii na stronie
+    AUDIT_PER_PAGE = int(os.environ.get('AUDIT_PER_PAGE') or 50)
@@ -0,0 +1,30 @@
+"""
+Konfiguracja gunicorna (produkcja):
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Workery gevent: otwarty strumień SSE (/api/v1/groups/<id>/events) to
+greenlet czekający na kolejkę brokera, nie wątek - jeden proces trzyma
+setki strumieni i dalej obsługuje zwykłe requesty. Gunicorn robi
+monkey-patching przy starcie workera, przed importem aplikacji
+(bez preload_app).
+
+Domyślnie jeden worker - broker zdarzeń działa w pamięci procesu
+(LocalBroker), więc przy kilku workerach słuchacz widziałby tylko zmiany
+ze swojego procesu. Więcej workerów (GUNICORN_WORKERS) tylko ze wspólnym
+brokerem (EVENTS_BACKEND).
+"""
+
+import os
+
+bind = os.environ.get('GUNICORN_BIND') or '0.0.0.0:8000'
+workers = int(os.environ.get('GUNICORN_WORKERS') or 1)
+worker_class = 'gevent'
+# jednoczesnych połączeń (greenletów) na worker
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 1000)
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# strumienie SSE do 3/4 połączeń workera - reszta zostaje dla zwykłych requestów
+os.environ.setdefault('EVENTS_MAX_STREAMS', str(worker_connections * 3 // 4))
@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -45,6 +46,24 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Tabele zakładane przez aplikację poza modelami - autogenerate i `flask db check`
+# nie mogą ich traktować jak tabel do usunięcia:
+# - task_fts i jej tabele pomocnicze FTS5 (app.search)
+# - audit_RRRRMM (SQLite), audit_event i partycje audit_event_RRRRMM (PostgreSQL) - app.audit
+UNMANAGED_TABLES = re.compile(r'^(task_fts(_\w+)?|audit_\d{6}|audit_event(_\d{6})?)$')
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table':
+        table_name = name
+    elif type_ in ('index', 'unique_constraint', 'column', 'foreign_key_constraint'):
+        table_name = object.table.name
+    else:
+        return True
+    # tylko obiekty obecne w bazie, a nieobecne w modelach
+    return not (reflected and UNMANAGED_TABLES.match(table_name))
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +84,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,10 +113,19 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # batch mode w SQLite przebudowuje tabele (DROP + CREATE) - z włączonymi
+        # kluczami obcymi usunięcie tabeli, na którą wskazują inne, się nie uda
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            # zakończ transakcję rozpoczętą przez exec_driver_sql,
+            # inaczej alembic nie zacommituje migracji
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
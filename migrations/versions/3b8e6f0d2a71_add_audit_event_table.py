@@ -0,0 +1,54 @@
+"""Add audit event table (group history)
+
+Revision ID: 3b8e6f0d2a71
+Revises: a1d7e4c9b258
+Create Date: 2026-10-18 23:02:41.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e6f0d2a71'
+down_revision = 'a1d7e4c9b258'
+branch_labels = None
+depends_on = None
+
+
+# PostgreSQL: tabela nadrzędna z partycjami miesięcznymi (app.audit.POSTGRES_DDL).
+# SQLite: tabele audit_RRRRMM zakłada aplikacja przy pierwszym wpisie w miesiącu.
+POSTGRES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS audit_event (
+        id BIGSERIAL,
+        created_at TIMESTAMP NOT NULL,
+        group_id INTEGER NOT NULL,
+        code SMALLINT NOT NULL,
+        actor_id INTEGER,
+        task_id INTEGER,
+        user_id INTEGER,
+        data TEXT,
+        PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at)
+    """,
+    'CREATE INDEX IF NOT EXISTS ix_audit_event_group_id ON audit_event (group_id, id)',
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        # razem z partycjami
+        op.execute('DROP TABLE IF EXISTS audit_event')
+    elif bind.dialect.name == 'sqlite':
+        names = bind.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'audit_[0-9]*'"
+        ).scalars().all()
+        for name in names:
+            op.execute(f'DROP TABLE IF EXISTS {name}')
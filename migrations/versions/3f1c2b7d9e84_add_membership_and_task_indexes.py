@@ -0,0 +1,44 @@
+"""Add membership and task indexes
+
+Revision ID: 3f1c2b7d9e84
+Revises: 9694ed50d5be
+Create Date: 2026-10-18 10:12:31.104512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2b7d9e84'
+down_revision = '9694ed50d5be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # usuń ewentualne zduplikowane członkostwa (zostaje najstarsze),
+    # inaczej unique constraint się nie utworzy
+    op.execute(
+        'DELETE FROM group_member WHERE id NOT IN '
+        '(SELECT MIN(id) FROM group_member GROUP BY user_id, group_id)'
+    )
+
+    # batch mode - SQLite nie obsługuje ALTER TABLE ADD CONSTRAINT
+    with op.batch_alter_table('group_member', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_group_member_user_group', ['user_id', 'group_id'])
+        batch_op.create_index('ix_group_member_group_role', ['group_id', 'role'], unique=False)
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.create_index('ix_task_group_completed_created', ['group_id', 'is_completed', 'created_at'], unique=False)
+        batch_op.create_index('ix_task_assigned_to_id', ['assigned_to_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_assigned_to_id')
+        batch_op.drop_index('ix_task_group_completed_created')
+
+    with op.batch_alter_table('group_member', schema=None) as batch_op:
+        batch_op.drop_index('ix_group_member_group_role')
+        batch_op.drop_constraint('uq_group_member_user_group', type_='unique')
@@ -0,0 +1,99 @@
+"""Add task completed_at and task_archive table
+
+Revision ID: 7c4f2a9e6d15
+Revises: 3b8e6f0d2a71
+Create Date: 2026-10-19 00:12:37.640213
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4f2a9e6d15'
+down_revision = '3b8e6f0d2a71'
+branch_labels = None
+depends_on = None
+
+
+# triggery wyszukiwania (jak e5b9d1f3a7c2 / app.search.SQLITE_DDL) - przebudowa
+# tabeli task w SQLite usuwa je razem ze starą tabelą
+SQLITE_SEARCH_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts (rowid, title, description, grp)
+        VALUES (new.id, new.title, coalesce(new.description, ''), 'g' || new.group_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN
+        DELETE FROM task_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF title, description, group_id ON task BEGIN
+        UPDATE task_fts SET title = new.title, description = coalesce(new.description, ''),
+                            grp = 'g' || new.group_id
+        WHERE rowid = old.id;
+    END
+    """,
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        # AUTOINCREMENT wymaga przebudowy tabeli; indeks częściowy zakładamy
+        # od nowa (odbicie schematu w batch mogłoby zgubić WHERE)
+        op.drop_index('ix_task_recurrence_due', table_name='task')
+        with op.batch_alter_table('task', schema=None, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+            batch_op.create_index('ix_task_completed_at', ['completed_at'], unique=False)
+        op.create_index('ix_task_recurrence_due', 'task', ['due_at'], unique=False,
+                        sqlite_where=sa.text('recurrence IS NOT NULL'))
+        for statement in SQLITE_SEARCH_TRIGGERS:
+            op.execute(statement)
+    else:
+        with op.batch_alter_table('task', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+            batch_op.create_index('ix_task_completed_at', ['completed_at'], unique=False)
+
+    # nie wiemy, kiedy zrobiono istniejące zadania - liczymy od migracji,
+    # więc archiwizacja ruszy je dopiero po ARCHIVE_AFTER_DAYS dniach
+    op.execute('UPDATE task SET completed_at = CURRENT_TIMESTAMP WHERE is_completed AND completed_at IS NULL')
+
+    op.create_table('task_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+    sa.Column('created_by_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('due_at', sa.DateTime(), nullable=True),
+    sa.Column('recurrence', sa.String(length=20), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['assigned_to_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['created_by_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['group_id'], ['family_group.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_task_archive_group_created', ['group_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('task_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_archive_group_created')
+
+    op.drop_table('task_archive')
+
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_completed_at')
+
+    # natywne DROP COLUMN (SQLite >= 3.35) - bez kolejnej przebudowy tabeli
+    # task; AUTOINCREMENT zostaje (nie przeszkadza starszym wersjom)
+    op.drop_column('task', 'completed_at')
@@ -0,0 +1,39 @@
+"""Add task due_at and recurrence
+
+Revision ID: a1d7e4c9b258
+Revises: f6c2e8a4b913
+Create Date: 2026-10-18 21:37:05.862914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1d7e4c9b258'
+down_revision = 'f6c2e8a4b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # samo ADD COLUMN / CREATE INDEX - batch nie przebudowuje tabeli task,
+    # więc triggery wyszukiwania (e5b9d1f3a7c2) zostają
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('recurrence', sa.String(length=20), nullable=True))
+        batch_op.create_index('ix_task_group_completed_due', ['group_id', 'is_completed', 'due_at'], unique=False)
+        batch_op.create_index('ix_task_recurrence_due', ['due_at'], unique=False,
+                              sqlite_where=sa.text('recurrence IS NOT NULL'),
+                              postgresql_where=sa.text('recurrence IS NOT NULL'))
+
+
+def downgrade():
+    with op.batch_alter_table('task', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_recurrence_due')
+        batch_op.drop_index('ix_task_group_completed_due')
+
+    # natywne DROP COLUMN (SQLite >= 3.35) - batch przebudowałby tabelę task
+    # i zgubił triggery wyszukiwania
+    op.drop_column('task', 'recurrence')
+    op.drop_column('task', 'due_at')
@@ -0,0 +1,33 @@
+"""Widen user password column
+
+Revision ID: b7e4a9d2c615
+Revises: 3f1c2b7d9e84
+Create Date: 2026-10-18 13:02:47.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4a9d2c615'
+down_revision = '3f1c2b7d9e84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # hash scrypt (domyślna metoda werkzeug) ma ok. 160 znaków
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=False)
@@ -0,0 +1,28 @@
+"""Add FamilyGroup version and last_activity_at
+
+Revision ID: c2d8f5a1e937
+Revises: b7e4a9d2c615
+Create Date: 2026-10-18 14:21:05.330871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d8f5a1e937'
+down_revision = 'b7e4a9d2c615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('family_group', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('family_group', schema=None) as batch_op:
+        batch_op.drop_column('last_activity_at')
+        batch_op.drop_column('version')
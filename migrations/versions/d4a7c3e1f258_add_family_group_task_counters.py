@@ -0,0 +1,37 @@
+"""Add FamilyGroup task counters
+
+Revision ID: d4a7c3e1f258
+Revises: c2d8f5a1e937
+Create Date: 2026-10-18 16:02:47.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c3e1f258'
+down_revision = 'c2d8f5a1e937'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('family_group', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('open_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('completed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # liczniki dla istniejących zadań
+    op.execute("""
+        UPDATE family_group SET
+            open_count = (SELECT COUNT(*) FROM task
+                          WHERE task.group_id = family_group.id AND task.is_completed = false),
+            completed_count = (SELECT COUNT(*) FROM task
+                               WHERE task.group_id = family_group.id AND task.is_completed = true)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('family_group', schema=None) as batch_op:
+        batch_op.drop_column('completed_count')
+        batch_op.drop_column('open_count')
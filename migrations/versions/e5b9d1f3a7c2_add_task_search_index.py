@@ -0,0 +1,70 @@
+"""Add full-text search index for tasks
+
+Revision ID: e5b9d1f3a7c2
+Revises: d4a7c3e1f258
+Create Date: 2026-10-18 18:41:09.532817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9d1f3a7c2'
+down_revision = 'd4a7c3e1f258'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        # FTS5 + triggery na tabeli task (jak app.search.SQLITE_DDL)
+        op.execute("""
+            CREATE VIRTUAL TABLE task_fts USING fts5(
+                title, description, grp,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '3 4 5'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN
+                INSERT INTO task_fts (rowid, title, description, grp)
+                VALUES (new.id, new.title, coalesce(new.description, ''), 'g' || new.group_id);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN
+                DELETE FROM task_fts WHERE rowid = old.id;
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER task_fts_update AFTER UPDATE OF title, description, group_id ON task BEGIN
+                UPDATE task_fts SET title = new.title, description = coalesce(new.description, ''),
+                                    grp = 'g' || new.group_id
+                WHERE rowid = old.id;
+            END
+        """)
+        # istniejące zadania
+        op.execute("""
+            INSERT INTO task_fts (rowid, title, description, grp)
+            SELECT id, title, coalesce(description, ''), 'g' || group_id FROM task
+        """)
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_task_search ON task USING gin "
+            "((to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS task_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS task_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS task_fts_insert')
+        op.execute('DROP TABLE IF EXISTS task_fts')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_task_search')
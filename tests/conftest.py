@@ -0,0 +1,102 @@
+"""
+Wspólne fixture testów.
+
+    python -m pytest -q
+
+Każdy test dostaje własną aplikację (create_app) z bazą SQLite w pliku
+w tmp_path - plik, nie :memory:, bo testy współbieżne potrzebują kilku
+połączeń do tej samej bazy. Detektor N+1 w testach rzuca wyjątek,
+a fixture max_queries (app.testing) pilnuje budżetu zapytań trasy.
+"""
+
+import pytest
+from config import Config
+from app import create_app, db, passwords, services
+from app.models import User, FamilyGroup, Task
+
+pytest_plugins = ['app.testing']
+
+# hasło wszystkich użytkowników testowych
+TEST_PASSWORD = 'Haslo12345'
+
+
+class TestingConfig(Config):
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    # szybki hash - testy nie sprawdzają kosztu scrypt
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    # powiadomienia od razu po commit, bez wątków w tle
+    JOBS_BACKEND = 'inline'
+
+
+@pytest.fixture
+def app(tmp_path):
+    class AppConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "test.db"}'
+
+    app = create_app(AppConfig)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """make_user('a@example.com') - zapisany użytkownik z hasłem TEST_PASSWORD."""
+    password = passwords.hash(TEST_PASSWORD)
+
+    def make(email):
+        user = User(email=email, password=password)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_group(app):
+    """make_group('Rodzina', admin, [członkowie]) - grupa z adminem i członkami."""
+    def make(name, admin, members=()):
+        group = FamilyGroup(name=name)
+        db.session.add(group)
+        services.add_member(group, admin, role='admin')
+        for user in members:
+            services.add_member(group, user)
+        db.session.commit()
+        return group
+    return make
+
+
+@pytest.fixture
+def make_tasks(app):
+    """make_tasks(group, autor, n, assigned_to=...) - n zadań jednym INSERT, zwraca id."""
+    def make(group, author, count, assigned_to=None):
+        ids = services.bulk_create_tasks(group.id, author.id, [
+            {'title': f'Zadanie {i}', 'assigned_to_id': assigned_to.id if assigned_to else None}
+            for i in range(count)
+        ])
+        db.session.commit()
+        return ids
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """login(user) - zaloguj klienta testowego (sesja Flask-Login)."""
+    def log_in(user, test_client=None):
+        response = (test_client or client).post(
+            '/api/v1/auth/login', json={'email': user.email, 'password': TEST_PASSWORD}
+        )
+        assert response.status_code == 200, response.get_json()
+    return log_in
+
+
+def task_count(group_id):
+    return db.session.scalar(db.select(db.func.count()).select_from(Task).where(Task.group_id == group_id))
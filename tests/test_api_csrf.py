@@ -0,0 +1,52 @@
+"""
+API bez tokenu CSRF - mutacje przyjmujemy tylko z ciałem JSON.
+
+Obca strona może wysłać z ciasteczkiem sesji zwykły <form>
+(form-urlencoded, multipart, text/plain), ale nie application/json
+bez zgody CORS - takie żądania muszą dostać 415 i niczego nie zmieniać.
+"""
+
+import pytest
+from app import db
+from app.models import GroupMember, Task
+
+FORM_ENCODINGS = [
+    {'content_type': 'application/x-www-form-urlencoded'},
+    {'content_type': 'multipart/form-data'},
+    {'content_type': 'text/plain'},
+]
+
+
+@pytest.fixture
+def group(make_user, make_group, login):
+    admin = make_user('admin@example.com')
+    make_user('new@example.com')
+    group = make_group('Rodzina', admin)
+    login(admin)
+    return group
+
+
+@pytest.mark.parametrize('encoding', FORM_ENCODINGS, ids=lambda e: e['content_type'])
+def test_form_post_is_rejected(client, group, encoding):
+    add_member = client.post(f'/api/v1/groups/{group.id}/members', data={'email': 'new@example.com'}, **encoding)
+    create_task = client.post(f'/api/v1/groups/{group.id}/tasks', data={'title': 'Wynieść śmieci'}, **encoding)
+
+    assert add_member.status_code == 415
+    assert create_task.status_code == 415
+    assert db.session.scalar(db.select(db.func.count()).select_from(GroupMember)) == 1
+    assert db.session.scalar(db.select(db.func.count()).select_from(Task)) == 0
+
+
+def test_form_login_is_rejected(client, make_user):
+    make_user('user@example.com')
+    response = client.post('/api/v1/auth/login', data={'email': 'user@example.com', 'password': 'Haslo12345'})
+    assert response.status_code == 415
+    assert response.get_json()['error'] == 'Unsupported Media Type'
+
+
+def test_json_post_is_accepted(client, group):
+    add_member = client.post(f'/api/v1/groups/{group.id}/members', json={'email': 'new@example.com'})
+    create_task = client.post(f'/api/v1/groups/{group.id}/tasks', json={'title': 'Wynieść śmieci'})
+
+    assert add_member.status_code == 201
+    assert create_task.status_code == 201
@@ -0,0 +1,71 @@
+"""
+Liczniki zadań grupy (open_count, completed_count) przy równoległych zmianach.
+
+Kilka wątków, każdy z własnym klientem (osobne requesty i połączenia
+z bazą), przełącza te same zadania pojedynczo i zbiorczo. Liczniki
+zmieniają się o tyle wierszy, ile naprawdę zmienił UPDATE/DELETE, więc
+na końcu muszą się zgadzać z przeliczeniem (recount_task_counters).
+"""
+
+import random
+import threading
+from app import db, services
+from app.models import FamilyGroup, Task
+
+THREADS = 8
+REQUESTS = 40
+
+
+def test_counters_consistent_under_concurrent_toggles(app, make_user, make_group, make_tasks, login):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    ids = make_tasks(group, admin, 20)
+    group_id = group.id
+
+    clients = [app.test_client() for _ in range(THREADS)]
+    for client in clients:
+        login(admin, client)
+
+    errors = []
+    start = threading.Barrier(THREADS)
+
+    def toggle(client, seed):
+        rnd = random.Random(seed)
+        start.wait()
+        for _ in range(REQUESTS):
+            completed = rnd.random() < 0.5
+            if rnd.random() < 0.2:
+                response = client.post(f'/api/v1/groups/{group_id}/tasks/bulk-update',
+                                       json={'ids': rnd.sample(ids, 5), 'is_completed': completed})
+            else:
+                response = client.patch(f'/api/v1/tasks/{rnd.choice(ids[:5])}', json={'is_completed': completed})
+            if response.status_code != 200:
+                errors.append((response.status_code, response.get_data(as_text=True)))
+
+    threads = [threading.Thread(target=toggle, args=(client, seed)) for seed, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors, errors[:3]
+    db.session.expire_all()
+    assert services.recount_task_counters(fix=False) == []
+
+    group = db.session.get(FamilyGroup, group_id)
+    completed = db.session.scalar(
+        db.select(db.func.count()).select_from(Task).where(Task.group_id == group_id, Task.is_completed.is_(True))
+    )
+    assert (group.open_count, group.completed_count) == (len(ids) - completed, completed)
+
+
+def test_recount_repairs_counters(app, make_user, make_group, make_tasks):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    make_tasks(group, admin, 3)
+    db.session.execute(db.update(FamilyGroup).values(open_count=10, completed_count=5))
+    db.session.commit()
+
+    assert services.recount_task_counters(fix=True) == [(group.id, (10, 5), (3, 0))]
+    db.session.commit()
+    assert services.recount_task_counters(fix=False) == []
@@ -0,0 +1,46 @@
+"""
+Strona główna (lista grup z podsumowaniem) - jedno zapytanie niezależnie
+od liczby grup użytkownika (app.queries.user_dashboard).
+"""
+
+from app import db, services
+from app.models import FamilyGroup, GroupMember
+
+GROUPS = 200
+
+
+def test_dashboard_single_query_for_200_groups(client, make_user, login, max_queries):
+    user = make_user('user@example.com')
+    other = make_user('other@example.com')
+    # grupy wstawiane hurtem - zapytań nie liczymy przy przygotowaniu danych
+    group_ids = db.session.scalars(
+        db.insert(FamilyGroup).returning(FamilyGroup.id, sort_by_parameter_order=True),
+        [{'name': f'Grupa {i:03d}'} for i in range(GROUPS)]
+    ).all()
+    db.session.execute(db.insert(GroupMember), [
+        {'user_id': user.id, 'group_id': group_id, 'role': 'admin' if i % 2 else 'member'}
+        for i, group_id in enumerate(group_ids)
+    ] + [{'user_id': other.id, 'group_id': group_id, 'role': 'member'} for group_id in group_ids[:10]])
+    db.session.commit()
+    # jedna grupa z zadaniami - liczniki i "twoje" na stronie
+    services.bulk_create_tasks(group_ids[0], other.id, [
+        {'title': 'Wynieść śmieci', 'assigned_to_id': user.id},
+        {'title': 'Zakupy na weekend', 'assigned_to_id': other.id},
+    ])
+    db.session.commit()
+    login(user)
+
+    with max_queries(1):
+        response = client.get('/')
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert html.count('/group/') == GROUPS
+    assert 'członków: 2,' in html
+    assert 'twoje: 1' in html
+
+    with max_queries(1):
+        response = client.get('/api/v1/groups')
+    groups = response.get_json()['groups']
+    assert len(groups) == GROUPS
+    first = next(group for group in groups if group['id'] == group_ids[0])
+    assert (first['member_count'], first['open_count'], first['assigned_open_count']) == (2, 2, 1)
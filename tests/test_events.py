@@ -0,0 +1,113 @@
+"""
+Strumienie zdarzeń (SSE) - wyłączanie i limit strumieni w procesie.
+
+Test współbieżności działa na prawdziwym serwerze wątkowym (werkzeug):
+komplet otwartych strumieni nie może zablokować zwykłych requestów,
+kolejny strumień dostaje 503, a zamknięte połączenia zwalniają miejsca.
+"""
+
+import http.client
+import threading
+import time
+import pytest
+from werkzeug.serving import make_server
+from app import create_app, events
+from tests.conftest import TestingConfig, TEST_PASSWORD
+
+MAX_STREAMS = 3
+
+
+@pytest.fixture
+def group(make_user, make_group, login):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    login(admin)
+    return group
+
+
+@pytest.fixture
+def server(app):
+    """Serwer wątkowy z limitem MAX_STREAMS - (aplikacja, port)."""
+    class StreamsConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = app.config['SQLALCHEMY_DATABASE_URI']
+        EVENTS_MAX_STREAMS = MAX_STREAMS
+        # ping co 0,1 s - serwer szybko zauważa rozłączonego klienta
+        EVENTS_KEEPALIVE = 0.1
+
+    streams_app = create_app(StreamsConfig)
+    http_server = make_server('127.0.0.1', 0, streams_app, threaded=True)
+    thread = threading.Thread(target=http_server.serve_forever, daemon=True)
+    thread.start()
+    yield streams_app, http_server.server_port
+    http_server.shutdown()
+
+
+def request(port, method, path, cookie, body=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    headers = {'Cookie': cookie}
+    if body is not None:
+        headers['Content-Type'] = 'application/json'
+    connection.request(method, path, body=body, headers=headers)
+    return connection, connection.getresponse()
+
+
+def test_events_disabled(app, client, group):
+    app.config['EVENTS_ENABLED'] = False
+    events.state.enabled = False
+
+    assert client.get(f'/api/v1/groups/{group.id}/events').status_code == 404
+    assert b'EventSource' not in client.get(f'/group/{group.id}/tasks').data
+
+
+def test_events_enabled_page_opens_stream(client, group):
+    assert b'EventSource' in client.get(f'/group/{group.id}/tasks').data
+
+
+def test_stream_limit_keeps_regular_requests_responsive(server, group):
+    streams_app, port = server
+    body = f'{{"email": "admin@example.com", "password": "{TEST_PASSWORD}"}}'
+    connection, response = request(port, 'POST', '/api/v1/auth/login', '', body)
+    assert response.status == 200
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+    connection.close()
+
+    streams = []
+    for _ in range(MAX_STREAMS):
+        connection, response = request(port, 'GET', f'/api/v1/groups/{group.id}/events', cookie)
+        assert response.status == 200
+        assert response.readline() == b'retry: 3000\n'
+        # strumień bez Content-Length - gniazdo trzyma odpowiedź, nie połączenie
+        streams.append(response)
+
+    connection, response = request(port, 'GET', f'/api/v1/groups/{group.id}/events', cookie)
+    assert response.status == 503
+    assert response.getheader('Retry-After') == '10'
+    connection.close()
+
+    # strumienie otwarte - zwykłe requesty dalej obsługiwane od razu
+    for _ in range(5):
+        start = time.monotonic()
+        connection, response = request(port, 'GET', f'/api/v1/groups/{group.id}', cookie)
+        assert response.status == 200
+        assert time.monotonic() - start < 1
+        connection.close()
+
+    for response in streams:
+        response.close()
+    with streams_app.app_context():
+        deadline = time.monotonic() + 5
+        while events.state.open_streams and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert events.state.open_streams == 0
+        assert events.state.broker.subscriber_count() == 0
+    connection, response = request(port, 'GET', f'/api/v1/groups/{group.id}/events', cookie)
+    assert response.status == 200
+    connection.close()
+
+
+def test_unread_stream_releases_slot_on_close(group):
+    stream = events.stream(group.id, group.version)
+    assert events.state.open_streams == 1
+    stream.close()
+    assert events.state.open_streams == 0
+    assert events.state.broker.subscriber_count(group.id) == 0
@@ -0,0 +1,61 @@
+"""
+create_app - dwie aplikacje w jednym procesie mają osobny stan rozszerzeń
+(app.extensions), więc druga nie przestawia konfiguracji pierwszej.
+"""
+
+from app import create_app, membership_cache, passwords, events, jobs
+from tests.conftest import TestingConfig
+
+
+def make_app(tmp_path, name, **config):
+    class AppConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / name}'
+    for key, value in config.items():
+        setattr(AppConfig, key, value)
+    return create_app(AppConfig)
+
+
+def test_second_app_does_not_reconfigure_first(tmp_path):
+    first = make_app(tmp_path, 'first.db', PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', JOBS_BACKEND='inline')
+    second = make_app(tmp_path, 'second.db', PASSWORD_HASH_METHOD='scrypt', JOBS_BACKEND='database',
+                      EVENTS_ENABLED=False, MEMBERSHIP_CACHE_ENABLED=False)
+
+    with first.app_context():
+        assert passwords.method == 'pbkdf2:sha256:1000'
+        assert jobs.backend == 'inline'
+        assert events.enabled
+        assert membership_cache.state.enabled
+    with second.app_context():
+        assert passwords.method == 'scrypt'
+        assert jobs.backend == 'database'
+        assert not events.enabled
+        assert not membership_cache.state.enabled
+
+
+def test_membership_cache_is_per_app(tmp_path):
+    first = make_app(tmp_path, 'first.db')
+    second = make_app(tmp_path, 'second.db')
+
+    with first.app_context():
+        membership_cache.set('1:1', 'admin')
+    with second.app_context():
+        # inna baza - ten sam klucz (user 1, grupa 1) to inne członkostwo
+        assert membership_cache.get('1:1') is None
+    with first.app_context():
+        assert membership_cache.get('1:1') == 'admin'
+        assert membership_cache.stats() == {'hits': 1, 'misses': 0}
+
+
+def test_event_brokers_are_per_app(tmp_path):
+    first = make_app(tmp_path, 'first.db')
+    second = make_app(tmp_path, 'second.db')
+
+    with first.app_context():
+        stream = events.stream(1, 0)
+        next(stream)
+        assert events.state.broker.subscriber_count(1) == 1
+    with second.app_context():
+        assert events.state.broker.subscriber_count(1) == 0
+    stream.close()
+    with first.app_context():
+        assert events.state.broker.subscriber_count(1) == 0
@@ -0,0 +1,88 @@
+"""
+Zadania w tle (app.jobs) w kolejce w bazie: ponowienia po błędzie
+z rosnącym opóźnieniem, porzucenie po max prób i idempotencja.
+"""
+
+from datetime import timedelta
+import pytest
+from app import db, jobs
+from app.models import Job, utcnow
+
+calls = []
+
+
+@jobs.task('test-fails')
+def failing_job(number):
+    calls.append(number)
+    raise RuntimeError('serwer nie odpowiada')
+
+
+@jobs.task('test-counts')
+def counting_job(number):
+    calls.append(number)
+
+
+@pytest.fixture
+def queue(app):
+    """Backend 'database' w aplikacji testowej - worker to jobs.run_next()."""
+    calls.clear()
+    jobs.state.backend = 'database'
+    jobs.state.max_attempts = 3
+    return jobs.state
+
+
+def make_due(job):
+    db.session.execute(db.update(Job).where(Job.id == job.id).values(run_at=utcnow() - timedelta(seconds=1)))
+    db.session.commit()
+
+
+def test_failed_job_is_retried_with_backoff_then_abandoned(queue):
+    jobs.enqueue('test-fails', number=1)
+    db.session.commit()
+    job = db.session.scalars(db.select(Job)).one()
+
+    for attempt in (1, 2):
+        started = utcnow()
+        assert jobs.run_next()
+        db.session.refresh(job)
+        assert (job.status, job.attempts) == ('pending', attempt)
+        assert 'serwer nie odpowiada' in job.last_error
+        delay = timedelta(seconds=queue.retry_delay * 2 ** (attempt - 1))
+        assert started + delay <= job.run_at <= utcnow() + delay
+        # przed terminem ponowienia worker zadania nie bierze
+        assert not jobs.run_next()
+        make_due(job)
+
+    assert jobs.run_next()
+    db.session.refresh(job)
+    assert (job.status, job.attempts) == ('failed', 3)
+    assert job.finished_at is not None
+    assert calls == [1, 1, 1]
+    make_due(job)
+    assert not jobs.run_next()
+
+
+def test_finished_job_is_not_run_again(queue):
+    jobs.enqueue('test-counts', key='licznik:1', number=1)
+    db.session.commit()
+    assert jobs.run_next()
+    job = db.session.scalars(db.select(Job)).one()
+    assert (job.status, job.attempts, job.locked_until) == ('done', 1, None)
+
+    # kolejny przebieg workera i ponowne zlecenie z tym samym kluczem - bez efektu
+    make_due(job)
+    assert not jobs.run_next()
+    jobs.enqueue('test-counts', key='licznik:1', number=1)
+    db.session.commit()
+    assert not jobs.run_next()
+    assert db.session.scalar(db.select(db.func.count()).select_from(Job)) == 1
+    assert calls == [1]
+    assert jobs.counts() == {'done': 1}
+
+
+def test_inline_backend_skips_repeated_key(app):
+    calls.clear()
+    for _ in range(2):
+        jobs.enqueue('test-counts', key='licznik:2', number=2)
+        db.session.commit()
+    assert calls == [2]
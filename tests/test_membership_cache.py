@@ -0,0 +1,62 @@
+"""
+Cache ról w grupach przy kilku workerach.
+
+Dwie aplikacje na tej samej bazie to dwa workery z osobnymi cache
+w pamięci (i własną sesją na każdy request, jak na serwerze). Usunięcie
+członka w jednym musi odebrać dostęp w drugim od razu (wersja grupy),
+a nie po TTL wpisu w cache.
+"""
+
+from app import create_app, db, membership_cache
+from app.models import FamilyGroup
+from tests.conftest import TestingConfig
+
+
+def worker(app):
+    """Osobna aplikacja (worker) na bazie aplikacji z fixture."""
+    class WorkerConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = app.config['SQLALCHEMY_DATABASE_URI']
+    return create_app(WorkerConfig)
+
+
+def test_removed_member_loses_access_in_other_worker(app, make_user, make_group, make_tasks, login):
+    admin = make_user('admin@example.com')
+    member = make_user('member@example.com')
+    group = make_group('Rodzina', admin, members=[member])
+    task_id = make_tasks(group, admin, 1)[0]
+    group_id, member_id = group.id, member.id
+
+    worker_a, worker_b = worker(app).test_client(), worker(app).test_client()
+    login(member, worker_a)
+    login(admin, worker_b)
+
+    # rola członka trafia do cache workera A
+    assert worker_a.get(f'/api/v1/groups/{group_id}').status_code == 200
+    assert worker_a.get(f'/group/{group_id}').status_code == 200
+
+    assert worker_b.delete(f'/api/v1/groups/{group_id}/members/{member_id}').status_code == 204
+
+    assert worker_a.get(f'/api/v1/groups/{group_id}').status_code == 403
+    assert worker_a.get(f'/group/{group_id}').status_code == 302
+    assert worker_a.patch(f'/api/v1/tasks/{task_id}', json={'is_completed': True}).status_code == 404
+    assert worker_a.post(f'/task/{task_id}/toggle').status_code == 302
+
+
+def test_cached_role_used_until_group_changes(app, make_user, make_group, login):
+    admin = make_user('admin@example.com')
+    group_id = make_group('Rodzina', admin).id
+    worker_app = worker(app)
+    client = worker_app.test_client()
+    login(admin, client)
+
+    client.get(f'/group/{group_id}')
+    client.get(f'/group/{group_id}')
+    with worker_app.app_context():
+        assert membership_cache.stats() == {'hits': 1, 'misses': 1}
+
+    # zmiana w grupie (nowe zadanie) - wpis nieaktualny, rola dociągnięta z bazy
+    client.post(f'/api/v1/groups/{group_id}/tasks', json={'title': 'Wynieść śmieci'})
+    assert client.get(f'/group/{group_id}').status_code == 200
+    version = db.session.scalar(db.select(FamilyGroup.version).where(FamilyGroup.id == group_id))
+    with worker_app.app_context():
+        assert membership_cache.get(f'{admin.id}:{group_id}') == ('admin', version)
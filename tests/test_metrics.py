@@ -0,0 +1,47 @@
+"""
+Metryki requestów (app.metrics): dostęp do /metrics i pomiar zapytań,
+które zakończyły się błędem.
+"""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.metrics import RequestStats, _current
+from tests.conftest import TestingConfig
+
+
+def make_app(tmp_path, token):
+    class MetricsConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "metrics.db"}'
+        METRICS_ENABLED = True
+        METRICS_TOKEN = token
+    return create_app(MetricsConfig)
+
+
+def test_metrics_endpoint_requires_token(tmp_path):
+    client = make_app(tmp_path, 'sekret').test_client()
+    assert client.get('/metrics').status_code == 403
+    assert client.get('/metrics', headers={'Authorization': 'Bearer zly'}).status_code == 403
+
+    response = client.get('/metrics', headers={'Authorization': 'Bearer sekret'})
+    assert response.status_code == 200
+    assert 'app_requests_total' in response.get_data(as_text=True)
+
+
+def test_metrics_endpoint_disabled_without_token(tmp_path):
+    client = make_app(tmp_path, None).test_client()
+    assert client.get('/metrics').status_code == 404
+
+
+def test_failed_query_is_counted_once(app):
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        with db.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.exec_driver_sql('SELECT * FROM nie_ma_takiej_tabeli')
+            connection.exec_driver_sql('SELECT 1')
+    finally:
+        _current.reset(token)
+    assert [statement for _, statement in stats.statements] == ['SELECT * FROM nie_ma_takiej_tabeli', 'SELECT 1']
+    assert all(elapsed < 1 for elapsed, _ in stats.statements)
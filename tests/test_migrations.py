@@ -0,0 +1,31 @@
+"""
+Migracje: schemat po `flask db upgrade` zgadza się z modelami, także gdy
+w bazie są tabele zakładane poza modelami (FTS5 task_fts*, audit_RRRRMM).
+"""
+
+import os
+from flask_migrate import Migrate, upgrade, check
+from app import create_app, db, audit
+from tests.conftest import TestingConfig
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def test_check_ignores_unmanaged_tables(tmp_path):
+    class MigrationsConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path / "migrations.db"}'
+
+    app = create_app(MigrationsConfig)
+    # create_app ładuje Flask-Migrate tylko pod `flask db`
+    Migrate(app, db, directory=MIGRATIONS)
+    with app.app_context():
+        upgrade()
+        audit.create_ahead()
+        db.session.commit()
+        tables = db.session.connection().exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")
+        names = {name for name, in tables}
+        assert 'task_fts' in names and any(name.startswith('audit_') for name in names)
+
+        # różnica schematu kończy się sys.exit(1) (flask_migrate)
+        check()
+        db.engine.dispose()
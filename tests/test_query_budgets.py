@@ -0,0 +1,59 @@
+"""
+Budżety zapytań SQL tras (app.testing.max_queries).
+
+Każda trasa dostaje świeżą aplikację - cache członkostw i fragmentów
+są puste, więc budżet to przypadek najgorszy (pierwsze wejście).
+Grupa ma kilku członków i kilkadziesiąt zadań: N+1 po członkach albo
+zadaniach przekroczyłby budżet (a wcześniej wywołał NPlusOneError).
+"""
+
+import pytest
+from app import db
+from app.models import Task
+
+# (ścieżka, budżet) - {group} to id grupy
+ROUTE_BUDGETS = [
+    ('/', 1),
+    ('/group/{group}', 2),
+    ('/group/{group}/tasks', 3),
+    ('/group/{group}/tasks?status=all', 3),
+    ('/group/{group}/tasks?status=done&archived=1', 4),
+    ('/group/{group}/tasks/due', 3),
+    ('/group/{group}/tasks/search?q=Zadanie', 2),
+    ('/group/{group}/history', 5),
+    ('/api/v1/groups', 1),
+    ('/api/v1/groups/{group}', 2),
+    ('/api/v1/groups/{group}/tasks', 2),
+    ('/api/v1/groups/{group}/history', 5),
+]
+
+
+@pytest.mark.parametrize('path, budget', ROUTE_BUDGETS)
+def test_route_query_budget(client, make_user, make_group, make_tasks, login, max_queries, path, budget):
+    admin = make_user('admin@example.com')
+    members = [make_user(f'member{i}@example.com') for i in range(5)]
+    group = make_group('Rodzina', admin, members)
+    for member in members:
+        make_tasks(group, member, 6, assigned_to=admin)
+    login(admin)
+    url = path.format(group=group.id)
+
+    with max_queries(budget):
+        response = client.get(url)
+    assert response.status_code == 200
+
+
+def test_bulk_create_is_batched(client, make_user, make_group, login, max_queries):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    login(admin)
+    titles = [f'Zadanie {i}' for i in range(200)]
+
+    # INSERT zadań i wpisów historii paczkami, nie wiersz po wierszu
+    with max_queries(10):
+        response = client.post(f'/api/v1/groups/{group.id}/tasks/bulk-create',
+                               json={'tasks': [{'title': title} for title in titles]})
+    assert response.status_code == 201
+    # id w kolejności wysłanych zadań
+    ids = response.get_json()['ids']
+    assert [db.session.get(Task, task_id).title for task_id in ids] == titles
@@ -0,0 +1,71 @@
+"""
+Zadania powtarzane (app.recurrence): terminy serii miesięcznych i rocznych
+oraz harmonogram tworzący następne wystąpienia.
+"""
+
+from datetime import datetime
+import pytest
+from app import db, services
+from app.models import Task
+from app.recurrence import advance, anchor_rule, materialize_due, parse_rule
+from app.search import search_tasks
+
+
+def series(start, rule, count):
+    """Kolejne terminy serii - jak harmonogram, każdy od poprzedniego."""
+    rule = anchor_rule(rule, start)
+    dates = [start]
+    for _ in range(count):
+        dates.append(advance(dates[-1], rule))
+    return [value.strftime('%Y-%m-%d') for value in dates]
+
+
+def test_month_end_series_returns_to_anchor_day():
+    assert series(datetime(2027, 1, 31), 'monthly', 4) == [
+        '2027-01-31', '2027-02-28', '2027-03-31', '2027-04-30', '2027-05-31']
+
+
+def test_day_28_series_stays_on_28th():
+    assert series(datetime(2027, 1, 28), 'monthly', 3) == ['2027-01-28', '2027-02-28', '2027-03-28', '2027-04-28']
+    assert series(datetime(2027, 2, 28), 'yearly', 2) == ['2027-02-28', '2028-02-28', '2029-02-28']
+
+
+def test_leap_day_yearly_series():
+    assert series(datetime(2028, 2, 29), 'yearly', 4) == [
+        '2028-02-29', '2029-02-28', '2030-02-28', '2031-02-28', '2032-02-29']
+
+
+def test_anchor_rule():
+    assert anchor_rule('monthly', datetime(2027, 1, 30)) == 'monthly@30'
+    assert anchor_rule('monthly:3', datetime(2027, 1, 31)) == 'monthly:3@31'
+    assert anchor_rule('monthly', datetime(2027, 1, 28)) == 'monthly'
+    assert anchor_rule('weekly', datetime(2027, 1, 31)) == 'weekly'
+    assert anchor_rule('monthly@31', datetime(2027, 2, 28)) == 'monthly@31'
+    assert parse_rule('yearly@29') == ('yearly', 1, 29)
+
+
+@pytest.mark.parametrize('rule', ['weekly@30', 'monthly@28', 'monthly@32', 'monthly@'])
+def test_invalid_anchor(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+
+def test_materialize_due_indexes_new_occurrences(app, make_user, make_group):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    services.create_task(group.id, admin.id, 'Czynsz za mieszkanie',
+                         due_at=datetime(2027, 1, 31, 18), recurrence='monthly')
+    db.session.commit()
+
+    stats = materialize_due(now=datetime(2027, 2, 1))
+    assert (stats['created'], stats['complete']) == (1, True)
+    occurrence = db.session.scalars(db.select(Task).where(Task.recurrence.isnot(None))).one()
+    assert (occurrence.due_at, occurrence.recurrence) == (datetime(2027, 2, 28, 18), 'monthly@31')
+
+    found, _ = search_tasks(group.id, 'czynsz')
+    assert len(found) == 2
+    # trigger indeksu wrócił - zwykłe zadanie też jest wyszukiwane
+    services.create_task(group.id, admin.id, 'Czynsz za garaż')
+    db.session.commit()
+    found, _ = search_tasks(group.id, 'garaż')
+    assert [task.title for task in found] == ['Czynsz za garaż']
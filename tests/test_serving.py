@@ -0,0 +1,81 @@
+"""
+Adapter ASGI (app.serving) - otwarty strumień SSE nie blokuje zwykłych
+requestów, a rozłączenie klienta zwalnia jego miejsce i wątek.
+
+Aplikację ASGI wołamy bezpośrednio (scope, receive, send) - bez serwera.
+"""
+
+import asyncio
+from app import create_app, events
+from app.serving import PooledWsgiToAsgi
+from tests.conftest import TestingConfig, TEST_PASSWORD
+
+
+def pooled_app(app):
+    class ServingConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = app.config['SQLALCHEMY_DATABASE_URI']
+        ASGI_THREADS = 2
+        EVENTS_MAX_STREAMS = 1
+        EVENTS_KEEPALIVE = 0.1
+    return create_app(ServingConfig)
+
+
+def scope(path, cookie):
+    return {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'localhost'), (b'cookie', cookie.encode())],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 50000)}
+
+
+async def call(asgi_app, path, cookie, disconnect=None, first_chunk=None):
+    """Wiadomości send() jednego requestu; disconnect - asyncio.Event rozłączenia klienta."""
+    messages = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await (disconnect or asyncio.Event()).wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+        if first_chunk is not None and message.get('body'):
+            first_chunk.set()
+
+    await asyncio.wait_for(asgi_app(scope(path, cookie), receive, send), 5)
+    return messages
+
+
+def test_open_stream_does_not_block_requests(app, make_user, make_group):
+    admin = make_user('admin@example.com')
+    group_id = make_group('Rodzina', admin).id
+    flask_app = pooled_app(app)
+    client = flask_app.test_client()
+    client.post('/api/v1/auth/login', json={'email': admin.email, 'password': TEST_PASSWORD})
+    cookie = f'session={client.get_cookie("session").value}'
+    asgi_app = PooledWsgiToAsgi(flask_app)
+
+    async def scenario():
+        disconnect, first_chunk = asyncio.Event(), asyncio.Event()
+        stream = asyncio.ensure_future(call(asgi_app, f'/api/v1/groups/{group_id}/events', cookie,
+                                            disconnect, first_chunk))
+        await asyncio.wait_for(first_chunk.wait(), 5)
+
+        # strumień otwarty - zwykłe requesty (więcej niż ASGI_THREADS) dalej odpowiadają
+        for _ in range(3):
+            messages = await call(asgi_app, f'/api/v1/groups/{group_id}', cookie)
+            assert messages[0]['status'] == 200
+        # limit strumieni pełny - 503 z zapasowego wątku, bez czekania na wolne miejsce
+        messages = await call(asgi_app, f'/api/v1/groups/{group_id}/events', cookie)
+        assert messages[0]['status'] == 503
+
+        disconnect.set()
+        await asyncio.wait_for(stream, 5)
+
+    asyncio.run(scenario())
+    with flask_app.app_context():
+        assert events.state.open_streams == 0
+        assert events.state.broker.subscriber_count() == 0
@@ -0,0 +1,75 @@
+"""
+Lista zadań grupy - liczba zapytań nie rośnie z liczbą zadań, a lista
+z archiwum (app.archive) zachowuje kolejność i stronicowanie.
+
+Szablon sięga po task.assigned_to, task.created_by i task.group każdego
+zadania; bez joinedload (app.queries.group_tasks_query) każde z nich
+to osobny SELECT.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.archive import archive_completed
+from app.models import Task, ArchivedTask
+from app.queries import group_tasks_page
+
+
+@pytest.mark.parametrize('path', [
+    '/group/{group}/tasks?status=all',
+    '/api/v1/groups/{group}/tasks?status=all',
+])
+def test_task_list_queries_do_not_grow_with_tasks(client, make_user, make_group, make_tasks, login,
+                                                  max_queries, path):
+    admin = make_user('admin@example.com')
+    members = [make_user(f'member{i}@example.com') for i in range(8)]
+    group = make_group('Rodzina', admin, members)
+    login(admin)
+    url = path.format(group=group.id)
+    # rola w cache członkostw - dalej liczymy tylko zapytania listy
+    client.get(url)
+
+    counts = []
+    # 8 zadań, potem 48 - różni autorzy i przypisani
+    for per_member in (1, 5):
+        for i, member in enumerate(members):
+            make_tasks(group, member, per_member, assigned_to=members[-1 - i])
+        with max_queries(10) as statements:
+            response = client.get(url)
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1], counts
+
+
+def test_task_list_with_archive_merges_open_done_and_archived(make_user, make_group, make_tasks):
+    admin = make_user('admin@example.com')
+    group = make_group('Rodzina', admin)
+    ids = make_tasks(group, admin, 6)
+    for number, task_id in enumerate(ids):
+        db.session.execute(db.update(Task).where(Task.id == task_id)
+                           .values(created_at=datetime(2026, 6, 1) + timedelta(days=number)))
+    # 0, 1 otwarte; 3, 4 zrobione niedawno; 2 i 5 zrobione dawno - do archiwum
+    for task_id, completed_at in ((ids[2], datetime(2026, 7, 1)), (ids[3], datetime(2026, 12, 30)),
+                                  (ids[4], datetime(2026, 12, 30)), (ids[5], datetime(2026, 7, 1))):
+        db.session.execute(db.update(Task).where(Task.id == task_id)
+                           .values(is_completed=True, completed_at=completed_at))
+    # stary wiersz bez created_at - w archiwum dostaje datę zrobienia
+    db.session.execute(db.update(Task).where(Task.id == ids[5]).values(created_at=None))
+    db.session.commit()
+
+    assert archive_completed(days=90, now=datetime(2027, 1, 1))['tasks'] == 2
+    assert db.session.get(ArchivedTask, ids[5]).created_at == datetime(2026, 7, 1)
+
+    def pages(status):
+        listed, cursor = [], None
+        while True:
+            tasks, cursor = group_tasks_page(group.id, status, after=cursor, per_page=2, include_archived=True)
+            listed.append([task.id for task in tasks])
+            if cursor is None:
+                return listed
+
+    assert pages('all') == [[ids[1], ids[0]], [ids[5], ids[4]], [ids[3], ids[2]]]
+    assert pages('done') == [[ids[5], ids[4]], [ids[3], ids[2]]]
+    tasks, _ = group_tasks_page(group.id, 'all', per_page=10)
+    assert [task.id for task in tasks] == [ids[1], ids[0], ids[4], ids[3]]